@@ -19,7 +19,6 @@ import os
 # Import existing modules
 from src.database import (
     ensure_db_exists, 
-    get_all_jobs, 
     get_jobs_by_criteria,
     get_job_by_id,
     save_job,
@@ -43,15 +42,28 @@ from src.database import (
     get_system_stats,
     delete_user_admin,
     toggle_user_status,
+    get_auth_cache_stats,
     promote_user_to_admin,
     demote_admin_user,
     get_prompt_by_type,
     get_all_prompts,
     create_or_update_prompt,
     delete_prompt,
-    initialize_default_prompts
+    initialize_default_prompts,
+    get_applications,
+    count_applications,
+    get_applications_stats,
+    get_application_dates,
+    get_application_user_ids,
+    query_jobs,
+    count_jobs,
+    get_job_ids,
+    get_jobs_overview,
+    get_job_scores,
+    get_job_value_counts
 )
-from src.utils import read_text_file
+from src.applications_migration import migrate_legacy_applications
+from src.utils import read_text_file, clear_llm_cache
 from src.user_job_processor import UserJobProcessor
 
 # Page configuration
@@ -262,18 +274,49 @@ def get_current_user_id():
         return st.session_state.user['user_id']
     return None
 
-def load_jobs_data():
-    """Load jobs data from database for current user."""
-    ensure_db_exists()
-    user_id = get_current_user_id()
-    jobs = get_all_jobs(user_id)
-    if jobs:
-        df = pd.DataFrame(jobs)
-        # Convert created_at to datetime if present
-        if 'created_at' in df.columns:
-            df['created_at'] = pd.to_datetime(df['created_at'])
-        return df
-    return pd.DataFrame()
+# Columns shown by the jobs list, the description is loaded as a preview only
+JOBS_PAGE_COLUMNS = [
+    'title', 'link', 'job_type', 'experience_level', 'duration', 'payment_rate', 'score', 'description',
+    'proposal_requirements', 'client_joined_date', 'client_location', 'client_total_spent',
+    'client_total_hires', 'client_company_profile', 'created_at'
+]
+JOB_DESCRIPTION_PREVIEW_CHARS = 201
+
+# Score filter choices, as query_jobs filters
+JOB_SCORE_RANGES = {
+    "All": {},
+    "High (≥7)": {'score_min': 7},
+    "Medium (4-6)": {'score_min': 4, 'score_below': 7},
+    "Low (<4)": {'score_below': 4},
+    "Unscored": {'scored': False}
+}
+
+# Sort choices, as (column, descending)
+JOB_SORT_OPTIONS = {
+    "Newest first": ('created_at', True),
+    "Oldest first": ('created_at', False),
+    "Highest score": ('score', True),
+    "Lowest score": ('score', False),
+    "Title": ('title', False)
+}
+
+def load_jobs_overview():
+    """Load the job counts of the current user in one query."""
+    return get_jobs_overview(get_current_user_id())
+
+def load_jobs_page(page, page_size, sort="Newest first", **filters):
+    """Load one page of the current user's jobs matching the filters."""
+    order_by, descending = JOB_SORT_OPTIONS[sort]
+    return query_jobs(
+        columns=JOBS_PAGE_COLUMNS,
+        order_by=order_by,
+        descending=descending,
+        limit=page_size,
+        offset=(page - 1) * page_size,
+        description_chars=JOB_DESCRIPTION_PREVIEW_CHARS,
+        user_id=get_current_user_id(),
+        **filters
+    )
 
 def generate_job_id(title: str, description: str = "") -> str:
     """Generate a unique job ID."""
@@ -385,8 +428,8 @@ async def regenerate_single_job(job_id):
         # Load profile
         profile = read_text_file("./files/profile.md")
         
-        # Create processor for single job
-        processor = UserJobProcessor(user_id=user_id, profile=profile, batch_size=1, min_score=1)
+        # Create processor for single job, skipping cached responses so the application is rewritten
+        processor = UserJobProcessor(user_id=user_id, profile=profile, batch_size=1, min_score=1, bypass_cache=True)
         
         # Get the specific job
         job = get_job_by_id(job_id, user_id)
@@ -407,7 +450,7 @@ async def regenerate_single_job(job_id):
             if scores[0]['score'] >= processor.min_score:
                 applications = await processor.process_jobs_batch([scored_job])
                 if applications:
-                    processor.save_applications_to_file(applications)
+                    processor.save_applications(applications)
                     return True, f"Job regenerated successfully! Score: {scores[0]['score']}/10"
                 else:
                     return True, f"Job scored {scores[0]['score']}/10 but application generation failed"
@@ -511,20 +554,21 @@ def dashboard_page():
     if st.session_state.user:
         st.markdown(f"👋 Welcome back, **{st.session_state.user['username']}**!")
     
-    # Load data
-    df = load_jobs_data()
+    # Load the counts, the charts and recent jobs load only what they show
+    user_id = get_current_user_id()
+    overview = load_jobs_overview()
     
-    if df.empty:
+    if not overview['total_jobs']:
         st.warning("No jobs found in database. Add some jobs to get started!")
         return
     
     # Metrics row
     col1, col2, col3, col4 = st.columns(4)
     
-    total_jobs = len(df)
-    processed_jobs = len(df[df['score'].notna()])
-    high_scoring_jobs = len(df[df['score'] >= 7]) if 'score' in df.columns else 0
-    avg_score = df['score'].mean() if 'score' in df.columns and not df['score'].isna().all() else 0
+    total_jobs = overview['total_jobs']
+    processed_jobs = overview['processed_jobs']
+    high_scoring_jobs = overview['high_scoring_jobs']
+    avg_score = overview['average_score'] or 0
     
     with col1:
         st.metric("Total Jobs", total_jobs)
@@ -540,11 +584,11 @@ def dashboard_page():
     
     with col1:
         st.subheader("📊 Score Distribution")
-        if 'score' in df.columns and not df['score'].isna().all():
-            scored_df = df[df['score'].notna()]
-            fig = px.histogram(scored_df, x='score', nbins=10, 
+        scores = get_job_scores(user_id)
+        if scores:
+            fig = px.histogram(x=scores, nbins=10, 
                              title="Job Score Distribution",
-                             labels={'score': 'Score', 'count': 'Number of Jobs'})
+                             labels={'x': 'Score', 'count': 'Number of Jobs'})
             fig.update_layout(showlegend=False)
             st.plotly_chart(fig, use_container_width=True)
         else:
@@ -552,9 +596,9 @@ def dashboard_page():
     
     with col2:
         st.subheader("📈 Jobs by Type")
-        if 'job_type' in df.columns:
-            job_type_counts = df['job_type'].value_counts()
-            fig = px.pie(values=job_type_counts.values, names=job_type_counts.index,
+        job_type_counts = get_job_value_counts('job_type', user_id)
+        if job_type_counts:
+            fig = px.pie(values=list(job_type_counts.values()), names=list(job_type_counts.keys()),
                         title="Distribution by Job Type")
             st.plotly_chart(fig, use_container_width=True)
         else:
@@ -562,12 +606,11 @@ def dashboard_page():
     
     # Recent jobs
     st.subheader("🕒 Recent Jobs")
-    if 'created_at' in df.columns:
-        recent_jobs = df.sort_values('created_at', ascending=False).head(5)
-    else:
-        recent_jobs = df.head(5)
+    recent_jobs = query_jobs(
+        columns=['title', 'job_type', 'payment_rate', 'score', 'link'], limit=5, user_id=user_id
+    )
     
-    for _, job in recent_jobs.iterrows():
+    for job in recent_jobs:
         with st.container():
             col1, col2, col3, col4 = st.columns([3, 1, 1, 1])
             with col1:
@@ -602,41 +645,35 @@ def dashboard_page():
     st.subheader("🧹 Quick Cleanup")
     
     col1, col2, col3, col4 = st.columns(4)
-    user_id = get_current_user_id()
     
     with col1:
         # Delete low scoring jobs
-        low_score_count = len(df[df['score'] < 4]) if 'score' in df.columns else 0
+        low_score_count = overview['low_scoring_jobs']
         if st.button(f"🗑️ Delete Low Scores ({low_score_count})", disabled=low_score_count == 0):
             if low_score_count > 0:
-                low_score_ids = df[df['score'] < 4]['job_id'].tolist()
+                low_score_ids = get_job_ids(user_id=user_id, score_below=4)
                 deleted = delete_multiple_jobs(low_score_ids, user_id)
                 st.success(f"🗑️ Deleted {deleted} low-scoring jobs!")
                 st.rerun()
     
     with col2:
         # Reset all unprocessed jobs
-        unprocessed_count = len(df[df['score'].isna()]) if 'score' in df.columns else len(df)
+        unprocessed_count = overview['unprocessed_jobs']
         if st.button(f"🔄 Reset Unprocessed ({unprocessed_count})", disabled=unprocessed_count == 0):
             if unprocessed_count > 0:
-                unprocessed_ids = df[df['score'].isna()]['job_id'].tolist()
+                unprocessed_ids = get_job_ids(user_id=user_id, scored=False)
                 reset_count = reset_multiple_job_scores(unprocessed_ids, user_id)
                 st.success(f"🔄 Reset {reset_count} jobs for reprocessing!")
     
     with col3:
         # Delete old jobs (older than 30 days)
-        if 'created_at' in df.columns:
-            thirty_days_ago = pd.Timestamp.now() - pd.Timedelta(days=30)
-            old_jobs = df[df['created_at'] < thirty_days_ago]
-            old_count = len(old_jobs)
-            if st.button(f"🗓️ Delete Old Jobs ({old_count})", disabled=old_count == 0):
-                if old_count > 0:
-                    old_job_ids = old_jobs['job_id'].tolist()
-                    deleted = delete_multiple_jobs(old_job_ids, user_id)
-                    st.success(f"🗓️ Deleted {deleted} old jobs!")
-                    st.rerun()
-        else:
-            st.button("🗓️ Delete Old Jobs (0)", disabled=True)
+        old_count = overview['old_jobs']
+        if st.button(f"🗓️ Delete Old Jobs ({old_count})", disabled=old_count == 0):
+            if old_count > 0:
+                old_job_ids = get_job_ids(user_id=user_id, older_than_days=30)
+                deleted = delete_multiple_jobs(old_job_ids, user_id)
+                st.success(f"🗓️ Deleted {deleted} old jobs!")
+                st.rerun()
     
     with col4:
         # Show database stats
@@ -743,10 +780,10 @@ def view_jobs_page():
         show_edit_job_modal(st.session_state.edit_job_id)
         return
     
-    df = load_jobs_data()
     user_id = get_current_user_id()
+    total_jobs = count_jobs(user_id=user_id)
     
-    if df.empty:
+    if not total_jobs:
         st.info("No jobs found. Add some jobs to get started!")
         return
     
@@ -760,7 +797,7 @@ def view_jobs_page():
     
     with col1:
         if st.button("☑️ Select All"):
-            st.session_state.selected_jobs_temp = df['job_id'].tolist()
+            st.session_state.selected_jobs_temp = get_job_ids(user_id=user_id)
             st.rerun()
     
     with col2:
@@ -820,44 +857,50 @@ def view_jobs_page():
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        job_type_filter = st.selectbox("Job Type", ["All"] + list(df['job_type'].unique()) if 'job_type' in df.columns else ["All"])
+        job_type_filter = st.selectbox("Job Type", ["All"] + list(get_job_value_counts('job_type', user_id)))
     
     with col2:
-        score_filter = st.selectbox("Score Range", ["All", "High (≥7)", "Medium (4-6)", "Low (<4)", "Unscored"])
+        score_filter = st.selectbox("Score Range", list(JOB_SCORE_RANGES))
     
     with col3:
         experience_filter = st.selectbox("Experience Level", 
-                                       ["All"] + list(df['experience_level'].dropna().unique()) if 'experience_level' in df.columns else ["All"])
+                                       ["All"] + list(get_job_value_counts('experience_level', user_id)))
     
     with col4:
         search_term = st.text_input("Search in titles")
     
-    # Apply filters
-    filtered_df = df.copy()
+    col1, col2 = st.columns(2)
     
-    if job_type_filter != "All":
-        filtered_df = filtered_df[filtered_df['job_type'] == job_type_filter]
+    with col1:
+        sort_option = st.selectbox("Sort by", list(JOB_SORT_OPTIONS))
     
-    if score_filter != "All":
-        if score_filter == "High (≥7)":
-            filtered_df = filtered_df[filtered_df['score'] >= 7]
-        elif score_filter == "Medium (4-6)":
-            filtered_df = filtered_df[(filtered_df['score'] >= 4) & (filtered_df['score'] < 7)]
-        elif score_filter == "Low (<4)":
-            filtered_df = filtered_df[filtered_df['score'] < 4]
-        elif score_filter == "Unscored":
-            filtered_df = filtered_df[filtered_df['score'].isna()]
+    with col2:
+        jobs_per_page = st.selectbox("Jobs per Page", [10, 20, 50, 100], index=1)
+    
+    # Filters are applied by the database, only the current page is loaded
+    filters = {
+        **JOB_SCORE_RANGES[score_filter],
+        'job_type': job_type_filter if job_type_filter != "All" else None,
+        'experience_level': experience_filter if experience_filter != "All" else None,
+        'search': search_term or None
+    }
+    filtered_count = count_jobs(user_id=user_id, **filters)
     
-    if experience_filter != "All":
-        filtered_df = filtered_df[filtered_df['experience_level'] == experience_filter]
+    st.write(f"Showing {filtered_count} of {total_jobs} jobs")
     
-    if search_term:
-        filtered_df = filtered_df[filtered_df['title'].str.contains(search_term, case=False, na=False)]
+    # Pagination
+    total_pages = (filtered_count + jobs_per_page - 1) // jobs_per_page
+    if total_pages > 1:
+        col1, col2, col3 = st.columns([1, 2, 1])
+        with col2:
+            page = st.slider("Page", 1, total_pages, 1)
+    else:
+        page = 1
     
-    st.write(f"Showing {len(filtered_df)} of {len(df)} jobs")
+    page_jobs = load_jobs_page(page, jobs_per_page, sort_option, **filters)
     
     # Display jobs with management controls
-    for i, (_, job) in enumerate(filtered_df.iterrows()):
+    for i, job in enumerate(page_jobs):
         with st.container():
             # Selection checkbox
             col_check, col_main, col_score, col_actions = st.columns([0.5, 4, 1, 2])
@@ -989,25 +1032,24 @@ def process_jobs_page():
         st.error("❌ OpenAI API key not set. Please set it in the settings page.")
         return
     
-    df = load_jobs_data()
+    overview = load_jobs_overview()
     user_id = get_current_user_id()
     
-    if df.empty:
+    if not overview['total_jobs']:
         st.info("No jobs found. Add some jobs first!")
         return
     
-    # Get unprocessed jobs
-    unprocessed_jobs = df[df['score'].isna()] if 'score' in df.columns else df
-    processed_jobs = df[df['score'].notna()] if 'score' in df.columns else pd.DataFrame()
+    # Count unprocessed jobs
+    unprocessed_count = overview['unprocessed_jobs']
     
     col1, col2 = st.columns(2)
     
     with col1:
-        st.metric("Unprocessed Jobs", len(unprocessed_jobs))
+        st.metric("Unprocessed Jobs", unprocessed_count)
     with col2:
-        st.metric("Processed Jobs", len(processed_jobs))
+        st.metric("Processed Jobs", overview['processed_jobs'])
     
-    if len(unprocessed_jobs) == 0:
+    if unprocessed_count == 0:
         st.success("✅ All jobs have been processed!")
         return
     
@@ -1022,11 +1064,11 @@ def process_jobs_page():
     
     # Show unprocessed jobs
     st.subheader("📋 Unprocessed Jobs")
-    for _, job in unprocessed_jobs.head(5).iterrows():
+    for job in query_jobs(columns=['title', 'job_type'], limit=5, user_id=user_id, scored=False):
         st.write(f"• **{job.get('title', 'No Title')}** ({job.get('job_type', 'N/A')})")
     
-    if len(unprocessed_jobs) > 5:
-        st.write(f"... and {len(unprocessed_jobs) - 5} more jobs")
+    if unprocessed_count > 5:
+        st.write(f"... and {unprocessed_count - 5} more jobs")
     
     # Process button
     if st.button("🚀 Process All Jobs", type="primary"):
@@ -1054,51 +1096,35 @@ def applications_page():
     else:
         view_mode = "My Applications"
     
-    # Check cover letter files
-    if view_mode == "My Applications":
-        # User-specific file
-        cover_letter_file = f"./data/users/{user_id}/cover_letters.md"
-        if not os.path.exists(cover_letter_file):
-            st.info("No applications generated yet. Process some jobs first!")
-            return
-    else:
-        # Global file for admin
-        cover_letter_file = "./data/cover_letter.md"
-        if not os.path.exists(cover_letter_file):
-            st.info("No applications found in the system.")
-            return
+    # Import applications appended to the legacy markdown files, unchanged files are skipped
+    try:
+        migrate_legacy_applications()
+    except Exception as e:
+        st.warning(f"Could not import applications from the legacy markdown files: {str(e)}")
+    
+    # Admins see every user's applications, everyone else only their own
+    owner_id = user_id if view_mode == "My Applications" else None
     
     try:
-        # Parse applications
-        applications = parse_applications_file(cover_letter_file)
+        stats = get_applications_stats(owner_id)
         
-        if not applications:
-            st.info("No applications found in the file.")
-            return
-        
-        # Filter applications by user if needed
-        if view_mode == "My Applications":
-            if is_admin:
-                # Admin viewing their own applications - filter by admin's user_id
-                applications = [app for app in applications if app.get('user_id') == user_id]
+        if not stats['total_applications']:
+            if view_mode == "My Applications":
+                st.info("No applications generated yet. Process some jobs first!")
             else:
-                # Regular users - should only see their own applications (already from their file)
-                # But double-check to ensure data isolation
-                applications = [app for app in applications if app.get('user_id') == user_id]
+                st.info("No applications found in the system.")
+            return
         
         # Header with stats
         col1, col2, col3, col4 = st.columns(4)
         with col1:
-            st.metric("Total Applications", len(applications))
+            st.metric("Total Applications", stats['total_applications'])
         with col2:
-            unique_dates = len(set(app.get('date', 'Unknown') for app in applications))
-            st.metric("Processing Sessions", unique_dates)
+            st.metric("Active Days", stats['active_days'])
         with col3:
-            avg_cover_length = sum(len(app.get('cover_letter', '')) for app in applications) // len(applications) if applications else 0
-            st.metric("Avg Cover Letter Length", f"{avg_cover_length} chars")
+            st.metric("Avg Cover Letter Length", f"{stats['avg_cover_length']} chars")
         with col4:
-            with_interview_prep = sum(1 for app in applications if app.get('interview_prep'))
-            st.metric("With Interview Prep", with_interview_prep)
+            st.metric("With Interview Prep", stats['with_interview_prep'])
         
         st.divider()
         
@@ -1113,13 +1139,13 @@ def applications_page():
         
         with col2:
             # Date filter
-            dates = sorted(set(app.get('date', 'Unknown') for app in applications), reverse=True)
+            dates = get_application_dates(owner_id)
             selected_date = st.selectbox("📅 Filter by Date", ["All Dates"] + dates)
         
         with col3:
             # User filter (admin only)
             if is_admin and view_mode == "All Applications":
-                users = sorted(set(app.get('user_id', 'Unknown') for app in applications))
+                users = get_application_user_ids()
                 selected_user = st.selectbox("👤 Filter by User", ["All Users"] + users)
             else:
                 selected_user = "All Users"
@@ -1128,26 +1154,19 @@ def applications_page():
             # View mode
             display_mode = st.selectbox("👁️ View Mode", ["Cards", "Table", "Detailed"])
         
-        # Apply filters
-        filtered_apps = applications.copy()
-        
-        if search_term:
-            filtered_apps = [app for app in filtered_apps 
-                           if search_term.lower() in app.get('title', '').lower()]
-        
-        if selected_date != "All Dates":
-            filtered_apps = [app for app in filtered_apps 
-                           if app.get('date') == selected_date]
-        
-        if selected_user != "All Users":
-            filtered_apps = [app for app in filtered_apps 
-                           if app.get('user_id') == selected_user]
+        # Filters are applied by the database, only the current page is loaded
+        filters = {
+            'user_id': selected_user if selected_user != "All Users" else owner_id,
+            'search': search_term or None,
+            'date': selected_date if selected_date != "All Dates" else None
+        }
+        filtered_count = count_applications(**filters)
         
-        st.write(f"Showing {len(filtered_apps)} of {len(applications)} applications")
+        st.write(f"Showing {filtered_count} of {stats['total_applications']} applications")
         
         # Pagination
         items_per_page = st.selectbox("📄 Items per Page", [5, 10, 20, 50], index=1)
-        total_pages = (len(filtered_apps) + items_per_page - 1) // items_per_page
+        total_pages = (filtered_count + items_per_page - 1) // items_per_page
         
         if total_pages > 1:
             col1, col2, col3 = st.columns([1, 2, 1])
@@ -1156,10 +1175,9 @@ def applications_page():
         else:
             page = 1
         
-        # Calculate start and end indices
+        # Load the current page
         start_idx = (page - 1) * items_per_page
-        end_idx = min(start_idx + items_per_page, len(filtered_apps))
-        page_apps = filtered_apps[start_idx:end_idx]
+        page_apps = load_applications(limit=items_per_page, offset=start_idx, **filters)
         
         st.divider()
         
@@ -1178,6 +1196,7 @@ def applications_page():
         
         with col1:
             if st.button("📋 Copy All Cover Letters", key="apps_export_cover_letters"):
+                filtered_apps = load_applications(**filters)
                 all_covers = "\n\n" + "="*80 + "\n\n".join([
                     f"JOB: {app.get('title', 'Unknown')}\nUSER: {app.get('user_id', 'Unknown')}\n\n{app.get('cover_letter', '')}"
                     for app in filtered_apps
@@ -1186,6 +1205,7 @@ def applications_page():
         
         with col2:
             if st.button("🎤 Copy All Interview Prep", key="apps_export_interview_prep"):
+                filtered_apps = load_applications(**filters)
                 all_interviews = "\n\n" + "="*80 + "\n\n".join([
                     f"JOB: {app.get('title', 'Unknown')}\nUSER: {app.get('user_id', 'Unknown')}\n\n{app.get('interview_prep', '')}"
                     for app in filtered_apps if app.get('interview_prep')
@@ -1194,10 +1214,10 @@ def applications_page():
         
         with col3:
             if st.button("📊 Generate Summary Report", key="apps_export_summary"):
-                generate_applications_summary(filtered_apps)
+                generate_applications_summary(load_applications(**filters))
     
     except Exception as e:
-        st.error(f"Error reading applications file: {e}")
+        st.error(f"Error loading applications: {e}")
         with st.expander("🐛 Debug Information"):
             st.text(f"Error: {str(e)}")
             st.text(f"Error type: {type(e)}")
@@ -1262,66 +1282,12 @@ def show_admin_notifications():
     except Exception as e:
         st.error(f"Error loading notifications: {e}")
 
-def parse_applications_file(file_path):
-    """Parse the applications file and return structured data."""
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        # Split by different possible separators
-        sections = content.split("====================================================================================================")
-        
-        if len(sections) <= 1:
-            sections = content.split("================================================================================")
-        
-        applications = []
-        
-        for section in sections:
-            section = section.strip()
-            if not section:
-                continue
-            
-            app_data = {}
-            
-            # Extract metadata from header
-            lines = section.split('\n')
-            for line in lines[:10]:  # Check first 10 lines for metadata
-                if 'DATE:' in line:
-                    app_data['date'] = line.replace('DATE:', '').strip()
-                elif 'USER:' in line:
-                    app_data['user_id'] = line.replace('USER:', '').strip()
-                elif 'User ID:' in line:
-                    app_data['user_id'] = line.replace('User ID:', '').strip()
-            
-            # Extract job title
-            title = "Unknown Job"
-            if "Title:" in section:
-                title_lines = [line for line in section.split('\n') if 'Title:' in line]
-                if title_lines:
-                    title = title_lines[0].replace('# Title:', '').replace('Title:', '').strip()
-            app_data['title'] = title
-            
-            # Split into main parts
-            parts = section.split('### ')
-            
-            for part in parts:
-                part = part.strip()
-                if part.startswith("Job Description"):
-                    app_data['job_description'] = part.replace("Job Description", "").strip()
-                elif part.startswith("Cover Letter"):
-                    app_data['cover_letter'] = part.replace("Cover Letter", "").strip()
-                elif part.startswith("Interview Preparation"):
-                    app_data['interview_prep'] = part.replace("Interview Preparation", "").strip()
-            
-            # Only add if it has essential content
-            if app_data.get('cover_letter') or app_data.get('job_description'):
-                applications.append(app_data)
-        
-        return applications
-    
-    except Exception as e:
-        st.error(f"Error parsing applications file: {e}")
-        return []
+def load_applications(**filters):
+    """Load applications from the database for display, newest first."""
+    applications = get_applications(**filters)
+    for app in applications:
+        app['date'] = app.get('created_at') or 'Unknown'
+    return applications
 
 def display_applications_cards(applications, is_admin=False):
     """Display applications in card format."""
@@ -1564,6 +1530,7 @@ def settings_page():
     if st.button("Update API Key"):
         if new_api_key:
             os.environ['OPENAI_API_KEY'] = new_api_key
+            clear_llm_cache()
             st.session_state.api_key_set = True
             st.success("✅ API Key updated successfully!")
             st.rerun()
@@ -1594,7 +1561,6 @@ def settings_page():
     # Database info
     st.subheader("🗄️ Your Data")
     user_id = get_current_user_id()
-    df = load_jobs_data()
     stats = get_database_stats(user_id)
     
     col1, col2, col3 = st.columns(3)
@@ -1716,6 +1682,9 @@ def admin_system_overview():
     with col2:
         st.metric("🔴 Expired Sessions", stats['expired_sessions'])
     
+    cache_stats = get_auth_cache_stats()
+    st.caption(f"Session cache: {cache_stats['session_cache']} · User cache: {cache_stats['user_cache']}")
+    
     # Recent high score jobs summary
     try:
         notifications_file = "./data/high_score_notifications.json"
@@ -1786,8 +1755,7 @@ def admin_user_management():
             
             with col2:
                 # Job count
-                user_jobs = get_all_jobs(user['user_id'])
-                st.metric("Jobs", len(user_jobs))
+                st.metric("Jobs", count_jobs(user_id=user['user_id']))
             
             with col3:
                 # Last login
@@ -2247,34 +2215,32 @@ def main():
         st.divider()
         
         # Quick stats
-        df = load_jobs_data()
-        if not df.empty:
-            st.metric("Total Jobs", len(df))
-            processed = len(df[df['score'].notna()]) if 'score' in df.columns else 0
-            st.metric("Processed", processed)
+        overview = load_jobs_overview()
+        if overview['total_jobs']:
+            st.metric("Total Jobs", overview['total_jobs'])
+            st.metric("Processed", overview['processed_jobs'])
             
-            if 'score' in df.columns and not df['score'].isna().all():
-                avg_score = df['score'].mean()
-                st.metric("Avg Score", f"{avg_score:.1f}")
+            if overview['average_score'] is not None:
+                st.metric("Avg Score", f"{overview['average_score']:.1f}")
         
         # Quick actions in sidebar
         st.divider()
         st.write("**Quick Actions**")
         
-        if not df.empty:
+        if overview['total_jobs']:
             user_id = get_current_user_id()
             # Quick cleanup buttons
-            unprocessed = len(df[df['score'].isna()]) if 'score' in df.columns else 0
+            unprocessed = overview['unprocessed_jobs']
             if unprocessed > 0:
                 if st.button(f"⚡ Process {unprocessed} Jobs", key="sidebar_process_jobs"):
                     st.session_state.selected_page = "⚡ Process Jobs"
                     st.rerun()
             
-            low_scores = len(df[df['score'] < 4]) if 'score' in df.columns else 0
+            low_scores = overview['low_scoring_jobs']
             if low_scores > 0:
                 if st.button(f"🗑️ Clean {low_scores} Low Scores", key="sidebar_clean_low_scores"):
                     # Quick delete low scores
-                    low_score_ids = df[df['score'] < 4]['job_id'].tolist()
+                    low_score_ids = get_job_ids(user_id=user_id, score_below=4)
                     deleted = delete_multiple_jobs(low_score_ids, user_id)
                     st.success(f"Deleted {deleted} jobs!")
                     st.rerun()
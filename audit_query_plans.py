@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Query Plan Audit - Flags queries in src/database.py that scan a whole table
+
+Runs the query functions of src/database.py against a throwaway seeded
+database, records the SQL each one executes and checks its EXPLAIN QUERY PLAN
+for "SCAN <table>" steps that don't go through an index.
+
+Usage: python audit_query_plans.py [--show-plans]
+"""
+
+import argparse
+import os
+import re
+import sys
+import tempfile
+
+import src.database as database
+
+# Functions expected to scan a table, with the reason
+EXPECTED_SCANS = {
+    "get_all_users": "lists every user",
+    "get_system_stats": "counts users and sessions across the whole system",
+    "get_prompt_by_type": "loads every active prompt into the prompt registry",
+    "admin get_database_stats": "counts every user's jobs",
+    "admin get_jobs_overview": "counts every user's jobs",
+    "admin get_job_value_counts": "counts every user's jobs",
+}
+
+# Only statements that read rows have a plan worth checking
+AUDITED_STATEMENT = re.compile(r"^\s*(SELECT|UPDATE|DELETE|WITH)\b", re.IGNORECASE)
+# "SCAN jobs" or "SCAN j", but not "SCAN jobs USING INDEX ...", "SCAN CONSTANT ROW"
+# or a scan of the schema table
+TABLE_SCAN = re.compile(r"^SCAN (?!CONSTANT ROW|sqlite_)(\w+)(?: AS \w+)?$")
+# Subqueries in FROM, whose rows are read back with "SCAN <alias>"
+SUBQUERY = re.compile(r"^(?:CO-ROUTINE|MATERIALIZE) (\w+)$")
+
+USER_ID = "audit_user"
+OTHER_USER_ID = "other_user"
+
+
+def seed_database(num_jobs=200):
+    """Create the schema and insert users, sessions, jobs, prompts and applications."""
+    database.ensure_db_exists()
+    _, admin_id = database.create_admin_user("audit_admin", "admin@example.com", "password")
+    with database.db_cursor() as cursor:
+        cursor.executemany(
+            "INSERT INTO users (user_id, username, email, password_hash, salt) VALUES (?, ?, ?, '', '')",
+            [(user_id, user_id, f"{user_id}@example.com") for user_id in (USER_ID, OTHER_USER_ID)]
+        )
+        cursor.executemany(
+            "INSERT INTO jobs (job_id, user_id, title, job_type, experience_level, score, description) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [
+                (f"job-{i}", USER_ID if i % 2 else OTHER_USER_ID, f"Job {i}",
+                 "Fixed" if i % 3 else "Hourly", "Expert", None if i % 4 == 0 else i % 10, "Audit job")
+                for i in range(num_jobs)
+            ]
+        )
+    database.create_or_update_prompt("cover_letter", "Cover letter", "Write for {profile}", admin_id)
+    database.save_applications(
+        [{"job_id": "job-1", "title": "Job 1", "cover_letter": "Dear client"}], USER_ID
+    )
+    return admin_id
+
+
+def build_workload(admin_id, session_id):
+    """The calls to audit, as (name, function, args, kwargs)."""
+    return [
+        ("create_user", database.create_user, ("audit_new", "new@example.com", "password"), {}),
+        ("authenticate_user", database.authenticate_user, ("audit_admin", "password"), {}),
+        ("validate_session", database.validate_session, (session_id,), {}),
+        ("update_last_login", database.update_last_login, (USER_ID,), {}),
+        ("get_user_by_id", database.get_user_by_id, (USER_ID,), {}),
+        ("cleanup_expired_sessions", database.cleanup_expired_sessions, (), {}),
+        ("job_exists", database.job_exists, ("job-1", USER_ID), {}),
+        ("filter_new_job_ids", database.filter_new_job_ids, (["job-1", "job-new"], USER_ID), {}),
+        ("get_all_jobs", database.get_all_jobs, (USER_ID,), {}),
+        ("get_job_by_id", database.get_job_by_id, ("job-1", USER_ID), {}),
+        ("update_job", database.update_job, ("job-1", {"score": 8}, USER_ID), {}),
+        ("reset_multiple_job_scores", database.reset_multiple_job_scores, (["job-3", "job-5"], USER_ID), {}),
+        ("unprocessed get_jobs_by_criteria", database.get_jobs_by_criteria, (),
+         {"unprocessed_only": True, "user_id": USER_ID}),
+        ("score get_jobs_by_criteria", database.get_jobs_by_criteria, (), {"score_min": 7, "user_id": USER_ID}),
+        ("query_jobs", database.query_jobs, (), {"user_id": USER_ID, "limit": 20, "description_chars": 200}),
+        ("search query_jobs", database.query_jobs, (), {"user_id": USER_ID, "search": "Job 1", "limit": 20}),
+        ("count_jobs", database.count_jobs, (), {"user_id": USER_ID, "scored": False}),
+        ("get_job_ids", database.get_job_ids, (), {"user_id": USER_ID, "score_below": 5}),
+        ("get_jobs_overview", database.get_jobs_overview, (USER_ID,), {}),
+        ("admin get_jobs_overview", database.get_jobs_overview, (), {}),
+        ("get_job_scores", database.get_job_scores, (USER_ID,), {}),
+        ("get_job_value_counts", database.get_job_value_counts, ("job_type", USER_ID), {}),
+        ("admin get_job_value_counts", database.get_job_value_counts, ("job_type",), {}),
+        ("get_database_stats", database.get_database_stats, (USER_ID,), {}),
+        ("admin get_database_stats", database.get_database_stats, (), {}),
+        ("get_applications", database.get_applications, (USER_ID,), {"limit": 20}),
+        ("count_applications", database.count_applications, (USER_ID,), {}),
+        ("get_applications_by_job", database.get_applications_by_job, ("job-1", USER_ID), {}),
+        ("get_applications_stats", database.get_applications_stats, (USER_ID,), {}),
+        ("get_application_dates", database.get_application_dates, (USER_ID,), {}),
+        ("get_application_user_ids", database.get_application_user_ids, (), {}),
+        ("get_applications_file_import", database.get_applications_file_import, ("cover_letter.md",), {}),
+        ("is_admin_user", database.is_admin_user, (admin_id,), {}),
+        ("get_all_users", database.get_all_users, (admin_id,), {}),
+        ("get_all_jobs_admin", database.get_all_jobs_admin, (admin_id,), {}),
+        ("get_system_stats", database.get_system_stats, (admin_id,), {}),
+        ("get_prompt_by_type", database.get_prompt_by_type, ("cover_letter",), {}),
+        ("get_all_prompts", database.get_all_prompts, (admin_id,), {}),
+        ("delete_job", database.delete_job, ("job-7", USER_ID), {}),
+        ("delete_multiple_jobs", database.delete_multiple_jobs, (["job-9", "job-11"], USER_ID), {}),
+        ("toggle_user_status", database.toggle_user_status, (OTHER_USER_ID, admin_id), {}),
+        ("delete_prompt", database.delete_prompt, ("cover_letter", admin_id), {}),
+        ("invalidate_session", database.invalidate_session, (session_id,), {}),
+        ("delete_user_admin", database.delete_user_admin, (OTHER_USER_ID, admin_id), {}),
+    ]
+
+
+def capture_statements(function, args, kwargs):
+    """Run a function and return the SQL statements it executed, with their parameters bound."""
+    statements = []
+    conn = database.get_connection()
+    conn.set_trace_callback(statements.append)
+    try:
+        function(*args, **kwargs)
+    finally:
+        conn.set_trace_callback(None)
+    return [statement for statement in statements if AUDITED_STATEMENT.match(statement)]
+
+
+def explain(statement):
+    """Return the detail lines of a statement's query plan."""
+    with database.db_cursor() as cursor:
+        cursor.execute(f"EXPLAIN QUERY PLAN {statement}")
+        return [row[3] for row in cursor.fetchall()]
+
+
+def audit_query_plans(num_jobs=200, show_plans=False):
+    """
+    Audit the query plans of the database functions on a throwaway database.
+
+    Args:
+        num_jobs (int): Number of jobs to seed.
+        show_plans (bool): Print the plan of every statement, not only the scans.
+
+    Returns:
+        list: Findings as dicts with the function name, statement, scanned tables and whether the scan is expected.
+    """
+    original_db_path = database.DB_PATH
+    findings = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        database.DB_PATH = os.path.join(tmp_dir, "audit.db")
+        try:
+            admin_id = seed_database(num_jobs)
+            session_id = database.create_session(USER_ID)
+
+            for name, function, args, kwargs in build_workload(admin_id, session_id):
+                for statement in capture_statements(function, args, kwargs):
+                    plan = explain(statement)
+                    subqueries = {match.group(1) for match in map(SUBQUERY.match, plan) if match}
+                    scanned_tables = [
+                        match.group(1) for match in map(TABLE_SCAN.match, plan)
+                        if match and match.group(1) not in subqueries
+                    ]
+                    if show_plans:
+                        print(f"{name}: {' '.join(statement.split())}")
+                        for line in plan:
+                            print(f"    {line}")
+                    if scanned_tables:
+                        findings.append({
+                            "function": name,
+                            "statement": " ".join(statement.split()),
+                            "tables": scanned_tables,
+                            "expected": name in EXPECTED_SCANS,
+                        })
+        finally:
+            database.close_connection()
+            database.DB_PATH = original_db_path
+    return findings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Flag database queries that scan a whole table")
+    parser.add_argument("--show-plans", action="store_true", help="Print the plan of every audited statement")
+    args = parser.parse_args()
+
+    findings = audit_query_plans(show_plans=args.show_plans)
+    unexpected = [finding for finding in findings if not finding["expected"]]
+
+    for finding in findings:
+        label = "expected" if finding["expected"] else "UNEXPECTED"
+        reason = f" ({EXPECTED_SCANS[finding['function']]})" if finding["expected"] else ""
+        print(f"[{label}] {finding['function']} scans {', '.join(finding['tables'])}{reason}")
+        print(f"    {finding['statement'][:200]}")
+
+    print(f"\n{len(findings)} table scans, {len(unexpected)} unexpected")
+    sys.exit(1 if unexpected else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Database Benchmark - Measures the cost of per-call connections vs the pooled connection
+
+Runs against a throwaway SQLite file so the real database is never touched.
+
+Usage: python benchmark_database.py [--jobs 1000] [--lookups 5000]
+"""
+
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+
+import src.database as database
+
+
+def seed_jobs(num_jobs):
+    """Create the schema and insert a batch of synthetic jobs."""
+    database.ensure_db_exists()
+    with database.db_cursor() as cursor:
+        cursor.executemany(
+            "INSERT INTO jobs (job_id, user_id, title, description) VALUES (?, ?, ?, ?)",
+            [(f"job-{i}", "bench_user", f"Job {i}", "Benchmark job") for i in range(num_jobs)]
+        )
+
+
+def job_exists_unpooled(job_id):
+    """The previous implementation: open and close a connection per lookup."""
+    conn = sqlite3.connect(database.DB_PATH)
+    cursor = conn.cursor()
+    cursor.execute("SELECT 1 FROM jobs WHERE job_id = ?", (job_id,))
+    exists = cursor.fetchone() is not None
+    conn.close()
+    return exists
+
+
+def time_lookups(lookup, num_jobs, num_lookups):
+    """Return the elapsed seconds for num_lookups calls of lookup."""
+    start = time.perf_counter()
+    for i in range(num_lookups):
+        lookup(f"job-{i % num_jobs}")
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark SQLite connection handling")
+    parser.add_argument("--jobs", type=int, default=1000, help="Number of jobs to seed")
+    parser.add_argument("--lookups", type=int, default=5000, help="Number of job_exists calls to time")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        database.DB_PATH = os.path.join(tmp_dir, "benchmark.db")
+        seed_jobs(args.jobs)
+
+        unpooled = time_lookups(job_exists_unpooled, args.jobs, args.lookups)
+        pooled = time_lookups(database.job_exists, args.jobs, args.lookups)
+        database.close_connection()
+
+    print(f"job_exists x {args.lookups} ({args.jobs} jobs in table)")
+    print(f"  connect per call: {unpooled:.3f}s ({unpooled / args.lookups * 1e6:.1f} us/call)")
+    print(f"  pooled connection: {pooled:.3f}s ({pooled / args.lookups * 1e6:.1f} us/call)")
+    print(f"  speedup: {unpooled / pooled:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Index Benchmark - Times the hot jobs and sessions queries with and without DB_INDEXES
+
+Runs against a throwaway SQLite file so the real database is never touched.
+
+Usage: python benchmark_indexes.py [--jobs 1000000] [--users 100] [--sessions 100000] [--repeat 20]
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+import src.database as database
+
+
+def seed(num_jobs, num_users, num_sessions):
+    """Create the schema and insert synthetic jobs and sessions spread over num_users users."""
+    database.ensure_db_exists()
+    random.seed(42)
+    with database.db_cursor() as cursor:
+        cursor.executemany(
+            "INSERT INTO jobs (job_id, user_id, title, job_type, score, description, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, datetime('now', ?))",
+            (
+                (f"job-{i}", f"user-{i % num_users}", f"Job {i}", random.choice(("Fixed", "Hourly")),
+                 None if random.random() < 0.2 else random.randint(1, 10), "Benchmark job",
+                 f"-{random.randint(0, 60 * 24 * 90)} minutes")
+                for i in range(num_jobs)
+            )
+        )
+        cursor.executemany(
+            "INSERT INTO user_sessions (session_id, user_id, expires_at) VALUES (?, ?, datetime('now', ?))",
+            (
+                (f"session-{i}", f"user-{i % num_users}", f"{random.randint(-24 * 30, 24)} hours")
+                for i in range(num_sessions)
+            )
+        )
+
+
+def drop_indexes():
+    """Drop DB_INDEXES so the queries run the way they did before them."""
+    with database.db_cursor() as cursor:
+        for name in database.DB_INDEXES:
+            cursor.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+def count_expired_sessions():
+    """cleanup_expired_sessions' predicate, counted so every repeat finds the same rows."""
+    with database.db_cursor() as cursor:
+        cursor.execute("SELECT COUNT(*) FROM user_sessions WHERE expires_at < datetime('now')")
+        return cursor.fetchone()[0]
+
+
+def count_high_scoring_jobs():
+    """get_system_stats' high scoring jobs count."""
+    with database.db_cursor() as cursor:
+        cursor.execute("SELECT COUNT(*) FROM jobs WHERE score >= 7")
+        return cursor.fetchone()[0]
+
+
+def build_queries():
+    """The queries to time, as (name, function) pairs taking a user id."""
+    return [
+        ("get_all_jobs(user)", database.get_all_jobs),
+        ("get_jobs_by_criteria(unprocessed)", lambda user_id: database.get_jobs_by_criteria(unprocessed_only=True, user_id=user_id)),
+        ("query_jobs(user, page of 20)", lambda user_id: database.query_jobs(user_id=user_id, limit=20, description_chars=200)),
+        ("count_jobs(user, unscored)", lambda user_id: database.count_jobs(user_id=user_id, scored=False)),
+        ("expired sessions", lambda user_id: count_expired_sessions()),
+        ("score >= 7 (system stats)", lambda user_id: count_high_scoring_jobs()),
+    ]
+
+
+def time_queries(queries, num_users, repeat):
+    """Return the mean seconds per call of each query, cycling through the users."""
+    timings = {}
+    for name, query in queries:
+        start = time.perf_counter()
+        for i in range(repeat):
+            query(f"user-{i % num_users}")
+        timings[name] = (time.perf_counter() - start) / repeat
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the jobs and sessions indexes")
+    parser.add_argument("--jobs", type=int, default=1_000_000, help="Number of jobs to seed")
+    parser.add_argument("--users", type=int, default=100, help="Number of users the jobs are spread over")
+    parser.add_argument("--sessions", type=int, default=100_000, help="Number of sessions to seed")
+    parser.add_argument("--repeat", type=int, default=20, help="Calls timed per query")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        database.DB_PATH = os.path.join(tmp_dir, "benchmark.db")
+        start = time.perf_counter()
+        seed(args.jobs, args.users, args.sessions)
+        print(f"Seeded {args.jobs} jobs and {args.sessions} sessions in {time.perf_counter() - start:.1f}s")
+
+        queries = build_queries()
+        drop_indexes()
+        without_indexes = time_queries(queries, args.users, args.repeat)
+
+        start = time.perf_counter()
+        with database.db_cursor() as cursor:
+            database.create_indexes(cursor)
+        print(f"Created {len(database.DB_INDEXES)} indexes in {time.perf_counter() - start:.1f}s\n")
+        with_indexes = time_queries(queries, args.users, args.repeat)
+        database.close_connection()
+
+    print(f"{'query':<36}{'no indexes':>14}{'indexes':>14}{'speedup':>10}")
+    for name, _ in queries:
+        before, after = without_indexes[name], with_indexes[name]
+        print(f"{name:<36}{before * 1000:>12.2f}ms{after * 1000:>12.2f}ms{before / after:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
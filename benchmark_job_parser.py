@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Job Parser Benchmark - Compares DOM parsing of job pages with LLM extraction
+
+Runs over the job page fixtures in ./fixtures/upwork. The parser is timed
+directly; for the LLM path the prompt tokens sent per page are counted, and
+with --llm the real gpt-4o-mini extraction is also timed (needs OPENAI_API_KEY).
+
+Usage: python benchmark_job_parser.py [--iterations 200] [--llm]
+"""
+
+import argparse
+import asyncio
+import glob
+import os
+import time
+
+import tiktoken
+from bs4 import BeautifulSoup
+from dotenv import load_dotenv
+
+from src.job_page_parser import parse_job_page
+from src.prompts import SCRAPER_PROMPT
+from src.structured_outputs import JobInformation
+from src.utils import ainvoke_llm, convert_html_to_markdown
+
+JOB_PAGES_GLOB = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "fixtures", "upwork", "freelance-jobs", "apply", "*", "index.html"
+)
+
+
+def load_pages():
+    """Read every job page fixture."""
+    pages = []
+    for path in sorted(glob.glob(JOB_PAGES_GLOB)):
+        with open(path, encoding="utf-8") as f:
+            pages.append(f.read())
+    return pages
+
+
+def build_llm_message(html_content):
+    """Build the user message the LLM path would send for a page."""
+    main_content = BeautifulSoup(html_content, "html.parser").find("main", id="main")
+    markdown = convert_html_to_markdown(main_content)
+    return f"Scrape all the relevant job details from the content of this page:\n\n{markdown}"
+
+
+def get_token_counter():
+    """Count tokens with tiktoken, or estimate ~4 characters per token if its encoding can't be loaded."""
+    try:
+        encoding = tiktoken.encoding_for_model("gpt-4o-mini")
+        return lambda text: len(encoding.encode(text))
+    except Exception:
+        print("tiktoken encoding unavailable, estimating tokens as characters / 4")
+        return lambda text: len(text) // 4
+
+
+def benchmark_parser(pages, iterations):
+    """Return (seconds per page, pages parsed without fallback)."""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        results = [parse_job_page(page) for page in pages]
+    elapsed = time.perf_counter() - start
+    return elapsed / (iterations * len(pages)), sum(1 for result in results if result is not None)
+
+
+async def benchmark_llm(pages):
+    """Return seconds per page for real LLM extraction."""
+    start = time.perf_counter()
+    for page in pages:
+        await ainvoke_llm(
+            system_prompt=SCRAPER_PROMPT,
+            user_message=build_llm_message(page),
+            model="openai/gpt-4o-mini",
+            response_format=JobInformation,
+        )
+    return (time.perf_counter() - start) / len(pages)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark DOM parsing against LLM extraction")
+    parser.add_argument("--iterations", type=int, default=200, help="Parser passes over the fixtures")
+    parser.add_argument("--llm", action="store_true", help="Also time real LLM calls")
+    args = parser.parse_args()
+
+    pages = load_pages()
+    count_tokens = get_token_counter()
+    prompt_tokens = [count_tokens(SCRAPER_PROMPT) + count_tokens(build_llm_message(page)) for page in pages]
+
+    parser_seconds, parsed = benchmark_parser(pages, args.iterations)
+    print(f"{len(pages)} job page fixtures")
+    print(f"  DOM parser: {parser_seconds * 1000:.2f} ms/page, 0 tokens, {parsed}/{len(pages)} parsed without fallback")
+    print(f"  LLM path: ~{sum(prompt_tokens) / len(pages):.0f} prompt tokens/page (plus structured output)")
+
+    if args.llm:
+        load_dotenv()
+        llm_seconds = asyncio.run(benchmark_llm(pages))
+        print(f"  LLM path: {llm_seconds * 1000:.0f} ms/page")
+        print(f"  speedup: {llm_seconds / parser_seconds:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Scraper Benchmark - Runs the Upwork scraper offline against local HTML fixtures
+
+Serves ./fixtures/upwork over a local HTTP server and times repeated small
+scrape runs, comparing a cold browser launch per run with the shared pool,
+and full page loads with lean fetch mode. Only page loading is timed, no
+LLM calls are made.
+
+Usage: python benchmark_scraper.py [--runs 5]
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from functools import partial
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+import src.database as database
+from src.browser_pool import BrowserPool
+from src.resource_blocking import ResourceBlocker
+from src.scraper import UpworkJobScraper
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "upwork")
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    """Static file handler that doesn't log every request."""
+
+    def log_message(self, format, *args):
+        pass
+
+
+@contextmanager
+def serve_fixtures(directory=FIXTURES_DIR):
+    """Serve the fixture site on a free localhost port and yield its base URL."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), partial(QuietHandler, directory=directory))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+async def scrape_pages(scraper, search_query="AI agent developer"):
+    """Load the search page and every job page it links to."""
+    url = f"{scraper.base_url}/nx/search/jobs?q={search_query}"
+    async with scraper.browser_pool.lease() as page:
+        await page.goto(url)
+        html_content = await page.content()
+
+    links = scraper.extract_jobs_urls(html_content)
+    await asyncio.gather(*[scraper.fetch_job_page(link) for link in links])
+    return len(links)
+
+
+async def benchmark_cold(base_url, runs):
+    """Launch and close a new browser for every run, like the old scraper."""
+    start = time.perf_counter()
+    for _ in range(runs):
+        scraper = UpworkJobScraper(base_url=base_url)
+        try:
+            await scrape_pages(scraper)
+        finally:
+            await scraper.close()
+    return time.perf_counter() - start
+
+
+async def benchmark_pooled(base_url, runs):
+    """Reuse one browser pool across every run."""
+    scraper = UpworkJobScraper(base_url=base_url)
+    pool = scraper.browser_pool
+    start = time.perf_counter()
+    try:
+        for _ in range(runs):
+            await scrape_pages(scraper)
+    finally:
+        elapsed = time.perf_counter() - start
+        await scraper.close()
+    print(f"  pool stats: {pool.stats}")
+    print(f"  job page readiness: {scraper.readiness.summary()}")
+    return elapsed
+
+
+async def measure_fetch_mode(base_url, runs, resource_blocker):
+    """Scrape the fixtures with the given router, returning (seconds, router stats)."""
+    pool = BrowserPool(size=5, resource_blocker=resource_blocker)
+    scraper = UpworkJobScraper(base_url=base_url, browser_pool=pool)
+    try:
+        # Warm the browser up so only page loading is measured
+        await scrape_pages(scraper)
+        resource_blocker.reset_stats()
+        start = time.perf_counter()
+        for _ in range(runs):
+            await scrape_pages(scraper)
+        elapsed = time.perf_counter() - start
+    finally:
+        await scraper.close()
+    return elapsed, resource_blocker.stats
+
+
+async def benchmark_lean_fetch(base_url, runs):
+    """Compare loading every resource with lean fetch mode."""
+    # An empty router blocks nothing but still counts bytes
+    full_seconds, full_stats = await measure_fetch_mode(base_url, runs, ResourceBlocker([], [], []))
+    lean_seconds, lean_stats = await measure_fetch_mode(base_url, runs, ResourceBlocker(allowed_domains=["127.0.0.1"]))
+    full_bytes = full_stats["bytes_loaded"]
+    lean_bytes = lean_stats["bytes_loaded"]
+
+    print(f"  full fetch: {full_seconds:.2f}s, {full_bytes} bytes")
+    print(f"  lean fetch: {lean_seconds:.2f}s, {lean_bytes} bytes, blocked {lean_stats['blocked_by_type']}")
+    print(f"  saved per run: {(full_bytes - lean_bytes) / runs:.0f} bytes, {(full_seconds - lean_seconds) / runs:.2f}s")
+
+
+async def main(runs):
+    with tempfile.TemporaryDirectory() as tmp_dir, serve_fixtures() as base_url:
+        database.DB_PATH = os.path.join(tmp_dir, "benchmark.db")
+        database.ensure_db_exists()
+
+        print(f"Serving fixtures at {base_url}, {runs} scrape runs each")
+        cold = await benchmark_cold(base_url, runs)
+        pooled = await benchmark_pooled(base_url, runs)
+        print(f"  cold launch per run: {cold:.2f}s ({cold / runs:.2f}s/run)")
+        print(f"  shared browser pool: {pooled:.2f}s ({pooled / runs:.2f}s/run)")
+        print(f"  speedup: {cold / pooled:.1f}x")
+
+        print("Lean fetch mode")
+        await benchmark_lean_fetch(base_url, runs)
+        database.close_connection()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the scraper against local fixtures")
+    parser.add_argument("--runs", type=int, default=5, help="Number of scrape runs per mode")
+    args = parser.parse_args()
+    asyncio.run(main(args.runs))
@@ -1,3 +1,4 @@
+import os
 import asyncio
 from dotenv import load_dotenv
 from src.utils import read_text_file
@@ -15,7 +16,18 @@ if __name__ == "__main__":
 
     # run automation
     automation = UpworkAutomation(profile)
-    asyncio.run(automation.run(job_title=job_title))
+
+    async def run_automation():
+        try:
+            if os.getenv("STREAMING_PIPELINE", "false").lower() == "true":
+                # Score and generate while scraping is still in progress
+                await automation.run_streaming(job_title=job_title)
+            else:
+                await automation.run(job_title=job_title)
+        finally:
+            await automation.close()
+
+    asyncio.run(run_automation())
     
     # Visualize automation graph as a PNG image
     # output_path = "./automation_graph.png"  # Specify the desired output path
@@ -22,7 +22,7 @@ import hashlib
 import sys
 from datetime import datetime
 from typing import Dict, Any, Optional
-from src.database import ensure_db_exists, save_job, get_all_jobs
+from src.database import ensure_db_exists, save_job, bulk_save_jobs, get_all_jobs
 from src.structured_outputs import JobType
 
 def generate_job_id(title: str, company: str = "", link: str = "") -> str:
@@ -315,13 +315,9 @@ def main():
     elif args.import_json:
         jobs = import_from_json(args.import_json)
         if jobs:
-            saved_count = 0
-            for job in jobs:
-                if save_job(job):
-                    saved_count += 1
-                    print(f"✅ Saved: {job['title']}")
-                else:
-                    print(f"⏭️  Skipped (already exists): {job['title']}")
+            saved_count, skipped_count = bulk_save_jobs(jobs)
+            if skipped_count:
+                print(f"⏭️  Skipped {skipped_count} jobs (already exist)")
             print(f"\n📊 Successfully imported {saved_count} out of {len(jobs)} jobs")
         else:
             print("❌ No valid jobs found in JSON file")
@@ -329,13 +325,9 @@ def main():
     elif args.import_csv:
         jobs = import_from_csv(args.import_csv)
         if jobs:
-            saved_count = 0
-            for job in jobs:
-                if save_job(job):
-                    saved_count += 1
-                    print(f"✅ Saved: {job['title']}")
-                else:
-                    print(f"⏭️  Skipped (already exists): {job['title']}")
+            saved_count, skipped_count = bulk_save_jobs(jobs)
+            if skipped_count:
+                print(f"⏭️  Skipped {skipped_count} jobs (already exist)")
             print(f"\n📊 Successfully imported {saved_count} out of {len(jobs)} jobs")
         else:
             print("❌ No valid jobs found in CSV file")
@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+"""
+Migrate Applications - Imports the legacy markdown application files into the database
+
+Applications used to be appended to ./data/cover_letter.md and
+./data/users/<id>/cover_letters.md. This imports them into the applications
+table, reading only what was appended since the last run. The Applications
+page runs the same import on every view.
+
+Usage: python migrate_applications.py [--data-dir ./data]
+"""
+
+import argparse
+
+from src.database import ensure_db_exists
+from src.applications_migration import LEGACY_DATA_DIR, migrate_legacy_applications
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import legacy markdown applications into the database")
+    parser.add_argument("--data-dir", default=LEGACY_DATA_DIR, help="Directory holding the markdown files")
+    args = parser.parse_args()
+
+    ensure_db_exists()
+    imported_count = migrate_legacy_applications(args.data_dir)
+    print(f"✅ Imported {imported_count} applications")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,16 +10,18 @@ Usage: python process_manual_jobs.py
 """
 
 import asyncio
-from datetime import datetime
 from colorama import Fore, Style
 from dotenv import load_dotenv
 
-from src.utils import read_text_file, format_scraped_job_for_scoring, convert_jobs_matched_to_string_list, COVER_LETTERS_FILE
+from src.utils import read_text_file, format_scraped_job_for_scoring, index_scores_by_id, convert_jobs_matched_to_string_list, convert_job_application_to_dict
 from src.structured_outputs import JobScores, JobApplication
-from src.database import ensure_db_exists, get_all_jobs, save_jobs
+from src.database import ensure_db_exists, get_all_jobs, update_job_scores, save_applications
 from src.nodes import CreateJobApplicationNodes
 from src.prompts import SCORE_JOBS_PROMPT
 from src.utils import ainvoke_llm
+from src.prompt_assembly import assemble_prompt, prompt_cache_stats
+from src.llm_cache import get_llm_response_cache
+from src.llm_scheduler import get_llm_scheduler
 
 # Load environment variables from a .env file
 load_dotenv()
@@ -27,7 +29,7 @@ load_dotenv()
 class ManualJobProcessor:
     """Processes manually added jobs through the application workflow."""
     
-    def __init__(self, profile, batch_size=3, min_score=7):
+    def __init__(self, profile, batch_size=3, min_score=7, bypass_cache=False):
         """
         Initialize the manual job processor.
         
@@ -35,11 +37,13 @@ class ManualJobProcessor:
             profile: User profile information for job applications
             batch_size: Number of jobs to process in parallel
             min_score: Minimum score threshold for processing jobs
+            bypass_cache: Generate fresh applications instead of reusing cached LLM responses
         """
         self.profile = profile
         self.batch_size = batch_size
         self.min_score = min_score
-        self.job_application_nodes = CreateJobApplicationNodes(profile)
+        self.bypass_cache = bypass_cache
+        self.job_application_nodes = CreateJobApplicationNodes(profile, bypass_cache=bypass_cache)
         ensure_db_exists()
 
     def get_unprocessed_jobs(self):
@@ -62,24 +66,35 @@ class ManualJobProcessor:
 
         # Format jobs for scoring
         jobs_list = format_scraped_job_for_scoring(jobs)
-        score_jobs_prompt = SCORE_JOBS_PROMPT.format(profile=self.profile)
+        system_prompt, user_message = assemble_prompt(
+            SCORE_JOBS_PROMPT,
+            str(jobs_list),
+            request="Evaluate these Jobs:",
+            profile=self.profile
+        )
         
         results = await ainvoke_llm(
-            system_prompt=score_jobs_prompt,
-            user_message=f"Evaluate these Jobs:\n\n{jobs_list}",
+            system_prompt=system_prompt,
+            user_message=user_message,
             model="openai/gpt-4o-mini",
-            response_format=JobScores
+            response_format=JobScores,
+            priority="scoring"
         )
         
         job_scores = results.model_dump()
         return job_scores["scores"]
 
     def add_scores_to_jobs(self, jobs, scores):
-        """Add scores to job objects."""
+        """Add scores to job objects, matched by the id each job was scored under."""
+        scores_by_id = index_scores_by_id(scores)
         scored_jobs = []
-        for job, score_data in zip(jobs, scores):
+        for index, job in enumerate(jobs):
+            if str(index) not in scores_by_id:
+                # Left unscored, so the next run picks it up again
+                print(f"No score returned for job '{job.get('title', 'No Title')}'")
+                continue
             job_copy = dict(job)
-            job_copy['score'] = score_data['score']
+            job_copy['score'] = scores_by_id[str(index)]
             scored_jobs.append(job_copy)
         return scored_jobs
 
@@ -195,33 +210,13 @@ class ManualJobProcessor:
         
         return valid_applications
 
-    def save_applications_to_file(self, applications):
-        """Save generated applications to the cover letters file."""
+    def save_applications(self, applications):
+        """Save generated applications to the applications table."""
         if not applications:
             return
             
         print(Fore.YELLOW + f"----- Saving {len(applications)} Job Applications -----\n" + Style.RESET_ALL)
-        
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        
-        with open(COVER_LETTERS_FILE, "a", encoding="utf-8") as file:
-            file.write("\n" + "=" * 80 + "\n")
-            file.write(f"MANUAL JOBS PROCESSING - DATE: {timestamp}\n")
-            file.write("=" * 80 + "\n\n")
-            
-            for i, application in enumerate(applications, 1):
-                file.write(f"APPLICATION #{i}\n")
-                file.write("-" * 40 + "\n\n")
-                
-                file.write("### Job Description\n")
-                file.write(application.job_description + "\n\n")
-                
-                file.write("### Cover Letter\n")
-                file.write(application.cover_letter + "\n\n")
-                
-                file.write("### Interview Preparation\n")
-                file.write(application.interview_preparation + "\n\n")
-                file.write("-" * 80 + "\n\n")
+        save_applications([convert_job_application_to_dict(application) for application in applications])
 
     async def run(self):
         """Run the complete manual job processing workflow."""
@@ -240,7 +235,7 @@ class ManualJobProcessor:
         
         # Step 3: Add scores to jobs and save back to database
         scored_jobs = self.add_scores_to_jobs(jobs, scores)
-        save_jobs(scored_jobs)  # Update database with scores
+        update_job_scores(scored_jobs)  # Update database with scores
         
         # Display scores
         print(Fore.CYAN + "----- Job Scores -----" + Style.RESET_ALL)
@@ -266,15 +261,20 @@ class ManualJobProcessor:
             applications = await self.process_jobs_batch(batch)
             all_applications.extend(applications)
         
-        # Step 6: Save applications to file
-        self.save_applications_to_file(all_applications)
+        # Step 6: Save applications to the database
+        self.save_applications(all_applications)
         
         # Summary
         print(Fore.GREEN + "\n----- Processing Complete! -----" + Style.RESET_ALL)
         print(f"✅ Processed: {len(jobs)} jobs")
         print(f"✅ High scoring (>= {self.min_score}): {len(high_scoring_jobs)} jobs") 
         print(f"✅ Applications generated: {len(all_applications)}")
-        print(f"✅ Applications saved to: {COVER_LETTERS_FILE}")
+        print(f"✅ Applications saved to the applications table, see the Applications page")
+        llm_cache = get_llm_response_cache()
+        if llm_cache is not None:
+            print(f"✅ LLM response cache: {llm_cache.summary()}")
+        print(f"✅ LLM scheduler: {get_llm_scheduler().summary()}")
+        print(f"✅ Provider prompt cache: {prompt_cache_stats.summary()}")
 
 async def main():
     """Main function to run manual job processing."""
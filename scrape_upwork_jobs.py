@@ -13,7 +13,14 @@ if __name__ == "__main__":
     print(f"Number of jobs to scrape: {number_of_jobs}")
     
     scraper = UpworkJobScraper()
-    result = asyncio.run(scraper.scrape_upwork_data(search_query, number_of_jobs))
+
+    async def scrape():
+        try:
+            return await scraper.scrape_upwork_data(search_query, number_of_jobs)
+        finally:
+            await scraper.close()
+
+    result = asyncio.run(scrape())
     print(f"Result: {result}")
     print(f"Found {len(result)} jobs")
     
@@ -0,0 +1,154 @@
+import asyncio
+import os
+from colorama import Fore, Style
+
+DEFAULT_APPLICATION_TIMEOUT_SECONDS = 300
+
+
+def get_application_timeout():
+    """
+    Seconds one job application may take, from APPLICATION_TIMEOUT_SECONDS.
+    """
+    return float(os.getenv("APPLICATION_TIMEOUT_SECONDS", DEFAULT_APPLICATION_TIMEOUT_SECONDS))
+
+
+class ApplicationExecutor:
+    """
+    Runs the create_job_application_content subgraph over a queue of jobs,
+    keeping a fixed number of generations in flight: as soon as one job
+    finishes the next one starts, so a slow cover letter only holds its own slot.
+
+    One run at a time: run() starts a new stats window and raises if another
+    run is still in progress. generate() keeps no state and can be called at any time.
+    """
+
+    def __init__(self, application_graph, max_in_flight=5, timeout_seconds=None):
+        """
+        Args:
+            application_graph: The compiled create_job_application_content subgraph.
+            max_in_flight (int): Applications generated at the same time. Defaults to 5.
+            timeout_seconds (float): Time one application may take before it is cancelled,
+                defaults to APPLICATION_TIMEOUT_SECONDS.
+        """
+        self.application_graph = application_graph
+        self.max_in_flight = max(1, max_in_flight)
+        self.timeout_seconds = timeout_seconds or get_application_timeout()
+        self.in_flight = {}
+        self.cancelled = False
+        self.running = False
+        self.reset_stats()
+
+    def reset_stats(self):
+        """
+        Start a new stats window.
+        """
+        self.stats = {"completed": 0, "failed": 0, "timed_out": 0, "cancelled": 0}
+
+    async def generate(self, job_description):
+        """
+        Generate the application of one job, cancelling it when it runs past the timeout.
+
+        Args:
+            job_description (str): The job, formatted for the LLM.
+
+        Returns:
+            list: The JobApplication objects of the job.
+
+        Raises:
+            asyncio.TimeoutError: When the job takes longer than timeout_seconds.
+        """
+        result = await asyncio.wait_for(
+            self.application_graph.ainvoke({"job_description": job_description}),
+            timeout=self.timeout_seconds,
+        )
+        return result["applications"]
+
+    async def run(self, job_descriptions, on_applications=None):
+        """
+        Generate the applications of every job, max_in_flight at a time.
+
+        Args:
+            job_descriptions (list): The jobs, formatted for the LLM.
+            on_applications (callable): Called with the applications of each job as soon as it finishes.
+
+        Returns:
+            list: The applications of the jobs that finished, in completion order.
+
+        Raises:
+            RuntimeError: When another run of this executor is still in progress.
+        """
+        if self.running:
+            raise RuntimeError("ApplicationExecutor is already running, runs can't overlap")
+        self.running = True
+        self.cancelled = False
+        self.reset_stats()
+        pending = iter(job_descriptions)
+        applications = []
+
+        def start_next():
+            job_description = next(pending, None)
+            if job_description is None or self.cancelled:
+                return
+            task = asyncio.create_task(self.generate(job_description))
+            self.in_flight[task] = job_description
+
+        try:
+            for _ in range(self.max_in_flight):
+                start_next()
+            while self.in_flight:
+                done, _ = await asyncio.wait(self.in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    job_description = self.in_flight.pop(task)
+                    job_applications = self.collect(task, job_description)
+                    if job_applications:
+                        applications.extend(job_applications)
+                        if on_applications:
+                            on_applications(job_applications)
+                    start_next()
+        finally:
+            # The run itself was cancelled or failed, don't leave generations running
+            if self.in_flight:
+                self.cancel()
+                await asyncio.gather(*self.in_flight, return_exceptions=True)
+                self.stats["cancelled"] += len(self.in_flight)
+                self.in_flight.clear()
+            self.running = False
+
+        return applications
+
+    def collect(self, task, job_description):
+        """
+        Record the outcome of a finished generation and return its applications, if any.
+        """
+        title = job_description.splitlines()[0] if job_description else ""
+        if task.cancelled():
+            self.stats["cancelled"] += 1
+            return None
+        error = task.exception()
+        if isinstance(error, asyncio.TimeoutError):
+            print(Fore.RED + f"Application timed out after {self.timeout_seconds:.0f}s: {title}" + Style.RESET_ALL)
+            self.stats["timed_out"] += 1
+            return None
+        if error is not None:
+            print(Fore.RED + f"Error generating application: {title}: {error}" + Style.RESET_ALL)
+            self.stats["failed"] += 1
+            return None
+        self.stats["completed"] += 1
+        return task.result()
+
+    def cancel(self):
+        """
+        Stop starting new jobs and cancel the generations in flight.
+        """
+        self.cancelled = True
+        for task in self.in_flight:
+            task.cancel()
+
+    def summary(self):
+        """
+        Describe the current stats window.
+        """
+        return (
+            f"{self.stats['completed']} completed, {self.stats['failed']} failed, "
+            f"{self.stats['timed_out']} timed out, {self.stats['cancelled']} cancelled"
+        )
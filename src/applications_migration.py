@@ -0,0 +1,199 @@
+import glob
+import mmap
+import os
+import re
+from src.database import get_applications_file_import, import_applications_file, update_applications_file_stat
+from src.utils import get_title_from_job_description
+
+# Markdown files applications were appended to before the applications table
+LEGACY_DATA_DIR = "./data"
+LEGACY_GLOBAL_FILE = "cover_letter.md"
+LEGACY_USER_FILE = "cover_letters.md"
+
+SECTION_HEADINGS = {
+    "### Job Description": "job_description",
+    "### Cover Letter": "cover_letter",
+    "### Interview Preparation": "interview_prep",
+}
+# Slashes after each application, dashes in the manual jobs processor's file
+APPLICATION_SEPARATOR = re.compile(r"^(?:/{20,}|-{40,})[ \t]*$", re.MULTILINE)
+# The same, to find the last separator in the raw bytes of a file
+APPLICATION_SEPARATOR_BYTES = re.compile(rb"^(?:/{20,}|-{40,})[ \t]*$", re.MULTILINE)
+HEADER_SEPARATOR = re.compile(r"^={20,}$")
+
+
+def parse_score(value):
+    """Read a score written as "8/10" or "8.5"."""
+    try:
+        return float(value.split("/")[0].strip())
+    except ValueError:
+        return None
+
+
+def parse_applications_markdown(content, header=None):
+    """
+    Parse the applications appended to a markdown file.
+
+    Handles the layouts that were written: the graph's and the manual jobs
+    processor's (a DATE header, then the job description starting with
+    "# Title:") and the user processor's (DATE and USER headers, then title,
+    score and job id lines before the sections). Applications are separated
+    by a line of slashes or dashes.
+
+    Args:
+        content (str): The file content, or the part of it after an earlier parse.
+        header (dict): The DATE and USER header in effect where content starts, as
+            "date" and "user_id". Updated with the header in effect where it ends.
+
+    Returns:
+        list: Application dicts with the applications table columns, in file order.
+    """
+    if header is None:
+        header = {}
+    applications = []
+    date = header.get("date")
+    user_id = header.get("user_id")
+
+    for block in APPLICATION_SEPARATOR.split(content):
+        application = {}
+        parts = {}
+        section = None
+
+        for line in block.splitlines():
+            stripped = line.strip()
+            if stripped in SECTION_HEADINGS:
+                section = SECTION_HEADINGS[stripped]
+                parts[section] = []
+            elif HEADER_SEPARATOR.match(stripped):
+                section = None
+            elif section:
+                parts[section].append(line)
+            elif "DATE:" in stripped:
+                date = stripped.split("DATE:", 1)[1].strip()
+                user_id = None
+            elif stripped.startswith("USER:"):
+                user_id = stripped[len("USER:"):].strip()
+            elif stripped.startswith("User ID:"):
+                application["user_id"] = stripped[len("User ID:"):].strip()
+            elif stripped.startswith("# Title:"):
+                application["title"] = stripped[len("# Title:"):].strip()
+            elif stripped.startswith("Score:"):
+                application["score"] = parse_score(stripped[len("Score:"):])
+            elif stripped.startswith("Job ID:"):
+                application["job_id"] = stripped[len("Job ID:"):].strip()
+
+        for name, lines in parts.items():
+            application[name] = "\n".join(lines).strip()
+        if not application.get("cover_letter") and not application.get("job_description"):
+            continue
+
+        if "title" not in application:
+            # The graph wrote the title as the first line of the job description
+            application["title"] = get_title_from_job_description(application.get("job_description"))
+        application.setdefault("user_id", user_id)
+        application["created_at"] = date
+        applications.append(application)
+
+    header["date"] = date
+    header["user_id"] = user_id
+    return applications
+
+
+def read_file_tail(file_path, offset):
+    """
+    Read a file from a byte offset through a memory map, so the part
+    before the offset is never read.
+    """
+    with open(file_path, "rb") as f:
+        if os.fstat(f.fileno()).st_size <= offset:
+            return b""
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return mapped[offset:]
+
+
+def migrate_applications_file(file_path, user_id=None, skip_user_ids=None):
+    """
+    Import the applications added to a markdown file since it was last imported.
+
+    The import state keeps the byte offset parsing stopped at, so a file that
+    grew is only read from there, and its size and mtime, so an unchanged file
+    costs one stat call.
+
+    Args:
+        file_path (str): The markdown file.
+        user_id (str): Owner of every application in the file, read from the file when None.
+        skip_user_ids (set): Users whose applications are imported from another file.
+
+    Returns:
+        int: Number of applications imported.
+    """
+    if not os.path.exists(file_path):
+        return 0
+
+    stat = os.stat(file_path)
+    previous = get_applications_file_import(file_path)
+    if previous and previous["file_size"] == stat.st_size and previous["file_mtime"] == stat.st_mtime:
+        return 0
+
+    start_bytes = previous["parsed_bytes"] if previous else 0
+    if stat.st_size < start_bytes:
+        print(f"{file_path} is smaller than when it was imported, skipping it")
+        update_applications_file_stat(file_path, stat.st_size, stat.st_mtime)
+        return 0
+
+    # Stop after the last complete application, the next one may still be written.
+    # Only the bytes up to its separator are decoded, as the tail can end in the
+    # middle of a multibyte character.
+    tail = read_file_tail(file_path, start_bytes)
+    last_separator = None
+    for last_separator in APPLICATION_SEPARATOR_BYTES.finditer(tail):
+        pass
+    if last_separator is None:
+        if previous:
+            update_applications_file_stat(file_path, stat.st_size, stat.st_mtime)
+        return 0
+    content = tail[:last_separator.end()].decode("utf-8", errors="replace")
+
+    header = {"date": previous["header_date"], "user_id": previous["header_user_id"]} if previous else {}
+    applications = parse_applications_markdown(content, header)
+    if skip_user_ids:
+        applications = [app for app in applications if app.get("user_id") not in skip_user_ids]
+
+    import_state = {
+        "start_bytes": start_bytes,
+        "parsed_bytes": start_bytes + last_separator.end(),
+        "file_size": stat.st_size,
+        "file_mtime": stat.st_mtime,
+        "header_date": header["date"],
+        "header_user_id": header["user_id"],
+    }
+    imported_count = import_applications_file(file_path, applications, import_state, user_id)
+    if imported_count:
+        print(f"Imported {imported_count} applications from {file_path}")
+    return imported_count
+
+
+def migrate_legacy_applications(data_dir=LEGACY_DATA_DIR):
+    """
+    Import every legacy markdown applications file into the applications table,
+    picking up applications appended since the last import.
+
+    Per-user files are imported for their user. The global file repeated the
+    applications of every user, so from it only the ones without a per-user
+    file (e.g. written by the command line graph) are imported.
+
+    Returns:
+        int: Number of applications imported.
+    """
+    imported_count = 0
+    user_ids_with_files = set()
+
+    for file_path in sorted(glob.glob(os.path.join(data_dir, "users", "*", LEGACY_USER_FILE))):
+        user_id = os.path.basename(os.path.dirname(file_path))
+        user_ids_with_files.add(user_id)
+        imported_count += migrate_applications_file(file_path, user_id=user_id)
+
+    imported_count += migrate_applications_file(
+        os.path.join(data_dir, LEGACY_GLOBAL_FILE), skip_user_ids=user_ids_with_files
+    )
+    return imported_count
@@ -0,0 +1,203 @@
+import asyncio
+import os
+import signal
+from contextlib import asynccontextmanager
+from playwright.async_api import async_playwright
+from src.utils import get_playwright_browser_context
+
+
+class PooledContext:
+    """
+    A browser context owned by the pool, with the number of pages it has served.
+    """
+
+    def __init__(self, context):
+        self.context = context
+        self.pages_served = 0
+
+
+class BrowserPool:
+    """
+    Keeps one Playwright browser alive and hands out pages from a fixed set of
+    reusable browser contexts, so scrape runs don't pay for a cold launch.
+    """
+
+    def __init__(self, size=5, max_pages_per_context=50, headless=True, resource_blocker=None):
+        """
+        Initializes the pool. The browser itself is launched lazily on first lease.
+
+        Args:
+            size (int): Maximum number of contexts (and concurrent leases). Defaults to 5.
+            max_pages_per_context (int): Pages a context serves before it is recycled. Defaults to 50.
+            headless (bool): Whether to run the browser headless. Defaults to True.
+            resource_blocker (ResourceBlocker): Optional request router installed on every context.
+        """
+        self.size = size
+        self.max_pages_per_context = max_pages_per_context
+        self.headless = headless
+        self.resource_blocker = resource_blocker
+        self.playwright = None
+        self.browser = None
+        self.loop = None
+        self.slots = None
+        self.start_lock = None
+        self.stats = {"browser_launches": 0, "contexts_created": 0, "contexts_recycled": 0, "pages_served": 0}
+
+    def is_healthy(self):
+        """
+        Check that the browser is running and belongs to the current event loop.
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return False
+        return (
+            self.browser is not None
+            and self.loop is loop
+            and self.browser.is_connected()
+        )
+
+    async def start(self):
+        """
+        Launch the browser if it is not already running and healthy.
+        """
+        loop = asyncio.get_running_loop()
+        if self.loop is not loop:
+            # Playwright objects are bound to the loop that created them,
+            # anything left from a previous asyncio.run() is unusable here.
+            self._release_from_other_loop()
+            self.loop = loop
+            self.start_lock = asyncio.Lock()
+            self.slots = None
+
+        async with self.start_lock:
+            if self.is_healthy():
+                return
+            await self._shutdown()
+            self.playwright = await async_playwright().start()
+            self.browser = await self.playwright.firefox.launch(headless=self.headless)
+            self.stats["browser_launches"] += 1
+
+            # Each slot holds an idle PooledContext, or None until one is needed
+            self.slots = asyncio.Queue()
+            for _ in range(self.size):
+                self.slots.put_nowait(None)
+
+    @staticmethod
+    async def _close_browser(browser, playwright):
+        """
+        Close a browser and its Playwright driver, ignoring errors from dead processes.
+        """
+        if browser is not None:
+            try:
+                await browser.close()
+            except Exception as e:
+                print(f"Error closing browser: {e}")
+        if playwright is not None:
+            try:
+                await playwright.stop()
+            except Exception as e:
+                print(f"Error stopping playwright: {e}")
+
+    async def _shutdown(self):
+        """
+        Close the browser and Playwright driver of the current event loop.
+        """
+        browser, playwright = self.browser, self.playwright
+        self.browser = None
+        self.playwright = None
+        await self._close_browser(browser, playwright)
+
+    def _release_from_other_loop(self):
+        """
+        Drop a browser launched on another event loop, e.g. by an earlier Streamlit rerun,
+        without leaking its processes.
+
+        Its Playwright objects can only be awaited on the loop that created them, so the
+        shutdown is scheduled there while that loop still runs. Otherwise the Playwright
+        driver process is terminated, which takes the browser it launched down with it.
+        """
+        browser, playwright, loop = self.browser, self.playwright, self.loop
+        self.browser = None
+        self.playwright = None
+        self.slots = None
+        if playwright is None:
+            return
+
+        if loop is not None and loop.is_running():
+            print("Closing the browser on the event loop that launched it")
+            asyncio.run_coroutine_threadsafe(self._close_browser(browser, playwright), loop)
+            return
+
+        try:
+            driver_pid = playwright._impl_obj._connection._transport._proc.pid
+            os.kill(driver_pid, signal.SIGTERM)
+            print(f"Terminated the Playwright driver (pid {driver_pid}) left by a closed event loop")
+        except (AttributeError, ProcessLookupError) as e:
+            print(f"Could not terminate the Playwright driver left by a closed event loop: {e}")
+
+    async def close(self):
+        """
+        Close every context and the browser, whichever event loop launched it.
+        """
+        if self.loop is not None and self.loop is asyncio.get_running_loop():
+            await self._shutdown()
+        else:
+            self._release_from_other_loop()
+        self.slots = None
+
+    async def _recycle(self, pooled):
+        """
+        Close a context that is worn out or may be in a bad state.
+        """
+        self.stats["contexts_recycled"] += 1
+        try:
+            await pooled.context.close()
+        except Exception as e:
+            print(f"Error closing browser context: {e}")
+
+    @asynccontextmanager
+    async def lease(self):
+        """
+        Lease a fresh page from a pooled context. Waits while all contexts are busy.
+
+        The page is closed when the block exits; the context goes back to the pool,
+        or is recycled if it has served too many pages or the block raised.
+        """
+        if not self.is_healthy():
+            await self.start()
+
+        slots = self.slots
+        pooled = await slots.get()
+        page = None
+        failed = False
+        try:
+            if pooled is None:
+                context = await get_playwright_browser_context(self.browser)
+                if self.resource_blocker is not None:
+                    await self.resource_blocker.install(context)
+                pooled = PooledContext(context)
+                self.stats["contexts_created"] += 1
+
+            page = await pooled.context.new_page()
+            pooled.pages_served += 1
+            self.stats["pages_served"] += 1
+            yield page
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            if page is not None:
+                try:
+                    await page.close()
+                except Exception:
+                    failed = True
+
+            if pooled is not None and (
+                failed
+                or pooled.pages_served >= self.max_pages_per_context
+                or not self.is_healthy()
+            ):
+                await self._recycle(pooled)
+                pooled = None
+            slots.put_nowait(pooled)
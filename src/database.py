@@ -2,52 +2,168 @@ import sqlite3
 import os
 import hashlib
 import secrets
+import threading
+from contextlib import contextmanager
 from pathlib import Path
 from datetime import datetime, timedelta
+from src.session_cache import TTLCache
+from src.prompt_assembly import PromptTemplate, get_prompt_template
 
 DB_PATH = "./upwork_jobs.db"
 
-def ensure_db_exists():
-    """Ensure the database file and directory exist."""
-    Path(DB_PATH).parent.mkdir(parents=True, exist_ok=True)
-    
-    if not os.path.exists(DB_PATH):
-        print("Creating new database...")
-        create_tables()
-    else:
-        # Check if user tables exist, create if not
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        
-        # Check for users table
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='users'")
-        users_exists = cursor.fetchone() is not None
-        
-        # Check for user_sessions table
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='user_sessions'")
-        sessions_exists = cursor.fetchone() is not None
-        
-        # Check for prompts table
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='prompts'")
-        prompts_exists = cursor.fetchone() is not None
-        
-        # Check if jobs table has user_id column
-        cursor.execute("PRAGMA table_info(jobs)")
-        columns = [row[1] for row in cursor.fetchall()]
-        jobs_has_user_id = 'user_id' in columns
-        
+# Connection tuning applied to every pooled connection
+DB_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "temp_store": "MEMORY",
+    "cache_size": -20000,  # ~20MB page cache
+    "busy_timeout": 5000,
+}
+# Number of compiled statements sqlite3 keeps per connection
+DB_STATEMENT_CACHE_SIZE = 256
+# Max ids bound into one IN (...) lookup, below SQLite's variable limit
+JOB_ID_LOOKUP_CHUNK_SIZE = 500
+
+_thread_local = threading.local()
+# Jobs table columns keyed by database path, see get_table_columns()
+_table_columns_cache = {}
+# Database paths migrated by this process, see ensure_db_exists()
+_migrated_db_paths = set()
+_migration_lock = threading.Lock()
+# Valid sessions and users by (DB_PATH, id), so Streamlit reruns don't query them
+# every time. Entries expire after SESSION_CACHE_TTL_SECONDS and are dropped when
+# the session or user changes in this process.
+_session_cache = TTLCache()
+_user_cache = TTLCache()
+# Active prompts by type with their parsed templates, loaded all at once and
+# reloaded when the prompt_version row changed, which create_or_update_prompt
+# and delete_prompt bump in any process
+_prompt_registry = {'db_path': None, 'version': None, 'prompts': {}}
+_prompt_registry_lock = threading.Lock()
+
+def _open_connection(db_path):
+    """Open a new SQLite connection with the shared pragmas applied."""
+    conn = sqlite3.connect(db_path, cached_statements=DB_STATEMENT_CACHE_SIZE)
+    for pragma, value in DB_PRAGMAS.items():
+        conn.execute(f"PRAGMA {pragma} = {value}")
+    return conn
+
+def get_connection():
+    """
+    Get the calling thread's long-lived connection, opening it on first use.
+
+    The connection is reopened if DB_PATH changed since it was created.
+    """
+    conn = getattr(_thread_local, "conn", None)
+    if conn is not None and _thread_local.db_path != DB_PATH:
+        close_connection()
+        conn = None
+    if conn is None:
+        conn = _open_connection(DB_PATH)
+        _thread_local.conn = conn
+        _thread_local.db_path = DB_PATH
+        _thread_local.depth = 0
+    return conn
+
+def close_connection():
+    """Close the calling thread's pooled connection, if any."""
+    conn = getattr(_thread_local, "conn", None)
+    if conn is not None:
         conn.close()
-        
-        # Create missing tables or columns
-        if not users_exists or not sessions_exists or not jobs_has_user_id or not prompts_exists:
-            print("Upgrading database schema...")
-            create_user_tables()
-
-def create_tables():
-    """Create the necessary tables if they don't exist."""
-    conn = sqlite3.connect(DB_PATH)
+    _thread_local.conn = None
+    _thread_local.db_path = None
+    _thread_local.depth = 0
+
+@contextmanager
+def db_cursor(row_factory=None):
+    """
+    Yield a cursor on the thread's pooled connection.
+
+    The outermost block commits on success and rolls back on error, so
+    functions that call each other share a single transaction. The cursor
+    is always closed on exit so no read snapshot outlives the block.
+
+    Args:
+        row_factory: Optional row factory for the cursor (e.g. sqlite3.Row).
+    """
+    conn = get_connection()
     cursor = conn.cursor()
-    
+    if row_factory is not None:
+        cursor.row_factory = row_factory
+    _thread_local.depth += 1
+    try:
+        yield cursor
+    except BaseException:
+        _thread_local.depth -= 1
+        cursor.close()
+        if _thread_local.depth == 0 and conn.in_transaction:
+            conn.rollback()
+        raise
+    else:
+        _thread_local.depth -= 1
+        cursor.close()
+        if _thread_local.depth == 0 and conn.in_transaction:
+            conn.commit()
+
+def ensure_db_exists():
+    """
+    Make sure the database exists and its schema is up to date.
+
+    The migrations run on the first call for a database path, later calls
+    only check an in-process flag.
+    """
+    if DB_PATH in _migrated_db_paths:
+        return
+    with _migration_lock:
+        if DB_PATH not in _migrated_db_paths:
+            Path(DB_PATH).parent.mkdir(parents=True, exist_ok=True)
+            migrate_database()
+            sync_job_stats()
+            _migrated_db_paths.add(DB_PATH)
+
+def get_schema_version(cursor) -> int:
+    """Get the version of the last migration applied, 0 for a new database."""
+    cursor.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version")
+    return cursor.fetchone()[0]
+
+def migrate_database() -> int:
+    """
+    Apply the SCHEMA_MIGRATIONS the database doesn't have yet, in order.
+
+    Everything runs in one write transaction, so processes starting at the
+    same time migrate one after the other and a failed migration leaves
+    the schema as it was.
+
+    Returns:
+        int: Number of migrations applied.
+    """
+    conn = get_connection()
+    with db_cursor() as cursor:
+        if not conn.in_transaction:
+            cursor.execute("BEGIN IMMEDIATE")
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        ''')
+        current_version = get_schema_version(cursor)
+        pending = [migration for migration in SCHEMA_MIGRATIONS if migration[0] > current_version]
+        for version, name, migrate in pending:
+            print(f"Applying database migration {version}: {name}")
+            migrate(cursor)
+            cursor.execute("INSERT INTO schema_version (version, name) VALUES (?, ?)", (version, name))
+    
+    if pending:
+        # jobs may have gained a user_id column
+        invalidate_table_columns_cache()
+    return len(pending)
+
+def create_base_schema(cursor):
+    """
+    Create the tables, or bring a database created before schema_version up to them.
+    """
     # Create users table
     cursor.execute('''
     CREATE TABLE IF NOT EXISTS users (
@@ -100,6 +216,24 @@ def create_tables():
     )
     ''')
     
+    # Add user_id column to a jobs table from before user accounts
+    cursor.execute("PRAGMA table_info(jobs)")
+    columns = [row[1] for row in cursor.fetchall()]
+    if 'user_id' not in columns:
+        print("Adding user_id column to jobs table...")
+        cursor.execute("ALTER TABLE jobs ADD COLUMN user_id TEXT")
+        
+        # Set a default user_id for existing jobs
+        cursor.execute("UPDATE jobs SET user_id = 'default_user' WHERE user_id IS NULL")
+        print("Existing jobs assigned to 'default_user'")
+    
+    # Add is_admin column to a users table from before admin accounts
+    cursor.execute("PRAGMA table_info(users)")
+    columns = [row[1] for row in cursor.fetchall()]
+    if 'is_admin' not in columns:
+        print("Adding is_admin column to users table...")
+        cursor.execute("ALTER TABLE users ADD COLUMN is_admin BOOLEAN DEFAULT 0")
+    
     # Create prompts table for admin-managed prompts
     cursor.execute('''
     CREATE TABLE IF NOT EXISTS prompts (
@@ -116,96 +250,176 @@ def create_tables():
     )
     ''')
     
-    conn.commit()
-    conn.close()
+    create_applications_tables(cursor)
 
-def create_user_tables():
-    """Create user-related tables for existing database."""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    try:
-        # Create users table
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS users (
-            user_id TEXT PRIMARY KEY,
-            username TEXT UNIQUE NOT NULL,
-            email TEXT UNIQUE NOT NULL,
-            password_hash TEXT NOT NULL,
-            salt TEXT NOT NULL,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            last_login TIMESTAMP,
-            is_active BOOLEAN DEFAULT 1,
-            is_admin BOOLEAN DEFAULT 0,
-            profile_data TEXT
-        )
-        ''')
-        
-        # Create sessions table
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS user_sessions (
-            session_id TEXT PRIMARY KEY,
+def create_applications_tables(cursor):
+    """Create the applications table, its lookup indexes and the legacy import log."""
+    # One row per generated application, read a page at a time by the Applications page
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS applications (
+            application_id INTEGER PRIMARY KEY AUTOINCREMENT,
             user_id TEXT NOT NULL,
+            job_id TEXT,
+            title TEXT NOT NULL DEFAULT 'Unknown Job',
+            score REAL,
+            job_description TEXT NOT NULL DEFAULT '',
+            cover_letter TEXT NOT NULL DEFAULT '',
+            interview_prep TEXT NOT NULL DEFAULT '',
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            expires_at TIMESTAMP NOT NULL,
-            is_active BOOLEAN DEFAULT 1,
             FOREIGN KEY (user_id) REFERENCES users (user_id)
         )
-        ''')
-        
-        # Add user_id column to existing jobs table if it doesn't exist
-        try:
-            # Check if user_id column exists
-            cursor.execute("PRAGMA table_info(jobs)")
-            columns = [row[1] for row in cursor.fetchall()]
-            
-            if 'user_id' not in columns:
-                print("Adding user_id column to jobs table...")
-                cursor.execute("ALTER TABLE jobs ADD COLUMN user_id TEXT")
-                
-                # Set a default user_id for existing jobs
-                cursor.execute("UPDATE jobs SET user_id = 'default_user' WHERE user_id IS NULL")
-                print("Existing jobs assigned to 'default_user'")
-        except sqlite3.OperationalError as e:
-            # Column might already exist or other issue
-            print(f"Note: Jobs table modification: {e}")
-        
-        # Add is_admin column to existing users table if it doesn't exist
-        try:
-            cursor.execute("PRAGMA table_info(users)")
-            columns = [row[1] for row in cursor.fetchall()]
-            
-            if 'is_admin' not in columns:
-                print("Adding is_admin column to users table...")
-                cursor.execute("ALTER TABLE users ADD COLUMN is_admin BOOLEAN DEFAULT 0")
-                print("Admin column added to users table")
-        except sqlite3.OperationalError as e:
-            print(f"Note: Users table modification: {e}")
-        
-        # Create prompts table for admin-managed prompts
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS prompts (
-            prompt_id TEXT PRIMARY KEY,
-            prompt_type TEXT NOT NULL,
-            prompt_name TEXT NOT NULL,
-            prompt_content TEXT NOT NULL,
-            is_active BOOLEAN DEFAULT 1,
-            created_by TEXT NOT NULL,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (created_by) REFERENCES users (user_id),
-            UNIQUE(prompt_type)
-        )
-        ''')
+    ''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_applications_user_created ON applications (user_id, created_at)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_applications_created ON applications (created_at)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_applications_job ON applications (job_id)")
+    
+    # Markdown application files imported into the applications table, with the
+    # byte offset parsing stopped at and the file size and mtime seen then
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS application_imports (
+        file_path TEXT PRIMARY KEY,
+        imported_count INTEGER NOT NULL,
+        parsed_bytes INTEGER NOT NULL DEFAULT 0,
+        file_size INTEGER,
+        file_mtime REAL,
+        header_date TEXT,
+        header_user_id TEXT,
+        imported_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+
+# Secondary indexes for the hot access paths, see audit_query_plans.py
+DB_INDEXES = {
+    # A user's jobs newest first: get_all_jobs, query_jobs, filter_new_job_ids
+    "idx_jobs_user_created": "ON jobs (user_id, created_at)",
+    # A user's jobs still waiting for a score: get_jobs_by_criteria(unprocessed_only=True)
+    "idx_jobs_user_unscored": "ON jobs (user_id, created_at) WHERE score IS NULL",
+    # A user's score ranges and averages
+    "idx_jobs_user_score": "ON jobs (user_id, score)",
+    # Scored jobs across every user: score >= 7 and AVG(score) in get_system_stats
+    "idx_jobs_scored": "ON jobs (score) WHERE score IS NOT NULL",
+    # Every user's jobs newest first: get_all_jobs_admin
+    "idx_jobs_created": "ON jobs (created_at)",
+    # Expired sessions: cleanup_expired_sessions
+    "idx_sessions_expires": "ON user_sessions (expires_at)",
+    # Active sessions of a user
+    "idx_sessions_user": "ON user_sessions (user_id, is_active)",
+}
+
+def create_indexes(cursor):
+    """Create the DB_INDEXES that don't exist yet."""
+    for name, definition in DB_INDEXES.items():
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} {definition}")
+
+def create_prompt_version(cursor):
+    """Create the single-row prompt_version table, see bump_prompt_version()."""
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS prompt_version (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        version INTEGER NOT NULL
+    )
+    ''')
+    cursor.execute("INSERT OR IGNORE INTO prompt_version (id, version) VALUES (1, 0)")
+
+# Schema migrations in the order they are applied, see migrate_database().
+# Add new ones at the end with the next version, never change a shipped one.
+SCHEMA_MIGRATIONS = [
+    (1, "base schema", create_base_schema),
+    (2, "jobs and sessions indexes", create_indexes),
+    (3, "prompt version", create_prompt_version),
+]
+
+# Job counts per user and job type, kept up to date by triggers on jobs when
+# MATERIALIZED_JOB_STATS is "true", so the stats pages don't read the jobs table.
+# Jobs without a job type are counted under ''.
+JOB_STATS_TABLE = '''
+CREATE TABLE IF NOT EXISTS job_stats (
+    user_id TEXT NOT NULL,
+    job_type TEXT NOT NULL,
+    total_jobs INTEGER NOT NULL DEFAULT 0,
+    processed_jobs INTEGER NOT NULL DEFAULT 0,
+    high_scoring_jobs INTEGER NOT NULL DEFAULT 0,
+    score_sum REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, job_type)
+)
+'''
+_JOB_STATS_ADD_NEW = '''
+    INSERT INTO job_stats (user_id, job_type, total_jobs, processed_jobs, high_scoring_jobs, score_sum)
+    VALUES (COALESCE(NEW.user_id, ''), COALESCE(NEW.job_type, ''), 1, NEW.score IS NOT NULL,
+            COALESCE(NEW.score >= 7, 0), COALESCE(NEW.score, 0))
+    ON CONFLICT (user_id, job_type) DO UPDATE SET
+        total_jobs = total_jobs + 1,
+        processed_jobs = processed_jobs + excluded.processed_jobs,
+        high_scoring_jobs = high_scoring_jobs + excluded.high_scoring_jobs,
+        score_sum = score_sum + excluded.score_sum;
+'''
+_JOB_STATS_REMOVE_OLD = '''
+    UPDATE job_stats SET
+        total_jobs = total_jobs - 1,
+        processed_jobs = processed_jobs - (OLD.score IS NOT NULL),
+        high_scoring_jobs = high_scoring_jobs - COALESCE(OLD.score >= 7, 0),
+        score_sum = score_sum - COALESCE(OLD.score, 0)
+    WHERE user_id = COALESCE(OLD.user_id, '') AND job_type = COALESCE(OLD.job_type, '');
+'''
+JOB_STATS_TRIGGERS = {
+    "job_stats_insert": f"AFTER INSERT ON jobs BEGIN {_JOB_STATS_ADD_NEW} END",
+    "job_stats_delete": f"AFTER DELETE ON jobs BEGIN {_JOB_STATS_REMOVE_OLD} END",
+    "job_stats_update": f"AFTER UPDATE OF user_id, job_type, score ON jobs BEGIN {_JOB_STATS_REMOVE_OLD} {_JOB_STATS_ADD_NEW} END",
+}
+
+def job_stats_enabled() -> bool:
+    """Whether MATERIALIZED_JOB_STATS asks for the trigger-maintained job_stats table."""
+    return os.getenv("MATERIALIZED_JOB_STATS", "false").lower() == "true"
+
+def sync_job_stats():
+    """
+    Create or drop the job_stats table and its triggers to match MATERIALIZED_JOB_STATS.
+
+    When the triggers are created the table is rebuilt from jobs, so counts
+    never carry over from a time they weren't maintained.
+    """
+    conn = get_connection()
+    with db_cursor() as cursor:
+        if not conn.in_transaction:
+            cursor.execute("BEGIN IMMEDIATE")
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'job_stats_%'")
+        existing_triggers = {row[0] for row in cursor.fetchall()}
         
-        conn.commit()
-        print("User authentication tables created successfully!")
+        if not job_stats_enabled():
+            for name in existing_triggers:
+                cursor.execute(f"DROP TRIGGER {name}")
+            cursor.execute("DROP TABLE IF EXISTS job_stats")
+            return
         
-    except Exception as e:
-        print(f"Error creating user tables: {e}")
-        conn.rollback()
-    finally:
-        conn.close()
+        if existing_triggers != set(JOB_STATS_TRIGGERS):
+            print("Building the job_stats table...")
+            for name in existing_triggers:
+                cursor.execute(f"DROP TRIGGER {name}")
+            cursor.execute("DROP TABLE IF EXISTS job_stats")
+            cursor.execute(JOB_STATS_TABLE)
+            cursor.execute('''
+            INSERT INTO job_stats (user_id, job_type, total_jobs, processed_jobs, high_scoring_jobs, score_sum)
+            SELECT COALESCE(user_id, ''), COALESCE(job_type, ''), COUNT(*), COUNT(score),
+                   SUM(CASE WHEN score >= 7 THEN 1 ELSE 0 END), COALESCE(SUM(score), 0)
+            FROM jobs
+            GROUP BY 1, 2
+            ''')
+            for name, definition in JOB_STATS_TRIGGERS.items():
+                cursor.execute(f"CREATE TRIGGER {name} {definition}")
+
+def _job_stats_maintained(cursor) -> bool:
+    """
+    Whether the database has the job_stats table and all of its triggers.
+
+    Read from the schema rather than remembered, as another process may have
+    created or dropped them since this one called sync_job_stats().
+    """
+    names = ["job_stats"] + list(JOB_STATS_TRIGGERS)
+    cursor.execute(
+        f"SELECT COUNT(*) FROM sqlite_master WHERE name IN ({', '.join('?' * len(names))})",
+        names
+    )
+    return cursor.fetchone()[0] == len(names)
 
 def hash_password(password: str) -> tuple:
     """Hash a password with a random salt."""
@@ -230,50 +444,40 @@ def generate_session_id() -> str:
 
 def create_user(username: str, email: str, password: str) -> tuple:
     """Create a new user account."""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
     try:
-        # Check if username or email already exists
-        cursor.execute("SELECT username FROM users WHERE username = ? OR email = ?", (username, email))
-        if cursor.fetchone():
-            conn.close()
-            return False, "Username or email already exists"
-        
-        # Hash password
-        password_hash, salt = hash_password(password)
-        
-        # Generate user ID
-        user_id = generate_user_id(username)
-        
-        # Insert user
-        cursor.execute('''
-        INSERT INTO users (user_id, username, email, password_hash, salt)
-        VALUES (?, ?, ?, ?, ?)
-        ''', (user_id, username, email, password_hash, salt))
-        
-        conn.commit()
-        conn.close()
+        with db_cursor() as cursor:
+            # Check if username or email already exists
+            cursor.execute("SELECT username FROM users WHERE username = ? OR email = ?", (username, email))
+            if cursor.fetchone():
+                return False, "Username or email already exists"
+            
+            # Hash password
+            password_hash, salt = hash_password(password)
+            
+            # Generate user ID
+            user_id = generate_user_id(username)
+            
+            # Insert user
+            cursor.execute('''
+            INSERT INTO users (user_id, username, email, password_hash, salt)
+            VALUES (?, ?, ?, ?, ?)
+            ''', (user_id, username, email, password_hash, salt))
+            
         return True, user_id
         
     except Exception as e:
-        conn.close()
         return False, str(e)
 
 def authenticate_user(username: str, password: str) -> tuple:
     """Authenticate a user with username/email and password."""
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
-    
-    # Find user by username or email
-    cursor.execute('''
-    SELECT * FROM users 
-    WHERE (username = ? OR email = ?) AND is_active = 1
-    ''', (username, username))
-    
-    user = cursor.fetchone()
-    conn.close()
+    with db_cursor(sqlite3.Row) as cursor:
+        # Find user by username or email
+        cursor.execute('''
+        SELECT * FROM users 
+        WHERE (username = ? OR email = ?) AND is_active = 1
+        ''', (username, username))
+        
+        user = cursor.fetchone()
     
     if not user:
         return False, None, "Invalid username/email or password"
@@ -288,137 +492,160 @@ def authenticate_user(username: str, password: str) -> tuple:
 
 def create_session(user_id: str, duration_hours: int = 24) -> str:
     """Create a new session for a user."""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
     session_id = generate_session_id()
     expires_at = datetime.now() + timedelta(hours=duration_hours)
     
-    cursor.execute('''
-    INSERT INTO user_sessions (session_id, user_id, expires_at)
-    VALUES (?, ?, ?)
-    ''', (session_id, user_id, expires_at))
+    with db_cursor() as cursor:
+        cursor.execute('''
+        INSERT INTO user_sessions (session_id, user_id, expires_at)
+        VALUES (?, ?, ?)
+        ''', (session_id, user_id, expires_at))
     
-    conn.commit()
-    conn.close()
     return session_id
 
 def validate_session(session_id: str) -> tuple:
     """Validate a session and return user info if valid."""
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
+    cached = _session_cache.get((DB_PATH, session_id))
+    if cached is not None:
+        return True, cached
     
-    cursor.execute('''
-    SELECT s.*, u.* FROM user_sessions s
-    JOIN users u ON s.user_id = u.user_id
-    WHERE s.session_id = ? AND s.is_active = 1 AND s.expires_at > datetime('now')
-    ''', (session_id,))
-    
-    result = cursor.fetchone()
-    conn.close()
+    with db_cursor(sqlite3.Row) as cursor:
+        cursor.execute('''
+        SELECT s.*, u.*, (julianday(s.expires_at) - julianday('now')) * 86400 AS seconds_left
+        FROM user_sessions s
+        JOIN users u ON s.user_id = u.user_id
+        WHERE s.session_id = ? AND s.is_active = 1 AND s.expires_at > datetime('now')
+        ''', (session_id,))
+        
+        result = cursor.fetchone()
     
     if result:
-        return True, dict(result)
+        session = dict(result)
+        # Cached no longer than the session is valid for, by the same clock as the query
+        seconds_left = session.pop('seconds_left')
+        _session_cache.set((DB_PATH, session_id), session, ttl_seconds=seconds_left)
+        return True, session
     else:
         return False, None
 
 def invalidate_session(session_id: str) -> bool:
     """Invalidate a session (logout)."""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    cursor.execute('''
-    UPDATE user_sessions SET is_active = 0 
-    WHERE session_id = ?
-    ''', (session_id,))
+    with db_cursor() as cursor:
+        cursor.execute('''
+        UPDATE user_sessions SET is_active = 0 
+        WHERE session_id = ?
+        ''', (session_id,))
+        invalidated = cursor.rowcount > 0
     
-    conn.commit()
-    updated = cursor.rowcount > 0
-    conn.close()
-    return updated
+    _session_cache.invalidate((DB_PATH, session_id))
+    return invalidated
 
 def update_last_login(user_id: str):
     """Update the last login timestamp for a user."""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    cursor.execute('''
-    UPDATE users SET last_login = datetime('now')
-    WHERE user_id = ?
-    ''', (user_id,))
+    with db_cursor() as cursor:
+        cursor.execute('''
+        UPDATE users SET last_login = datetime('now')
+        WHERE user_id = ?
+        ''', (user_id,))
     
-    conn.commit()
-    conn.close()
+    invalidate_cached_user(user_id)
 
 def get_user_by_id(user_id: str):
     """Get user information by user ID."""
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
+    cached = _user_cache.get((DB_PATH, user_id))
+    if cached is not None:
+        return cached
     
-    cursor.execute("SELECT * FROM users WHERE user_id = ?", (user_id,))
-    user = cursor.fetchone()
+    with db_cursor(sqlite3.Row) as cursor:
+        cursor.execute("SELECT * FROM users WHERE user_id = ?", (user_id,))
+        user = cursor.fetchone()
     
-    conn.close()
+    if user:
+        _user_cache.set((DB_PATH, user_id), dict(user))
     return dict(user) if user else None
 
+def invalidate_cached_user(user_id: str):
+    """Drop a user and their sessions from the session and user caches after the user changed."""
+    _user_cache.invalidate((DB_PATH, user_id))
+    _session_cache.invalidate_where(
+        lambda key, session: key[0] == DB_PATH and session['user_id'] == user_id
+    )
+
+def get_auth_cache_stats() -> dict:
+    """Get the hit rates and a summary of the session and user caches."""
+    return {
+        'session_hit_rate': _session_cache.hit_rate(),
+        'user_hit_rate': _user_cache.hit_rate(),
+        'session_cache': _session_cache.summary(),
+        'user_cache': _user_cache.summary()
+    }
+
 def cleanup_expired_sessions():
     """Remove expired sessions from the database."""
     try:
         # Ensure tables exist before cleanup
         ensure_db_exists()
         
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        
-        # Check if user_sessions table exists before trying to clean it
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='user_sessions'")
-        if not cursor.fetchone():
-            conn.close()
-            return 0
-        
-        cursor.execute("DELETE FROM user_sessions WHERE expires_at < datetime('now')")
-        
-        conn.commit()
-        deleted_count = cursor.rowcount
-        conn.close()
-        return deleted_count
+        with db_cursor() as cursor:
+            cursor.execute("DELETE FROM user_sessions WHERE expires_at < datetime('now')")
+            
+            return cursor.rowcount
     except Exception as e:
         print(f"Error cleaning up expired sessions: {e}")
         return 0
 
 def job_exists(job_id, user_id=None):
     """Check if a job with the given ID already exists in the database."""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    if user_id:
-        cursor.execute("SELECT 1 FROM jobs WHERE job_id = ? AND user_id = ?", (job_id, user_id))
-    else:
-        cursor.execute("SELECT 1 FROM jobs WHERE job_id = ?", (job_id,))
-    
-    exists = cursor.fetchone() is not None
-    
-    conn.close()
-    return exists
+    with db_cursor() as cursor:
+        if user_id:
+            cursor.execute("SELECT 1 FROM jobs WHERE job_id = ? AND user_id = ?", (job_id, user_id))
+        else:
+            cursor.execute("SELECT 1 FROM jobs WHERE job_id = ?", (job_id,))
+        
+        return cursor.fetchone() is not None
+
+def filter_new_job_ids(job_ids, user_id=None) -> set:
+    """
+    Return the subset of job_ids that are not yet stored in the database.
+
+    Looks all ids up with a single IN query per chunk instead of one
+    job_exists() call per id.
+    """
+    job_ids = set(job_ids)
+    if not job_ids:
+        return set()
+    
+    existing = set()
+    ids = list(job_ids)
+    with db_cursor() as cursor:
+        for i in range(0, len(ids), JOB_ID_LOOKUP_CHUNK_SIZE):
+            chunk = ids[i:i + JOB_ID_LOOKUP_CHUNK_SIZE]
+            placeholders = ', '.join(['?' for _ in chunk])
+            if user_id:
+                cursor.execute(f"SELECT job_id FROM jobs WHERE job_id IN ({placeholders}) AND user_id = ?", chunk + [user_id])
+            else:
+                cursor.execute(f"SELECT job_id FROM jobs WHERE job_id IN ({placeholders})", chunk)
+            existing.update(row[0] for row in cursor.fetchall())
+    
+    return job_ids - existing
 
 def get_table_columns():
-    """Get the list of columns in the jobs table."""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    cursor.execute("PRAGMA table_info(jobs)")
-    columns = [row[1] for row in cursor.fetchall()]
-    
-    conn.close()
-    return columns
+    """Get the list of columns in the jobs table (cached per database path)."""
+    columns = _table_columns_cache.get(DB_PATH)
+    if columns is None:
+        with db_cursor() as cursor:
+            cursor.execute("PRAGMA table_info(jobs)")
+            columns = [row[1] for row in cursor.fetchall()]
+        if columns:
+            _table_columns_cache[DB_PATH] = columns
+    return list(columns)
+
+def invalidate_table_columns_cache():
+    """Forget the cached jobs columns after a schema change."""
+    _table_columns_cache.pop(DB_PATH, None)
 
 def save_job(job_data, user_id=None):
     """Save a job to the database."""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
     # Extract job_id from link
     job_id = job_data.get('job_id')
     
@@ -427,138 +654,162 @@ def save_job(job_data, user_id=None):
         job_data = dict(job_data)
         job_data['user_id'] = user_id
     
-    # Check if job already exists for this user
-    if user_id and job_exists(job_id, user_id):
-        conn.close()
-        return False
-    elif not user_id and job_exists(job_id):
-        conn.close()
-        return False
-    
-    # Get existing table columns
-    table_columns = get_table_columns()
-    
-    # Filter job_data to only include columns that exist in the table
-    filtered_job_data = {k: v for k, v in job_data.items() if k in table_columns}
-    
-    # Prepare columns and values for insertion
-    columns = ', '.join(filtered_job_data.keys())
-    placeholders = ', '.join(['?' for _ in filtered_job_data])
-    values = tuple(filtered_job_data.values())
-    
-    # Insert the job
-    cursor.execute(f"INSERT INTO jobs ({columns}) VALUES ({placeholders})", values)
+    with db_cursor() as cursor:
+        # Check if job already exists for this user
+        if user_id and job_exists(job_id, user_id):
+            return False
+        elif not user_id and job_exists(job_id):
+            return False
+        
+        # Get existing table columns
+        table_columns = get_table_columns()
+        
+        # Filter job_data to only include columns that exist in the table
+        filtered_job_data = {k: v for k, v in job_data.items() if k in table_columns}
+        
+        # Prepare columns and values for insertion
+        columns = ', '.join(filtered_job_data.keys())
+        placeholders = ', '.join(['?' for _ in filtered_job_data])
+        values = tuple(filtered_job_data.values())
+        
+        # Insert the job
+        cursor.execute(f"INSERT INTO jobs ({columns}) VALUES ({placeholders})", values)
     
-    conn.commit()
-    conn.close()
     return True
 
-def save_jobs(jobs_data):
-    """Save multiple jobs to the database and return the number of new jobs saved."""
-    new_jobs_count = 0
+def bulk_save_jobs(jobs_data, user_id=None) -> tuple:
+    """
+    Insert many jobs in a single transaction, skipping ones that already exist.
+
+    Jobs are grouped by their set of known columns so each group is written
+    with one executemany() call.
+
+    Returns:
+        tuple: (inserted_count, skipped_count)
+    """
+    table_columns = set(get_table_columns())
+    groups = {}
+    total = 0
     
     for job_data in jobs_data:
-        if save_job(job_data):
-            new_jobs_count += 1
-    
-    return new_jobs_count
+        total += 1
+        if user_id:
+            job_data = {**job_data, 'user_id': user_id}
+        
+        # Filter job_data to only include columns that exist in the table
+        columns = tuple(k for k in job_data if k in table_columns)
+        if not columns:
+            continue
+        groups.setdefault(columns, []).append(tuple(job_data[k] for k in columns))
+    
+    inserted_count = 0
+    with db_cursor() as cursor:
+        for columns, rows in groups.items():
+            placeholders = ', '.join(['?' for _ in columns])
+            cursor.executemany(
+                f"INSERT INTO jobs ({', '.join(columns)}) VALUES ({placeholders}) ON CONFLICT DO NOTHING",
+                rows
+            )
+            inserted_count += cursor.rowcount
+    
+    return inserted_count, total - inserted_count
 
-def get_all_jobs(user_id=None):
-    """Get all jobs from the database for a specific user."""
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
-    
+def update_job_scores(jobs_data, user_id=None) -> int:
+    """
+    Write the scores of jobs that are already saved, in one executemany() call.
+
+    Returns:
+        int: Number of jobs updated.
+    """
     if user_id:
-        cursor.execute("SELECT * FROM jobs WHERE user_id = ? ORDER BY created_at DESC", (user_id,))
+        rows = [(job['score'], job['job_id'], user_id) for job in jobs_data]
+        query = "UPDATE jobs SET score = ? WHERE job_id = ? AND user_id = ?"
     else:
-        # For backward compatibility - get all jobs
-        cursor.execute("SELECT * FROM jobs ORDER BY created_at DESC")
+        rows = [(job['score'], job['job_id']) for job in jobs_data]
+        query = "UPDATE jobs SET score = ? WHERE job_id = ?"
     
-    rows = cursor.fetchall()
+    with db_cursor() as cursor:
+        cursor.executemany(query, rows)
+        return cursor.rowcount
+
+def save_jobs(jobs_data, user_id=None):
+    """Save multiple jobs to the database and return the number of new jobs saved."""
+    inserted_count, _ = bulk_save_jobs(jobs_data, user_id)
+    return inserted_count
+
+def get_all_jobs(user_id=None):
+    """Get all jobs from the database for a specific user."""
+    with db_cursor(sqlite3.Row) as cursor:
+        if user_id:
+            cursor.execute("SELECT * FROM jobs WHERE user_id = ? ORDER BY created_at DESC", (user_id,))
+        else:
+            # For backward compatibility - get all jobs
+            cursor.execute("SELECT * FROM jobs ORDER BY created_at DESC")
+        
+        rows = cursor.fetchall()
     
     # Convert rows to dictionaries
-    jobs = [dict(row) for row in rows]
-    
-    conn.close()
-    return jobs
+    return [dict(row) for row in rows]
 
 def get_job_by_id(job_id, user_id=None):
     """Get a specific job by its ID, optionally filtered by user."""
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
-    
-    if user_id:
-        cursor.execute("SELECT * FROM jobs WHERE job_id = ? AND user_id = ?", (job_id, user_id))
-    else:
-        cursor.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,))
-    
-    row = cursor.fetchone()
+    with db_cursor(sqlite3.Row) as cursor:
+        if user_id:
+            cursor.execute("SELECT * FROM jobs WHERE job_id = ? AND user_id = ?", (job_id, user_id))
+        else:
+            cursor.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,))
+        
+        row = cursor.fetchone()
     
-    conn.close()
     return dict(row) if row else None
 
 def update_job(job_id, job_data, user_id=None):
     """Update an existing job in the database."""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    # Check if job exists
-    if user_id and not job_exists(job_id, user_id):
-        conn.close()
-        return False
-    elif not user_id and not job_exists(job_id):
-        conn.close()
-        return False
-    
-    # Get existing table columns
-    table_columns = get_table_columns()
-    
-    # Filter job_data to only include columns that exist in the table
-    filtered_job_data = {k: v for k, v in job_data.items() if k in table_columns and k not in ['job_id', 'user_id']}
-    
-    if not filtered_job_data:
-        conn.close()
-        return False
-    
-    # Prepare SET clause for UPDATE
-    set_clause = ', '.join([f"{k} = ?" for k in filtered_job_data.keys()])
-    values = list(filtered_job_data.values())
-    
-    if user_id:
-        values.extend([job_id, user_id])
-        cursor.execute(f"UPDATE jobs SET {set_clause} WHERE job_id = ? AND user_id = ?", values)
-    else:
-        values.append(job_id)
-        cursor.execute(f"UPDATE jobs SET {set_clause} WHERE job_id = ?", values)
+    with db_cursor() as cursor:
+        # Check if job exists
+        if user_id and not job_exists(job_id, user_id):
+            return False
+        elif not user_id and not job_exists(job_id):
+            return False
+        
+        # Get existing table columns
+        table_columns = get_table_columns()
+        
+        # Filter job_data to only include columns that exist in the table
+        filtered_job_data = {k: v for k, v in job_data.items() if k in table_columns and k not in ['job_id', 'user_id']}
+        
+        if not filtered_job_data:
+            return False
+        
+        # Prepare SET clause for UPDATE
+        set_clause = ', '.join([f"{k} = ?" for k in filtered_job_data.keys()])
+        values = list(filtered_job_data.values())
+        
+        if user_id:
+            values.extend([job_id, user_id])
+            cursor.execute(f"UPDATE jobs SET {set_clause} WHERE job_id = ? AND user_id = ?", values)
+        else:
+            values.append(job_id)
+            cursor.execute(f"UPDATE jobs SET {set_clause} WHERE job_id = ?", values)
     
-    conn.commit()
-    conn.close()
     return True
 
 def delete_job(job_id, user_id=None):
     """Delete a job from the database."""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    # Check if job exists
-    if user_id and not job_exists(job_id, user_id):
-        conn.close()
-        return False
-    elif not user_id and not job_exists(job_id):
-        conn.close()
-        return False
-    
-    # Delete the job
-    if user_id:
-        cursor.execute("DELETE FROM jobs WHERE job_id = ? AND user_id = ?", (job_id, user_id))
-    else:
-        cursor.execute("DELETE FROM jobs WHERE job_id = ?", (job_id,))
-    
-    conn.commit()
-    deleted_count = cursor.rowcount
-    conn.close()
+    with db_cursor() as cursor:
+        # Check if job exists
+        if user_id and not job_exists(job_id, user_id):
+            return False
+        elif not user_id and not job_exists(job_id):
+            return False
+        
+        # Delete the job
+        if user_id:
+            cursor.execute("DELETE FROM jobs WHERE job_id = ? AND user_id = ?", (job_id, user_id))
+        else:
+            cursor.execute("DELETE FROM jobs WHERE job_id = ?", (job_id,))
+        
+        deleted_count = cursor.rowcount
     
     return deleted_count > 0
 
@@ -567,23 +818,17 @@ def delete_multiple_jobs(job_ids, user_id=None):
     if not job_ids:
         return 0
     
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
     # Create placeholders for the IN clause
     placeholders = ', '.join(['?' for _ in job_ids])
     
-    # Delete the jobs
-    if user_id:
-        cursor.execute(f"DELETE FROM jobs WHERE job_id IN ({placeholders}) AND user_id = ?", job_ids + [user_id])
-    else:
-        cursor.execute(f"DELETE FROM jobs WHERE job_id IN ({placeholders})", job_ids)
-    
-    conn.commit()
-    deleted_count = cursor.rowcount
-    conn.close()
-    
-    return deleted_count
+    with db_cursor() as cursor:
+        # Delete the jobs
+        if user_id:
+            cursor.execute(f"DELETE FROM jobs WHERE job_id IN ({placeholders}) AND user_id = ?", job_ids + [user_id])
+        else:
+            cursor.execute(f"DELETE FROM jobs WHERE job_id IN ({placeholders})", job_ids)
+        
+        return cursor.rowcount
 
 def reset_job_score(job_id, user_id=None):
     """Reset the score of a job to None (for regeneration)."""
@@ -594,30 +839,20 @@ def reset_multiple_job_scores(job_ids, user_id=None):
     if not job_ids:
         return 0
     
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
     # Create placeholders for the IN clause
     placeholders = ', '.join(['?' for _ in job_ids])
     
-    # Reset scores
-    if user_id:
-        cursor.execute(f"UPDATE jobs SET score = NULL WHERE job_id IN ({placeholders}) AND user_id = ?", job_ids + [user_id])
-    else:
-        cursor.execute(f"UPDATE jobs SET score = NULL WHERE job_id IN ({placeholders})", job_ids)
-    
-    conn.commit()
-    updated_count = cursor.rowcount
-    conn.close()
-    
-    return updated_count
+    with db_cursor() as cursor:
+        # Reset scores
+        if user_id:
+            cursor.execute(f"UPDATE jobs SET score = NULL WHERE job_id IN ({placeholders}) AND user_id = ?", job_ids + [user_id])
+        else:
+            cursor.execute(f"UPDATE jobs SET score = NULL WHERE job_id IN ({placeholders})", job_ids)
+        
+        return cursor.rowcount
 
 def get_jobs_by_criteria(score_min=None, score_max=None, job_type=None, unprocessed_only=False, user_id=None):
     """Get jobs based on specific criteria."""
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
-    
     conditions = []
     params = []
     
@@ -645,222 +880,595 @@ def get_jobs_by_criteria(score_min=None, score_max=None, job_type=None, unproces
         where_clause = "WHERE " + " AND ".join(conditions)
     
     query = f"SELECT * FROM jobs {where_clause} ORDER BY created_at DESC"
-    cursor.execute(query, params)
-    rows = cursor.fetchall()
+    with db_cursor(sqlite3.Row) as cursor:
+        cursor.execute(query, params)
+        rows = cursor.fetchall()
     
     # Convert rows to dictionaries
-    jobs = [dict(row) for row in rows]
+    return [dict(row) for row in rows]
+
+# Columns the jobs list views can be sorted by
+JOB_SORT_COLUMNS = ('created_at', 'score', 'title', 'job_type', 'experience_level')
+
+def _jobs_filter(user_id=None, score_min=None, score_below=None, scored=None, job_type=None,
+                 experience_level=None, search=None, created_before=None, created_after=None,
+                 older_than_days=None):
+    """
+    Build the WHERE clause and parameters shared by the jobs list queries.
+
+    Args:
+        user_id: Only match this user's jobs.
+        score_min: Only match jobs scored at least this.
+        score_below: Only match jobs scored below this.
+        scored: True for scored jobs only, False for unscored jobs only.
+        job_type: Only match this job type.
+        experience_level: Only match this experience level.
+        search: Only match jobs whose title contains this text.
+        created_before: Only match jobs added before this timestamp.
+        created_after: Only match jobs added at or after this timestamp.
+        older_than_days: Only match jobs added more than this many days ago.
+    """
+    conditions = []
+    params = []
+    
+    if user_id:
+        conditions.append("user_id = ?")
+        params.append(user_id)
+    
+    if score_min is not None:
+        conditions.append("score >= ?")
+        params.append(score_min)
+    
+    if score_below is not None:
+        conditions.append("score < ?")
+        params.append(score_below)
     
-    conn.close()
-    return jobs
+    if scored is True:
+        conditions.append("score IS NOT NULL")
+    elif scored is False:
+        conditions.append("score IS NULL")
+    
+    if job_type:
+        conditions.append("job_type = ?")
+        params.append(job_type)
+    
+    if experience_level:
+        conditions.append("experience_level = ?")
+        params.append(experience_level)
+    
+    if search:
+        conditions.append("title LIKE ?")
+        params.append(f"%{search}%")
+    
+    if created_before:
+        conditions.append("created_at < ?")
+        params.append(created_before)
+    
+    if created_after:
+        conditions.append("created_at >= ?")
+        params.append(created_after)
+    
+    if older_than_days is not None:
+        conditions.append("created_at < datetime('now', ?)")
+        params.append(f"-{older_than_days} days")
+    
+    where_clause = "WHERE " + " AND ".join(conditions) if conditions else ""
+    return where_clause, params
+
+def query_jobs(columns=None, order_by='created_at', descending=True, limit=None, offset=0,
+               description_chars=None, **filters):
+    """
+    Get one page of jobs with only the requested columns.
+
+    Args:
+        columns: Columns to return, every column when None. job_id is always included.
+        order_by: Column to sort by, one of JOB_SORT_COLUMNS.
+        descending: Sort in descending order. Defaults to True.
+        limit: Page size, all matching jobs when None.
+        offset: Number of matching jobs to skip.
+        description_chars: Only return the start of the description, for previews.
+        **filters: Filters accepted by _jobs_filter(), e.g. user_id, score_min or search.
+
+    Returns:
+        list: The jobs as dictionaries.
+    """
+    if order_by not in JOB_SORT_COLUMNS:
+        raise ValueError(f"Can't sort jobs by {order_by}")
+    
+    table_columns = get_table_columns()
+    if columns is None:
+        columns = table_columns
+    else:
+        columns = ['job_id'] + [column for column in columns if column in table_columns and column != 'job_id']
+    
+    selected = []
+    params = []
+    for column in columns:
+        if column == 'description' and description_chars:
+            selected.append("substr(description, 1, ?) AS description")
+            params.append(description_chars)
+        else:
+            selected.append(column)
+    
+    where_clause, filter_params = _jobs_filter(**filters)
+    params.extend(filter_params)
+    query = (
+        f"SELECT {', '.join(selected)} FROM jobs {where_clause} "
+        f"ORDER BY {order_by} {'DESC' if descending else 'ASC'}, job_id"
+    )
+    if limit is not None:
+        query += " LIMIT ? OFFSET ?"
+        params.extend([limit, offset])
+    
+    with db_cursor(sqlite3.Row) as cursor:
+        cursor.execute(query, params)
+        rows = cursor.fetchall()
+    
+    return [dict(row) for row in rows]
+
+def count_jobs(**filters) -> int:
+    """Count the jobs matching the filters accepted by _jobs_filter()."""
+    where_clause, params = _jobs_filter(**filters)
+    with db_cursor() as cursor:
+        cursor.execute(f"SELECT COUNT(*) FROM jobs {where_clause}", params)
+        return cursor.fetchone()[0]
+
+def get_job_ids(**filters) -> list:
+    """Get the ids of the jobs matching the filters accepted by _jobs_filter()."""
+    where_clause, params = _jobs_filter(**filters)
+    with db_cursor() as cursor:
+        cursor.execute(f"SELECT job_id FROM jobs {where_clause}", params)
+        return [row[0] for row in cursor.fetchall()]
+
+def get_jobs_overview(user_id=None, old_after_days=30) -> dict:
+    """
+    Get the job counts shown by the dashboard, sidebar and process pages in one query.
+
+    Args:
+        user_id: Only count this user's jobs.
+        old_after_days: Age in days after which a job counts as old. Defaults to 30.
+    """
+    where_clause, params = _jobs_filter(user_id=user_id)
+    with db_cursor() as cursor:
+        cursor.execute(f'''
+            SELECT COUNT(*),
+                   COUNT(score),
+                   SUM(CASE WHEN score >= 7 THEN 1 ELSE 0 END),
+                   SUM(CASE WHEN score < 4 THEN 1 ELSE 0 END),
+                   SUM(CASE WHEN created_at < datetime('now', ?) THEN 1 ELSE 0 END),
+                   AVG(score)
+            FROM jobs {where_clause}
+        ''', [f"-{old_after_days} days"] + params)
+        total, processed, high_scoring, low_scoring, old, average_score = cursor.fetchone()
+    
+    return {
+        'total_jobs': total,
+        'processed_jobs': processed,
+        'unprocessed_jobs': total - processed,
+        'high_scoring_jobs': high_scoring or 0,
+        'low_scoring_jobs': low_scoring or 0,
+        'old_jobs': old or 0,
+        'average_score': average_score
+    }
+
+def get_job_scores(user_id=None) -> list:
+    """Get the scores of the scored jobs, e.g. for a score histogram."""
+    where_clause, params = _jobs_filter(user_id=user_id, scored=True)
+    with db_cursor() as cursor:
+        cursor.execute(f"SELECT score FROM jobs {where_clause}", params)
+        return [row[0] for row in cursor.fetchall()]
+
+def get_job_value_counts(column, user_id=None) -> dict:
+    """
+    Count the jobs per value of a column, most common first.
+
+    Args:
+        column: One of JOB_SORT_COLUMNS other than created_at and score, e.g. job_type.
+        user_id: Only count this user's jobs.
+    """
+    if column not in JOB_SORT_COLUMNS or column in ('created_at', 'score'):
+        raise ValueError(f"Can't count jobs by {column}")
+    
+    where_clause, params = _jobs_filter(user_id=user_id)
+    where_clause += f" {'AND' if where_clause else 'WHERE'} {column} IS NOT NULL"
+    with db_cursor() as cursor:
+        cursor.execute(f"SELECT {column}, COUNT(*) AS count FROM jobs {where_clause} GROUP BY {column} ORDER BY count DESC", params)
+        return dict(cursor.fetchall())
+
+def _job_totals_query(user_id=None, materialized=False) -> tuple:
+    """
+    Build the query for total_jobs, processed_jobs, high_scoring_jobs and average_score,
+    read from job_stats when materialized, otherwise in one pass over jobs.
+
+    Returns:
+        tuple: The SELECT statement and its parameters.
+    """
+    params = [user_id] if user_id else []
+    if materialized:
+        user_filter = "WHERE user_id = ?" if user_id else ""
+        return f'''
+            SELECT SUM(total_jobs), SUM(processed_jobs), SUM(high_scoring_jobs),
+                   SUM(score_sum) / SUM(processed_jobs)
+            FROM job_stats {user_filter}
+        ''', params
+    
+    where_clause, params = _jobs_filter(user_id=user_id)
+    return f'''
+        SELECT COUNT(*), COUNT(score), SUM(CASE WHEN score >= 7 THEN 1 ELSE 0 END), AVG(score)
+        FROM jobs {where_clause}
+    ''', params
 
 def get_database_stats(user_id=None):
     """Get database statistics for a specific user."""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
+    recent_filter, recent_params = _jobs_filter(user_id=user_id)
+    recent_filter += f" {'AND' if recent_filter else 'WHERE'} created_at >= datetime('now', '-7 days')"
+    
+    conn = get_connection()
+    with db_cursor() as cursor:
+        # One read transaction, so job_stats can't be dropped between the check and the queries
+        if not conn.in_transaction:
+            cursor.execute("BEGIN")
+        materialized = _job_stats_maintained(cursor)
+        totals_query, params = _job_totals_query(user_id, materialized)
+        # Every count at once, recent activity (jobs added in last 7 days) is a range of the created_at indexes
+        cursor.execute(
+            f"SELECT job_totals.*, (SELECT COUNT(*) FROM jobs {recent_filter}) FROM ({totals_query}) AS job_totals",
+            params + recent_params
+        )
+        total_jobs, processed_jobs, high_scoring_jobs, avg_score, recent_jobs = cursor.fetchone()
+        
+        # Jobs by type
+        if materialized:
+            user_filter = "AND user_id = ?" if user_id else ""
+            cursor.execute(f"SELECT job_type, SUM(total_jobs) FROM job_stats WHERE job_type != '' {user_filter} GROUP BY job_type HAVING SUM(total_jobs) > 0", params)
+            jobs_by_type = dict(cursor.fetchall())
+        else:
+            jobs_by_type = get_job_value_counts('job_type', user_id)
+    
+    return {
+        'total_jobs': total_jobs or 0,
+        'processed_jobs': processed_jobs or 0,
+        'high_scoring_jobs': high_scoring_jobs or 0,
+        'average_score': round(avg_score, 2) if avg_score else 0,
+        'jobs_by_type': jobs_by_type,
+        'recent_jobs': recent_jobs
+    }
+
+# Columns callers may set when saving an application
+APPLICATION_COLUMNS = ('user_id', 'job_id', 'title', 'score', 'job_description', 'cover_letter', 'interview_prep', 'created_at')
+
+def save_applications(applications, user_id=None) -> int:
+    """
+    Insert generated applications, one row each, in a single transaction.
+
+    Applications without a created_at get the current local time, and ones
+    without a user are stored under 'default_user' like legacy jobs.
+
+    Returns:
+        int: Number of applications saved.
+    """
+    now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    rows = []
+    for application in applications:
+        application = {k: v for k, v in application.items() if k in APPLICATION_COLUMNS and v is not None}
+        application['user_id'] = user_id or application.get('user_id') or 'default_user'
+        application.setdefault('created_at', now)
+        rows.append(application)
+    
+    saved_count = 0
+    with db_cursor() as cursor:
+        for application in rows:
+            columns = ', '.join(application.keys())
+            placeholders = ', '.join(['?' for _ in application])
+            cursor.execute(f"INSERT INTO applications ({columns}) VALUES ({placeholders})", tuple(application.values()))
+            saved_count += 1
+    
+    return saved_count
+
+def _applications_filter(user_id=None, search=None, date=None):
+    """Build the WHERE clause and parameters shared by the application queries."""
+    conditions = []
+    params = []
     
-    stats = {}
-    user_filter = "WHERE user_id = ?" if user_id else ""
-    params = [user_id] if user_id else []
+    if user_id:
+        conditions.append("user_id = ?")
+        params.append(user_id)
     
-    # Total jobs
-    cursor.execute(f"SELECT COUNT(*) FROM jobs {user_filter}", params)
-    stats['total_jobs'] = cursor.fetchone()[0]
+    if search:
+        conditions.append("title LIKE ?")
+        params.append(f"%{search}%")
     
-    # Processed jobs (with scores)
-    cursor.execute(f"SELECT COUNT(*) FROM jobs {user_filter} {'AND' if user_id else 'WHERE'} score IS NOT NULL", params)
-    stats['processed_jobs'] = cursor.fetchone()[0]
+    if date:
+        # A day, matched as a created_at range so the index can be used
+        conditions.append("created_at >= ? AND created_at < date(?, '+1 day')")
+        params.extend([date, date])
     
-    # High scoring jobs (score >= 7)
-    cursor.execute(f"SELECT COUNT(*) FROM jobs {user_filter} {'AND' if user_id else 'WHERE'} score >= 7", params)
-    stats['high_scoring_jobs'] = cursor.fetchone()[0]
+    where_clause = "WHERE " + " AND ".join(conditions) if conditions else ""
+    return where_clause, params
+
+def get_applications(user_id=None, search=None, date=None, limit=None, offset=0):
+    """
+    Get one page of applications, newest first.
+
+    Args:
+        user_id: Only return this user's applications.
+        search: Only return applications whose title contains this text.
+        date: Only return applications created on this day (YYYY-MM-DD).
+        limit: Page size, all matching applications when None.
+        offset: Number of matching applications to skip.
+    """
+    where_clause, params = _applications_filter(user_id, search, date)
+    query = f"SELECT * FROM applications {where_clause} ORDER BY created_at DESC, application_id DESC"
+    if limit is not None:
+        query += " LIMIT ? OFFSET ?"
+        params.extend([limit, offset])
+    
+    with db_cursor(sqlite3.Row) as cursor:
+        cursor.execute(query, params)
+        rows = cursor.fetchall()
+    
+    return [dict(row) for row in rows]
+
+def count_applications(user_id=None, search=None, date=None) -> int:
+    """Count the applications matching the same filters as get_applications()."""
+    where_clause, params = _applications_filter(user_id, search, date)
+    with db_cursor() as cursor:
+        cursor.execute(f"SELECT COUNT(*) FROM applications {where_clause}", params)
+        return cursor.fetchone()[0]
+
+def get_applications_by_job(job_id, user_id=None):
+    """Get the applications generated for a job, newest first."""
+    with db_cursor(sqlite3.Row) as cursor:
+        if user_id:
+            cursor.execute("SELECT * FROM applications WHERE job_id = ? AND user_id = ? ORDER BY created_at DESC", (job_id, user_id))
+        else:
+            cursor.execute("SELECT * FROM applications WHERE job_id = ? ORDER BY created_at DESC", (job_id,))
+        rows = cursor.fetchall()
     
-    # Average score
-    cursor.execute(f"SELECT AVG(score) FROM jobs {user_filter} {'AND' if user_id else 'WHERE'} score IS NOT NULL", params)
-    avg_score = cursor.fetchone()[0]
-    stats['average_score'] = round(avg_score, 2) if avg_score else 0
+    return [dict(row) for row in rows]
+
+def get_applications_stats(user_id=None) -> dict:
+    """Get the Applications page header stats in one query."""
+    where_clause, params = _applications_filter(user_id)
+    with db_cursor() as cursor:
+        cursor.execute(f'''
+            SELECT COUNT(*),
+                   COUNT(DISTINCT date(created_at)),
+                   AVG(LENGTH(cover_letter)),
+                   SUM(CASE WHEN interview_prep != '' THEN 1 ELSE 0 END)
+            FROM applications {where_clause}
+        ''', params)
+        total, active_days, avg_cover_length, with_interview_prep = cursor.fetchone()
+    
+    return {
+        'total_applications': total,
+        'active_days': active_days,
+        'avg_cover_length': int(avg_cover_length or 0),
+        'with_interview_prep': with_interview_prep or 0
+    }
+
+def get_application_dates(user_id=None) -> list:
+    """Get the days applications were created on, newest first."""
+    where_clause, params = _applications_filter(user_id)
+    with db_cursor() as cursor:
+        cursor.execute(f"SELECT DISTINCT date(created_at) AS day FROM applications {where_clause} ORDER BY day DESC", params)
+        return [row[0] for row in cursor.fetchall() if row[0]]
+
+def get_application_user_ids() -> list:
+    """Get the ids of the users that have applications."""
+    with db_cursor() as cursor:
+        cursor.execute("SELECT DISTINCT user_id FROM applications ORDER BY user_id")
+        return [row[0] for row in cursor.fetchall()]
+
+def get_applications_file_import(file_path):
+    """Get the import state of a markdown applications file, None if it was never imported."""
+    with db_cursor(sqlite3.Row) as cursor:
+        cursor.execute("SELECT * FROM application_imports WHERE file_path = ?", (os.path.abspath(file_path),))
+        row = cursor.fetchone()
     
-    # Jobs by type
-    cursor.execute(f"SELECT job_type, COUNT(*) FROM jobs {user_filter} {'AND' if user_id else 'WHERE'} job_type IS NOT NULL GROUP BY job_type", params)
-    stats['jobs_by_type'] = dict(cursor.fetchall())
+    return dict(row) if row else None
+
+def import_applications_file(file_path, applications, import_state, user_id=None) -> int:
+    """
+    Save the applications parsed from a part of a markdown file and move the
+    file's import offset past it, in one transaction.
+
+    The offset only moves if it is still where the caller started parsing, so
+    two sessions importing the same file at once can't save a part twice.
+
+    Args:
+        file_path: The markdown file.
+        applications: The applications parsed from the file since the last import.
+        import_state: Dict with start_bytes (where parsing started), parsed_bytes,
+            file_size, file_mtime, header_date and header_user_id.
+        user_id: Owner of every application, read from the applications when None.
+
+    Returns:
+        int: Number of applications imported.
+    """
+    file_path = os.path.abspath(file_path)
+    state = (
+        import_state['parsed_bytes'], import_state['file_size'], import_state['file_mtime'],
+        import_state['header_date'], import_state['header_user_id']
+    )
     
-    # Recent activity (jobs added in last 7 days)
-    cursor.execute(f"SELECT COUNT(*) FROM jobs {user_filter} {'AND' if user_id else 'WHERE'} created_at >= datetime('now', '-7 days')", params)
-    stats['recent_jobs'] = cursor.fetchone()[0]
+    with db_cursor() as cursor:
+        # Claim the part first, the write lock is then held until commit
+        if import_state['start_bytes'] == 0:
+            cursor.execute('''
+                INSERT INTO application_imports
+                    (file_path, imported_count, parsed_bytes, file_size, file_mtime, header_date, header_user_id)
+                VALUES (?, 0, ?, ?, ?, ?, ?) ON CONFLICT DO NOTHING
+            ''', (file_path,) + state)
+        else:
+            cursor.execute('''
+                UPDATE application_imports
+                SET parsed_bytes = ?, file_size = ?, file_mtime = ?, header_date = ?, header_user_id = ?,
+                    imported_at = CURRENT_TIMESTAMP
+                WHERE file_path = ? AND parsed_bytes = ?
+            ''', state + (file_path, import_state['start_bytes']))
+        if cursor.rowcount == 0:
+            return 0
+        
+        imported_count = save_applications(applications, user_id)
+        cursor.execute(
+            "UPDATE application_imports SET imported_count = imported_count + ? WHERE file_path = ?",
+            (imported_count, file_path)
+        )
     
-    conn.close()
-    return stats
+    return imported_count
+
+def update_applications_file_stat(file_path, file_size, file_mtime):
+    """Remember the size and mtime of an imported file that had nothing new to import."""
+    with db_cursor() as cursor:
+        cursor.execute(
+            "UPDATE application_imports SET file_size = ?, file_mtime = ? WHERE file_path = ?",
+            (file_size, file_mtime, os.path.abspath(file_path))
+        )
 
 def create_admin_user(username: str, email: str, password: str) -> tuple:
     """Create a new admin user account."""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
     try:
-        # Check if username or email already exists
-        cursor.execute("SELECT username FROM users WHERE username = ? OR email = ?", (username, email))
-        if cursor.fetchone():
-            conn.close()
-            return False, "Username or email already exists"
-        
-        # Hash password
-        password_hash, salt = hash_password(password)
-        
-        # Generate user ID
-        user_id = generate_user_id(username)
-        
-        # Insert admin user
-        cursor.execute('''
-        INSERT INTO users (user_id, username, email, password_hash, salt, is_admin)
-        VALUES (?, ?, ?, ?, ?, 1)
-        ''', (user_id, username, email, password_hash, salt))
-        
-        conn.commit()
-        conn.close()
+        with db_cursor() as cursor:
+            # Check if username or email already exists
+            cursor.execute("SELECT username FROM users WHERE username = ? OR email = ?", (username, email))
+            if cursor.fetchone():
+                return False, "Username or email already exists"
+            
+            # Hash password
+            password_hash, salt = hash_password(password)
+            
+            # Generate user ID
+            user_id = generate_user_id(username)
+            
+            # Insert admin user
+            cursor.execute('''
+            INSERT INTO users (user_id, username, email, password_hash, salt, is_admin)
+            VALUES (?, ?, ?, ?, ?, 1)
+            ''', (user_id, username, email, password_hash, salt))
+            
         return True, user_id
         
     except Exception as e:
-        conn.close()
         return False, str(e)
 
 def promote_user_to_admin(user_id: str) -> bool:
     """Promote an existing user to admin."""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
     try:
-        cursor.execute("UPDATE users SET is_admin = 1 WHERE user_id = ?", (user_id,))
-        conn.commit()
-        success = cursor.rowcount > 0
-        conn.close()
-        return success
+        with db_cursor() as cursor:
+            cursor.execute("UPDATE users SET is_admin = 1 WHERE user_id = ?", (user_id,))
+            updated = cursor.rowcount > 0
     except Exception as e:
         print(f"Error promoting user to admin: {e}")
-        conn.close()
         return False
+    
+    invalidate_cached_user(user_id)
+    return updated
 
 def demote_admin_user(user_id: str) -> bool:
     """Remove admin privileges from a user."""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
     try:
-        cursor.execute("UPDATE users SET is_admin = 0 WHERE user_id = ?", (user_id,))
-        conn.commit()
-        success = cursor.rowcount > 0
-        conn.close()
-        return success
+        with db_cursor() as cursor:
+            cursor.execute("UPDATE users SET is_admin = 0 WHERE user_id = ?", (user_id,))
+            updated = cursor.rowcount > 0
     except Exception as e:
         print(f"Error demoting admin user: {e}")
-        conn.close()
         return False
+    
+    invalidate_cached_user(user_id)
+    return updated
 
 def is_admin_user(user_id: str) -> bool:
     """Check if a user has admin privileges."""
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
-    
-    cursor.execute("SELECT is_admin FROM users WHERE user_id = ?", (user_id,))
-    result = cursor.fetchone()
-    
-    conn.close()
-    return result and bool(result['is_admin'])
+    user = get_user_by_id(user_id)
+    return bool(user and user['is_admin'])
 
 def get_all_users(admin_user_id: str = None) -> list:
     """Get all users (admin only function)."""
     if admin_user_id and not is_admin_user(admin_user_id):
         return []
     
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
-    
-    cursor.execute("SELECT * FROM users ORDER BY created_at DESC")
-    rows = cursor.fetchall()
+    with db_cursor(sqlite3.Row) as cursor:
+        cursor.execute("SELECT * FROM users ORDER BY created_at DESC")
+        rows = cursor.fetchall()
     
-    users = [dict(row) for row in rows]
-    conn.close()
-    return users
+    return [dict(row) for row in rows]
 
 def get_all_jobs_admin(admin_user_id: str = None):
     """Get all jobs from all users (admin only function)."""
     if admin_user_id and not is_admin_user(admin_user_id):
         return []
     
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
-    
-    cursor.execute("""
-    SELECT j.*, u.username, u.email 
-    FROM jobs j 
-    LEFT JOIN users u ON j.user_id = u.user_id 
-    ORDER BY j.created_at DESC
-    """)
-    rows = cursor.fetchall()
+    with db_cursor(sqlite3.Row) as cursor:
+        cursor.execute("""
+        SELECT j.*, u.username, u.email 
+        FROM jobs j 
+        LEFT JOIN users u ON j.user_id = u.user_id 
+        ORDER BY j.created_at DESC
+        """)
+        rows = cursor.fetchall()
     
-    jobs = [dict(row) for row in rows]
-    conn.close()
-    return jobs
+    return [dict(row) for row in rows]
 
 def get_system_stats(admin_user_id: str = None) -> dict:
     """Get comprehensive system statistics (admin only)."""
     if admin_user_id and not is_admin_user(admin_user_id):
         return {}
     
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    stats = {}
-    
-    # User statistics
-    cursor.execute("SELECT COUNT(*) FROM users")
-    stats['total_users'] = cursor.fetchone()[0]
-    
-    cursor.execute("SELECT COUNT(*) FROM users WHERE is_admin = 1")
-    stats['admin_users'] = cursor.fetchone()[0]
-    
-    cursor.execute("SELECT COUNT(*) FROM users WHERE is_active = 1")
-    stats['active_users'] = cursor.fetchone()[0]
-    
-    cursor.execute("SELECT COUNT(*) FROM users WHERE created_at >= datetime('now', '-7 days')")
-    stats['new_users_week'] = cursor.fetchone()[0]
-    
-    # Job statistics
-    cursor.execute("SELECT COUNT(*) FROM jobs")
-    stats['total_jobs'] = cursor.fetchone()[0]
-    
-    cursor.execute("SELECT COUNT(*) FROM jobs WHERE score IS NOT NULL")
-    stats['processed_jobs'] = cursor.fetchone()[0]
-    
-    cursor.execute("SELECT COUNT(*) FROM jobs WHERE score >= 7")
-    stats['high_scoring_jobs'] = cursor.fetchone()[0]
-    
-    cursor.execute("SELECT AVG(score) FROM jobs WHERE score IS NOT NULL")
-    avg_score = cursor.fetchone()[0]
-    stats['average_score'] = round(avg_score, 2) if avg_score else 0
-    
-    # Session statistics
-    cursor.execute("SELECT COUNT(*) FROM user_sessions WHERE is_active = 1")
-    stats['active_sessions'] = cursor.fetchone()[0]
-    
-    cursor.execute("SELECT COUNT(*) FROM user_sessions WHERE expires_at < datetime('now')")
-    stats['expired_sessions'] = cursor.fetchone()[0]
-    
-    # Jobs by user
-    cursor.execute("""
-    SELECT u.username, COUNT(j.job_id) as job_count 
-    FROM users u 
-    LEFT JOIN jobs j ON u.user_id = j.user_id 
-    GROUP BY u.user_id, u.username 
-    ORDER BY job_count DESC 
-    LIMIT 10
-    """)
-    stats['top_users_by_jobs'] = dict(cursor.fetchall())
-    
-    conn.close()
-    return stats
+    conn = get_connection()
+    with db_cursor() as cursor:
+        # One read transaction, so job_stats can't be dropped between the check and the queries
+        if not conn.in_transaction:
+            cursor.execute("BEGIN")
+        materialized = _job_stats_maintained(cursor)
+        totals_query, params = _job_totals_query(materialized=materialized)
+        if materialized:
+            jobs_by_user = "SELECT user_id, SUM(total_jobs) AS job_count FROM job_stats GROUP BY user_id"
+        else:
+            jobs_by_user = "SELECT user_id, COUNT(*) AS job_count FROM jobs GROUP BY user_id"
+        
+        # Every user, job and session count at once, one pass over each table
+        cursor.execute(f'''
+        SELECT user_counts.*, job_totals.*, session_counts.*
+        FROM (
+            SELECT COUNT(*),
+                   SUM(CASE WHEN is_admin = 1 THEN 1 ELSE 0 END),
+                   SUM(CASE WHEN is_active = 1 THEN 1 ELSE 0 END),
+                   SUM(CASE WHEN created_at >= datetime('now', '-7 days') THEN 1 ELSE 0 END)
+            FROM users
+        ) AS user_counts, ({totals_query}) AS job_totals, (
+            SELECT SUM(CASE WHEN is_active = 1 THEN 1 ELSE 0 END),
+                   SUM(CASE WHEN expires_at < datetime('now') THEN 1 ELSE 0 END)
+            FROM user_sessions
+        ) AS session_counts
+        ''', params)
+        (total_users, admin_users, active_users, new_users_week,
+         total_jobs, processed_jobs, high_scoring_jobs, avg_score,
+         active_sessions, expired_sessions) = cursor.fetchone()
+        
+        # Jobs by user
+        cursor.execute(f"""
+        SELECT u.username, COALESCE(j.job_count, 0) AS job_count
+        FROM users u
+        LEFT JOIN ({jobs_by_user}) j ON u.user_id = j.user_id
+        ORDER BY job_count DESC
+        LIMIT 10
+        """)
+        top_users_by_jobs = dict(cursor.fetchall())
+    
+    return {
+        'total_users': total_users,
+        'admin_users': admin_users or 0,
+        'active_users': active_users or 0,
+        'new_users_week': new_users_week or 0,
+        'total_jobs': total_jobs or 0,
+        'processed_jobs': processed_jobs or 0,
+        'high_scoring_jobs': high_scoring_jobs or 0,
+        'average_score': round(avg_score, 2) if avg_score else 0,
+        'active_sessions': active_sessions or 0,
+        'expired_sessions': expired_sessions or 0,
+        'top_users_by_jobs': top_users_by_jobs
+    }
 
 def delete_user_admin(user_id: str, admin_user_id: str) -> bool:
     """Delete a user and all their data (admin only)."""
@@ -871,28 +1479,26 @@ def delete_user_admin(user_id: str, admin_user_id: str) -> bool:
     if user_id == admin_user_id:
         return False
     
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
     try:
-        # Delete user's jobs
-        cursor.execute("DELETE FROM jobs WHERE user_id = ?", (user_id,))
-        
-        # Delete user's sessions
-        cursor.execute("DELETE FROM user_sessions WHERE user_id = ?", (user_id,))
-        
-        # Delete user
-        cursor.execute("DELETE FROM users WHERE user_id = ?", (user_id,))
-        
-        conn.commit()
-        success = cursor.rowcount > 0
-        conn.close()
-        return success
+        with db_cursor() as cursor:
+            # Delete user's jobs
+            cursor.execute("DELETE FROM jobs WHERE user_id = ?", (user_id,))
+            
+            # Delete user's applications
+            cursor.execute("DELETE FROM applications WHERE user_id = ?", (user_id,))
+            
+            # Delete user's sessions
+            cursor.execute("DELETE FROM user_sessions WHERE user_id = ?", (user_id,))
+            
+            # Delete user
+            cursor.execute("DELETE FROM users WHERE user_id = ?", (user_id,))
+            deleted = cursor.rowcount > 0
     except Exception as e:
         print(f"Error deleting user: {e}")
-        conn.rollback()
-        conn.close()
         return False
+    
+    invalidate_cached_user(user_id)
+    return deleted
 
 def toggle_user_status(user_id: str, admin_user_id: str) -> bool:
     """Toggle user active/inactive status (admin only)."""
@@ -903,19 +1509,16 @@ def toggle_user_status(user_id: str, admin_user_id: str) -> bool:
     if user_id == admin_user_id:
         return False
     
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
     try:
-        cursor.execute("UPDATE users SET is_active = NOT is_active WHERE user_id = ?", (user_id,))
-        conn.commit()
-        success = cursor.rowcount > 0
-        conn.close()
-        return success
+        with db_cursor() as cursor:
+            cursor.execute("UPDATE users SET is_active = NOT is_active WHERE user_id = ?", (user_id,))
+            toggled = cursor.rowcount > 0
     except Exception as e:
         print(f"Error toggling user status: {e}")
-        conn.close()
         return False
+    
+    invalidate_cached_user(user_id)
+    return toggled
 
 # ========================
 # PROMPT MANAGEMENT FUNCTIONS
@@ -932,76 +1535,103 @@ def create_or_update_prompt(prompt_type: str, prompt_name: str, prompt_content:
     if not is_admin_user(admin_user_id):
         return False, "Only administrators can manage prompts"
     
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
     try:
-        # Check if prompt type already exists
-        cursor.execute("SELECT prompt_id FROM prompts WHERE prompt_type = ?", (prompt_type,))
-        existing = cursor.fetchone()
-        
-        if existing:
-            # Update existing prompt
-            cursor.execute('''
-            UPDATE prompts 
-            SET prompt_name = ?, prompt_content = ?, updated_at = CURRENT_TIMESTAMP
-            WHERE prompt_type = ?
-            ''', (prompt_name, prompt_content, prompt_type))
-            action = "updated"
-        else:
-            # Create new prompt
-            prompt_id = generate_prompt_id(prompt_type)
-            cursor.execute('''
-            INSERT INTO prompts (prompt_id, prompt_type, prompt_name, prompt_content, created_by)
-            VALUES (?, ?, ?, ?, ?)
-            ''', (prompt_id, prompt_type, prompt_name, prompt_content, admin_user_id))
-            action = "created"
-        
-        conn.commit()
-        conn.close()
+        with db_cursor() as cursor:
+            # Check if prompt type already exists
+            cursor.execute("SELECT prompt_id FROM prompts WHERE prompt_type = ?", (prompt_type,))
+            existing = cursor.fetchone()
+            
+            if existing:
+                # Update existing prompt
+                cursor.execute('''
+                UPDATE prompts 
+                SET prompt_name = ?, prompt_content = ?, updated_at = CURRENT_TIMESTAMP
+                WHERE prompt_type = ?
+                ''', (prompt_name, prompt_content, prompt_type))
+                action = "updated"
+            else:
+                # Create new prompt
+                prompt_id = generate_prompt_id(prompt_type)
+                cursor.execute('''
+                INSERT INTO prompts (prompt_id, prompt_type, prompt_name, prompt_content, created_by)
+                VALUES (?, ?, ?, ?, ?)
+                ''', (prompt_id, prompt_type, prompt_name, prompt_content, admin_user_id))
+                action = "created"
+            
+            bump_prompt_version(cursor)
         return True, f"Prompt {action} successfully"
         
     except Exception as e:
-        conn.close()
         return False, str(e)
 
+def bump_prompt_version(cursor):
+    """
+    Mark every process's prompt registry stale after the prompts table changed.
+    Call it with the cursor that changed the prompts, so both commit together.
+    """
+    cursor.execute("UPDATE prompt_version SET version = version + 1 WHERE id = 1")
+
+def get_prompt_version() -> int:
+    """Get the prompt version, it grows every time a prompt is created, updated or deleted."""
+    with db_cursor() as cursor:
+        cursor.execute("SELECT version FROM prompt_version WHERE id = 1")
+        return cursor.fetchone()[0]
+
+def _get_active_prompts() -> dict:
+    """
+    Get the active prompts by type as (row, PromptTemplate) pairs, loading them
+    all in one query when the database or the prompt version changed.
+    """
+    with _prompt_registry_lock:
+        # Read before the prompts, so a change committed in between only causes another reload
+        version = get_prompt_version()
+        if _prompt_registry['db_path'] != DB_PATH or _prompt_registry['version'] != version:
+            with db_cursor(sqlite3.Row) as cursor:
+                cursor.execute("SELECT * FROM prompts WHERE is_active = 1")
+                rows = cursor.fetchall()
+            
+            _prompt_registry['prompts'] = {
+                row['prompt_type']: (dict(row), PromptTemplate(row['prompt_content'])) for row in rows
+            }
+            _prompt_registry['db_path'] = DB_PATH
+            _prompt_registry['version'] = version
+        return _prompt_registry['prompts']
+
 def get_prompt_by_type(prompt_type: str) -> dict:
     """Get a prompt by its type."""
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
-    
-    cursor.execute('''
-    SELECT * FROM prompts 
-    WHERE prompt_type = ? AND is_active = 1
-    ''', (prompt_type,))
-    
-    result = cursor.fetchone()
-    conn.close()
-    
-    if result:
-        return dict(result)
+    prompt = _get_active_prompts().get(prompt_type)
+    if prompt:
+        return dict(prompt[0])
     return None
 
+def get_prompt_template_by_type(prompt_type: str, default: str) -> PromptTemplate:
+    """
+    Get the parsed template of a prompt type, or of default when no prompt of that type is active.
+
+    Args:
+        prompt_type: The prompt type, e.g. cover_letter.
+        default: The prompt to use when the admin hasn't set one, e.g. from src/prompts.py.
+    """
+    prompt = _get_active_prompts().get(prompt_type)
+    if prompt:
+        return prompt[1]
+    return get_prompt_template(default)
+
 def get_all_prompts(admin_user_id: str = None) -> list:
     """Get all prompts. Only admins can view all prompts."""
     if admin_user_id and not is_admin_user(admin_user_id):
         return []
     
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
-    
-    cursor.execute('''
-    SELECT p.*, u.username as created_by_username
-    FROM prompts p
-    LEFT JOIN users u ON p.created_by = u.user_id
-    WHERE p.is_active = 1
-    ORDER BY p.prompt_type, p.created_at DESC
-    ''')
-    
-    results = cursor.fetchall()
-    conn.close()
+    with db_cursor(sqlite3.Row) as cursor:
+        cursor.execute('''
+        SELECT p.*, u.username as created_by_username
+        FROM prompts p
+        LEFT JOIN users u ON p.created_by = u.user_id
+        WHERE p.is_active = 1
+        ORDER BY p.prompt_type, p.created_at DESC
+        ''')
+        
+        results = cursor.fetchall()
     
     return [dict(row) for row in results]
 
@@ -1010,20 +1640,17 @@ def delete_prompt(prompt_type: str, admin_user_id: str) -> tuple:
     if not is_admin_user(admin_user_id):
         return False, "Only administrators can delete prompts"
     
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
     try:
-        cursor.execute("DELETE FROM prompts WHERE prompt_type = ?", (prompt_type,))
-        if cursor.rowcount > 0:
-            conn.commit()
-            conn.close()
+        with db_cursor() as cursor:
+            cursor.execute("DELETE FROM prompts WHERE prompt_type = ?", (prompt_type,))
+            deleted = cursor.rowcount > 0
+            bump_prompt_version(cursor)
+        
+        if deleted:
             return True, "Prompt deleted successfully"
         else:
-            conn.close()
             return False, "Prompt not found"
     except Exception as e:
-        conn.close()
         return False, str(e)
 
 def initialize_default_prompts(admin_user_id: str):
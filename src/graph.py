@@ -2,6 +2,9 @@ from langgraph.graph import END, StateGraph
 from colorama import Fore, Style
 from .nodes import MainGraphNodes, CreateJobApplicationNodes
 from .state import ApplicationState, ApplicationStateInput, MainGraphState, MainGraphStateInput
+from .llm_scheduler import get_llm_scheduler
+from .prompt_assembly import prompt_cache_stats
+from .streaming_pipeline import StreamingPipeline
 
 # Path to the cover letter template file
 COVER_LETTERS_FILE = "./files/cover_letter.md"
@@ -46,8 +49,13 @@ class UpworkAutomation:
         generate_application_subgraph.add_edge("generate_interview_preparation", "finalize_job_application")
         generate_application_subgraph.add_edge("finalize_job_application", END)
 
-        # Create main automation graph
-        main_automation_nodes = MainGraphNodes(self.profile, self.number_of_jobs, self.batch_size)
+        # Create main automation graph, its nodes run the subgraph through a sliding window executor
+        self.application_graph = generate_application_subgraph.compile()
+        main_automation_nodes = MainGraphNodes(
+            self.profile, self.number_of_jobs, self.batch_size, application_graph=self.application_graph
+        )
+        self.upwork_scraper = main_automation_nodes.upwork_scraper
+        self.streaming_pipeline = StreamingPipeline(main_automation_nodes, self.batch_size)
         main_graph = StateGraph(MainGraphState, input=MainGraphStateInput)
 
         # Define main graph nodes for the workflow
@@ -55,8 +63,6 @@ class UpworkAutomation:
         main_graph.add_node(main_automation_nodes.score_scraped_jobs)
         main_graph.add_node(main_automation_nodes.check_for_job_matches)
         main_graph.add_node(main_automation_nodes.generate_jobs_applications)
-        main_graph.add_node("create_job_application_content", generate_application_subgraph.compile())
-        main_graph.add_node(main_automation_nodes.save_generated_jobs_application)
 
         # Define transitions for the main graph
         main_graph.set_entry_point("scrape_upwork_jobs")
@@ -67,17 +73,7 @@ class UpworkAutomation:
             main_automation_nodes.need_to_process_matches,
             {"Process jobs": "generate_jobs_applications", "No matches": END}
         )
-        main_graph.add_conditional_edges(
-            "generate_jobs_applications",
-            main_automation_nodes.initiate_content_generation,
-            ["create_job_application_content"],
-        )
-        main_graph.add_edge("create_job_application_content", "save_generated_jobs_application")
-        main_graph.add_conditional_edges(
-            "save_generated_jobs_application",
-            main_automation_nodes.need_to_process_matches,
-            {"Process jobs": "generate_jobs_applications", "No matches": END}
-        )
+        main_graph.add_edge("generate_jobs_applications", END)
         
         # Compile and return the main graph
         return main_graph.compile()
@@ -95,4 +91,28 @@ class UpworkAutomation:
         print(Fore.BLUE + "----- Running Upwork Jobs Automation -----\n" + Style.RESET_ALL)
         config = {"recursion_limit": 1000}
         state = await self.graph.ainvoke({"job_title": job_title}, config)
+        print(f"LLM scheduler: {get_llm_scheduler().summary()}")
+        print(f"Provider prompt cache: {prompt_cache_stats.summary()}")
         return state
+
+    async def run_streaming(self, job_title):
+        """
+        Execute the workflow in streaming mode: each job is scored as soon as it is
+        scraped and gets its application as soon as it is scored as a match.
+
+        Args:
+            job_title (str): Title of the job to process.
+
+        Returns:
+            dict: Stats of the run.
+        """
+        stats = await self.streaming_pipeline.run(job_title)
+        print(f"LLM scheduler: {get_llm_scheduler().summary()}")
+        print(f"Provider prompt cache: {prompt_cache_stats.summary()}")
+        return stats
+
+    async def close(self):
+        """
+        Release the browser pool kept alive between scrape runs.
+        """
+        await self.upwork_scraper.close()
@@ -0,0 +1,138 @@
+import re
+from bs4 import BeautifulSoup
+from pydantic import ValidationError
+from src.structured_outputs import JobInformation, ClientInformation, JobType
+
+
+def _text(element):
+    """
+    Return the stripped text of an element, or None if it is missing or empty.
+    """
+    if element is None:
+        return None
+    text = element.get_text(" ", strip=True)
+    return text or None
+
+
+def _description_text(element):
+    """
+    Extract the full job description, keeping paragraph and line breaks.
+    """
+    if element is None:
+        return None
+    for br in element.find_all("br"):
+        br.replace_with("\n")
+    paragraphs = element.find_all("p")
+    if paragraphs:
+        text = "\n\n".join(p.get_text().strip() for p in paragraphs if p.get_text().strip())
+    else:
+        text = element.get_text().strip()
+    # Collapse the indentation left over from the page markup
+    text = re.sub(r"[ \t]*\n[ \t]*", "\n", text)
+    text = re.sub(r"\n{3,}", "\n\n", text)
+    return text or None
+
+
+def _parse_features(main):
+    """
+    Read job type, duration, experience level and payment rate from the features list.
+    """
+    features = {}
+    features_list = main.select_one("ul.features")
+    if features_list is None:
+        return features
+
+    for item in features_list.find_all("li", recursive=False):
+        icon = item.select_one("[data-cy]")
+        icon_name = icon["data-cy"] if icon else ""
+        label = _text(item.select_one(".description")) or ""
+        value = _text(item.find("strong"))
+
+        if icon_name == "fixed-price" or label.lower().startswith("fixed"):
+            features["job_type"] = JobType.FIXED
+        elif icon_name == "clock-hourly" or label.lower() == "hourly":
+            features["job_type"] = JobType.HOURLY
+
+        if icon_name.startswith("duration") and value:
+            features["duration"] = value
+        elif icon_name == "expertise" and value:
+            features["experience_level"] = value
+
+    amounts = [_text(budget.find("strong")) for budget in features_list.select('[data-test="BudgetAmount"]')]
+    amounts = [amount for amount in amounts if amount]
+    if amounts:
+        features["payment_rate"] = "-".join(amounts)
+
+    return features
+
+
+def _parse_client(main):
+    """
+    Read the "About the client" sidebar, or return None if any required field is missing.
+    """
+    container = main.select_one('[data-test="about-client-container"]')
+    if container is None:
+        return None
+
+    location_item = container.select_one('[data-qa="client-location"]')
+    location = _text(location_item.find("strong")) if location_item else None
+
+    spend = container.select_one('[data-qa="client-spend"]')
+    total_spent = _text(spend.find("span")) if spend else None
+
+    hires_text = _text(container.select_one('[data-qa="client-hires"]')) or ""
+    hires_match = re.search(r"(\d[\d,]*)\s+hires?", hires_text)
+    total_hires = int(hires_match.group(1).replace(",", "")) if hires_match else None
+
+    joined_text = _text(container.select_one('[data-qa="client-contract-date"]')) or ""
+    joined_date = re.sub(r"^Member since\s*", "", joined_text) or None
+
+    company_profile = _text(container.select_one('[data-qa="client-company-profile"]'))
+
+    if not all([location, total_spent, total_hires is not None, joined_date]):
+        return None
+    return ClientInformation(
+        joined_date=joined_date,
+        location=location,
+        total_spent=total_spent,
+        total_hires=total_hires,
+        company_profile=company_profile,
+    )
+
+
+def parse_job_page(html_content):
+    """
+    Fill JobInformation straight from a job page's DOM, without calling an LLM.
+
+    Args:
+        html_content: The page HTML, or an already parsed <main id="main"> element.
+
+    Returns:
+        JobInformation: The parsed job, or None if a required field could not be found
+        and the caller should fall back to LLM extraction.
+    """
+    if isinstance(html_content, str):
+        soup = BeautifulSoup(html_content, "html.parser")
+        main = soup.find("main", id="main")
+    else:
+        main = html_content
+    if main is None:
+        return None
+
+    title_element = main.select_one("header h4 span.flex-1") or main.select_one("header h4")
+    features = _parse_features(main)
+
+    try:
+        return JobInformation(
+            title=_text(title_element),
+            description=_description_text(main.select_one('[data-test="Description"]')),
+            job_type=features.get("job_type"),
+            experience_level=features.get("experience_level"),
+            duration=features.get("duration"),
+            payment_rate=features.get("payment_rate"),
+            client_information=_parse_client(main),
+            proposal_requirements=_text(main.select_one('[data-test="ProposalRequirements"]')),
+        )
+    except ValidationError:
+        # A required field is missing or malformed
+        return None
@@ -0,0 +1,202 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_CACHE_PATH = "./data/llm_cache.db"
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+DEFAULT_MAX_ENTRIES = 5000
+
+
+def make_cache_key(model, system_prompt, user_message, response_format=None):
+    """
+    Hash everything that determines an LLM response into a cache key.
+
+    The response schema is part of the key, so changing a structured output
+    model never returns responses cached for its old shape.
+    """
+    schema = None
+    if response_format is not None:
+        schema = response_format.model_json_schema()
+    payload = json.dumps(
+        [model, system_prompt, user_message, schema],
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """
+    On-disk cache of LLM responses keyed by a hash of the request, with a TTL
+    and least-recently-used eviction once it holds more than max_entries.
+    """
+
+    def __init__(self, path=None, ttl_seconds=None, max_entries=None):
+        """
+        Args:
+            path (str): SQLite file holding the cache. Defaults to LLM_CACHE_PATH or ./data/llm_cache.db.
+            ttl_seconds (int): Seconds a response stays valid. Defaults to LLM_CACHE_TTL_SECONDS or 7 days.
+            max_entries (int): Responses kept before the least recently used are evicted.
+                Defaults to LLM_CACHE_MAX_ENTRIES or 5000.
+        """
+        self.path = path or os.getenv("LLM_CACHE_PATH", DEFAULT_CACHE_PATH)
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else int(
+            os.getenv("LLM_CACHE_TTL_SECONDS", DEFAULT_TTL_SECONDS)
+        )
+        self.max_entries = max_entries if max_entries is not None else int(
+            os.getenv("LLM_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES)
+        )
+        self.lock = threading.Lock()
+        self.conn = None
+        self.reset_stats()
+
+    def reset_stats(self):
+        """
+        Start a new stats window.
+        """
+        self.stats = {"hits": 0, "misses": 0, "writes": 0, "expired": 0, "evicted": 0}
+
+    def _connect(self):
+        """
+        Open the cache database on first use and create its table.
+        """
+        if self.conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self.conn = sqlite3.connect(self.path, check_same_thread=False)
+            self.conn.execute("PRAGMA journal_mode = WAL")
+            self.conn.execute("PRAGMA synchronous = NORMAL")
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS llm_responses (
+                    cache_key TEXT PRIMARY KEY,
+                    model TEXT NOT NULL,
+                    response TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_accessed REAL NOT NULL
+                )
+            ''')
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_llm_responses_last_accessed ON llm_responses (last_accessed)"
+            )
+            self.conn.commit()
+        return self.conn
+
+    def get(self, key, response_format=None):
+        """
+        Return the cached response for key, or None on a miss or an expired entry.
+        """
+        now = time.time()
+        with self.lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT response, created_at FROM llm_responses WHERE cache_key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.stats["misses"] += 1
+                return None
+
+            response, created_at = row
+            if now - created_at > self.ttl_seconds:
+                conn.execute("DELETE FROM llm_responses WHERE cache_key = ?", (key,))
+                conn.commit()
+                self.stats["expired"] += 1
+                self.stats["misses"] += 1
+                return None
+
+            conn.execute("UPDATE llm_responses SET last_accessed = ? WHERE cache_key = ?", (now, key))
+            conn.commit()
+            self.stats["hits"] += 1
+
+        if response_format is not None:
+            return response_format.model_validate_json(response)
+        return json.loads(response)
+
+    def set(self, key, model, value):
+        """
+        Store a response, evicting expired and least recently used entries over the size limit.
+        """
+        if hasattr(value, "model_dump_json"):
+            response = value.model_dump_json()
+        else:
+            response = json.dumps(value)
+
+        now = time.time()
+        with self.lock:
+            conn = self._connect()
+            conn.execute(
+                '''
+                INSERT OR REPLACE INTO llm_responses (cache_key, model, response, created_at, last_accessed)
+                VALUES (?, ?, ?, ?, ?)
+                ''',
+                (key, model, response, now, now),
+            )
+            self.stats["writes"] += 1
+
+            cursor = conn.execute(
+                "DELETE FROM llm_responses WHERE created_at < ?", (now - self.ttl_seconds,)
+            )
+            self.stats["expired"] += cursor.rowcount
+
+            count = conn.execute("SELECT COUNT(*) FROM llm_responses").fetchone()[0]
+            if count > self.max_entries:
+                cursor = conn.execute(
+                    '''
+                    DELETE FROM llm_responses WHERE cache_key IN (
+                        SELECT cache_key FROM llm_responses ORDER BY last_accessed LIMIT ?
+                    )
+                    ''',
+                    (count - self.max_entries,),
+                )
+                self.stats["evicted"] += cursor.rowcount
+            conn.commit()
+
+    def clear(self):
+        """
+        Remove every cached response.
+        """
+        with self.lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM llm_responses")
+            conn.commit()
+
+    def summary(self):
+        """
+        Describe the hit rate of the current stats window.
+        """
+        lookups = self.stats["hits"] + self.stats["misses"]
+        hit_rate = self.stats["hits"] / lookups * 100 if lookups else 0
+        return (
+            f"{self.stats['hits']}/{lookups} hits ({hit_rate:.0f}%), "
+            f"{self.stats['writes']} writes, {self.stats['expired']} expired, {self.stats['evicted']} evicted"
+        )
+
+    def close(self):
+        """
+        Close the cache database.
+        """
+        with self.lock:
+            if self.conn is not None:
+                self.conn.close()
+                self.conn = None
+
+
+_llm_response_cache = None
+_llm_response_cache_lock = threading.Lock()
+
+
+def get_llm_response_cache():
+    """
+    Return the process-wide response cache, or None if LLM_CACHE_ENABLED is "false".
+    """
+    global _llm_response_cache
+    if os.getenv("LLM_CACHE_ENABLED", "true").lower() == "false":
+        return None
+    if _llm_response_cache is None:
+        with _llm_response_cache_lock:
+            if _llm_response_cache is None:
+                _llm_response_cache = LLMResponseCache()
+    return _llm_response_cache
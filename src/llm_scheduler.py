@@ -0,0 +1,334 @@
+import asyncio
+import heapq
+import itertools
+import os
+import random
+import threading
+import time
+import weakref
+from collections import deque
+
+# Lower runs first: scraped pages and scores gate everything downstream
+PRIORITY_CLASSES = {"extraction": 0, "scoring": 1, "generation": 2}
+
+# Default budgets per provider, overridable with LLM_<PROVIDER>_RPM / _TPM / _MAX_CONCURRENCY
+DEFAULT_PROVIDER_LIMITS = {
+    "openai": {"rpm": 500, "tpm": 200000, "max_concurrency": 8},
+    "anthropic": {"rpm": 50, "tpm": 40000, "max_concurrency": 4},
+    "google": {"rpm": 15, "tpm": 1000000, "max_concurrency": 4},
+    "groq": {"rpm": 30, "tpm": 6000, "max_concurrency": 4},
+}
+FALLBACK_PROVIDER_LIMITS = {"rpm": 60, "tpm": 60000, "max_concurrency": 4}
+
+# Rough size of a response, added to the prompt when reserving tokens
+ESTIMATED_OUTPUT_TOKENS = 500
+
+
+def estimate_tokens(*texts):
+    """
+    Estimate the tokens a request will use, at ~4 characters per token.
+    """
+    return sum(len(text) for text in texts) // 4 + ESTIMATED_OUTPUT_TOKENS
+
+
+def get_retry_after(error):
+    """
+    Return the delay a provider asked for in its Retry-After header, if any.
+    """
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def is_retryable_error(error):
+    """
+    Check whether an LLM error is a rate limit or transient failure worth retrying.
+    """
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    if isinstance(status, int):
+        return status == 429 or status >= 500
+
+    name = type(error).__name__
+    return any(marker in name for marker in ("RateLimit", "Timeout", "APIConnectionError", "ResourceExhausted"))
+
+
+class RateBudget:
+    """
+    Requests-per-minute and tokens-per-minute budget for one provider, shared by
+    every event loop in the process.
+    """
+
+    def __init__(self, rpm, tpm, window_seconds=60):
+        """
+        Args:
+            rpm (int): Requests allowed per window, or None for no limit.
+            tpm (int): Tokens allowed per window, or None for no limit.
+            window_seconds (float): Length of the sliding window. Defaults to 60.
+        """
+        self.rpm = rpm
+        self.tpm = tpm
+        self.window_seconds = window_seconds
+        self.events = deque()
+        self.tokens_in_window = 0
+        self.paused_until = 0
+        self.lock = threading.Lock()
+
+    def reserve(self, tokens):
+        """
+        Reserve a request of the given size.
+
+        Returns:
+            float: 0 if the request may start now, otherwise seconds to wait before trying again.
+        """
+        with self.lock:
+            now = time.monotonic()
+            if now < self.paused_until:
+                return self.paused_until - now
+
+            while self.events and self.events[0][0] <= now - self.window_seconds:
+                _, expired_tokens = self.events.popleft()
+                self.tokens_in_window -= expired_tokens
+
+            over_requests = self.rpm is not None and len(self.events) >= self.rpm
+            # A request bigger than the whole budget still runs once the window is empty
+            over_tokens = (
+                self.tpm is not None
+                and self.events
+                and self.tokens_in_window + tokens > self.tpm
+            )
+            if over_requests or over_tokens:
+                return max(self.events[0][0] + self.window_seconds - now, 0.05)
+
+            self.events.append((now, tokens))
+            self.tokens_in_window += tokens
+            return 0
+
+    def pause(self, seconds):
+        """
+        Hold every request to this provider back, after it answered with a rate limit.
+        """
+        with self.lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+
+class PrioritySlots:
+    """
+    Concurrency limit for one provider on one event loop, handing free slots
+    to the waiting request with the highest priority.
+    """
+
+    def __init__(self, max_concurrency):
+        self.max_concurrency = max_concurrency
+        self.active = 0
+        self.waiters = []
+        self.counter = itertools.count()
+
+    async def acquire(self, priority):
+        """
+        Wait for a free slot. Requests of the same priority are served in arrival order.
+        """
+        if self.active < self.max_concurrency and not self.waiters:
+            self.active += 1
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self.waiters, (priority, next(self.counter), future))
+        try:
+            # The releasing request passes its slot on by resolving the future
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+
+    def release(self):
+        """
+        Pass the slot to the next waiter, or free it.
+        """
+        while self.waiters:
+            _, _, future = heapq.heappop(self.waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self.active -= 1
+
+    def queue_depth(self):
+        """
+        Count waiting requests per priority value.
+        """
+        depth = {}
+        for priority, _, future in self.waiters:
+            if not future.done():
+                depth[priority] = depth.get(priority, 0) + 1
+        return depth
+
+
+_rate_budgets = {}
+_rate_budgets_lock = threading.Lock()
+
+
+def get_provider_limits(provider):
+    """
+    Read a provider's budgets from the environment, falling back to the defaults.
+    """
+    limits = dict(DEFAULT_PROVIDER_LIMITS.get(provider, FALLBACK_PROVIDER_LIMITS))
+    for name in ("rpm", "tpm", "max_concurrency"):
+        value = os.getenv(f"LLM_{provider.upper()}_{name.upper()}")
+        if value:
+            limits[name] = int(value)
+    return limits
+
+
+def get_rate_budget(provider):
+    """
+    Return the process-wide rate budget for a provider.
+    """
+    with _rate_budgets_lock:
+        budget = _rate_budgets.get(provider)
+        if budget is None:
+            limits = get_provider_limits(provider)
+            budget = RateBudget(limits["rpm"], limits["tpm"])
+            _rate_budgets[provider] = budget
+        return budget
+
+
+class LLMScheduler:
+    """
+    Runs LLM calls within each provider's concurrency and rate budgets, by
+    priority class, retrying rate limits and transient errors with exponential
+    backoff and jitter.
+    """
+
+    def __init__(self, max_retries=5, base_backoff=1.0, max_backoff=60.0):
+        """
+        Args:
+            max_retries (int): Retries after a retryable error before giving up. Defaults to 5.
+            base_backoff (float): Seconds to wait before the first retry. Defaults to 1.
+            max_backoff (float): Upper bound on a single backoff. Defaults to 60.
+        """
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.slots = {}
+        self.reset_stats()
+
+    def reset_stats(self):
+        """
+        Start a new stats window.
+        """
+        self.stats = {
+            "requests": 0,
+            "retries": 0,
+            "rate_limited": 0,
+            "failures": 0,
+            "wait_seconds": 0.0,
+            "max_queue_depth": 0,
+        }
+
+    def _get_slots(self, provider):
+        slots = self.slots.get(provider)
+        if slots is None:
+            slots = PrioritySlots(get_provider_limits(provider)["max_concurrency"])
+            self.slots[provider] = slots
+        return slots
+
+    def queue_depth(self):
+        """
+        Count requests waiting for a slot, per provider and priority class.
+        """
+        names = {value: name for name, value in PRIORITY_CLASSES.items()}
+        return {
+            provider: {names.get(priority, priority): count for priority, count in slots.queue_depth().items()}
+            for provider, slots in self.slots.items()
+            if slots.waiters
+        }
+
+    def _backoff(self, attempt, error):
+        """
+        Exponential backoff with full jitter, never shorter than the provider's Retry-After.
+        """
+        delay = random.uniform(0, min(self.max_backoff, self.base_backoff * 2 ** attempt))
+        retry_after = get_retry_after(error)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+    async def run(self, call, provider, priority="generation", estimated_tokens=0):
+        """
+        Run an LLM call once a slot and budget are available.
+
+        Args:
+            call: Function returning a new awaitable for each attempt.
+            provider (str): Provider whose budget the call counts against.
+            priority (str): One of PRIORITY_CLASSES. Defaults to "generation".
+            estimated_tokens (int): Tokens to reserve from the provider's budget.
+
+        Returns:
+            The result of the call.
+        """
+        priority_value = PRIORITY_CLASSES[priority]
+        slots = self._get_slots(provider)
+        budget = get_rate_budget(provider)
+
+        for attempt in range(self.max_retries + 1):
+            start = time.monotonic()
+            if slots.active >= slots.max_concurrency:
+                self.stats["max_queue_depth"] = max(self.stats["max_queue_depth"], len(slots.waiters) + 1)
+            await slots.acquire(priority_value)
+            try:
+                wait = budget.reserve(estimated_tokens)
+                while wait:
+                    await asyncio.sleep(wait)
+                    wait = budget.reserve(estimated_tokens)
+                self.stats["wait_seconds"] += time.monotonic() - start
+                self.stats["requests"] += 1
+
+                try:
+                    return await call()
+                except Exception as e:
+                    if not is_retryable_error(e) or attempt == self.max_retries:
+                        self.stats["failures"] += 1
+                        raise
+                    delay = self._backoff(attempt, e)
+                    if getattr(e, "status_code", None) == 429 or "RateLimit" in type(e).__name__:
+                        self.stats["rate_limited"] += 1
+                        budget.pause(delay)
+                    self.stats["retries"] += 1
+                    print(f"LLM call to {provider} failed ({type(e).__name__}), retrying in {delay:.1f}s")
+            finally:
+                slots.release()
+
+            await asyncio.sleep(delay)
+
+    def summary(self):
+        """
+        Describe the current stats window.
+        """
+        return (
+            f"{self.stats['requests']} requests, {self.stats['retries']} retries "
+            f"({self.stats['rate_limited']} rate limited), {self.stats['failures']} failed, "
+            f"{self.stats['wait_seconds']:.1f}s queued, max queue depth {self.stats['max_queue_depth']}"
+        )
+
+
+_schedulers = weakref.WeakKeyDictionary()
+
+
+def get_llm_scheduler():
+    """
+    Return the scheduler for the running event loop.
+
+    Slots and their waiters are bound to a loop, so each loop (e.g. one per
+    Streamlit action) gets its own scheduler, while rate budgets are shared.
+    """
+    loop = asyncio.get_running_loop()
+    scheduler = _schedulers.get(loop)
+    if scheduler is None:
+        scheduler = LLMScheduler()
+        _schedulers[loop] = scheduler
+    return scheduler
@@ -1,13 +1,15 @@
-from datetime import datetime
+import asyncio
 from langgraph.constants import Send
 from typing import List
 from colorama import Fore, Style
 from .scraper import UpworkJobScraper
+from .application_executor import ApplicationExecutor
 from .utils import (
     ainvoke_llm,
     format_scraped_job_for_scoring,
+    index_scores_by_id,
     convert_jobs_matched_to_string_list,
-    COVER_LETTERS_FILE
+    convert_job_application_to_dict
 )
 from .structured_outputs import (
     JobScores,
@@ -15,16 +17,20 @@ from .structured_outputs import (
     CallScript,
     JobApplication
 )
-from .database import ensure_db_exists, save_jobs, get_prompt_by_type
+from .prompt_assembly import assemble_prompt
+from .profile_facts import load_profile_facts_index
+from .database import ensure_db_exists, bulk_save_jobs, get_prompt_template_by_type, save_applications
 from .state import *
 from .prompts import *
 
 class MainGraphNodes:
-    def __init__(self, profile, num_jobs=10, batch_size=3):
+    def __init__(self, profile, num_jobs=10, batch_size=3, score_retries=2, application_graph=None, application_timeout=None):
         self.profile = profile
         self.number_of_jobs = num_jobs
         self.batch_size = batch_size
+        self.score_retries = score_retries
         self.upwork_scraper = UpworkJobScraper()
+        self.application_executor = ApplicationExecutor(application_graph, batch_size, application_timeout)
         
         # Ensure jobs DB exists or create it
         ensure_db_exists()
@@ -60,15 +66,46 @@ class MainGraphNodes:
         @return: A list of Send operations, one for each batch.
         """
         jobs = state["scraped_jobs"]
-        batches = [
-            jobs[i : i + self.batch_size]
-            for i in range(0, len(jobs), self.batch_size)
-        ]
+        # Jobs are scored under their position in scraped_jobs, so the scores
+        # can be merged back whatever order the batches finish in
         return [
-            Send("score_scraped_jobs", ScoreJobsState(jobs_batch=batch))
-            for batch in batches
+            Send(
+                "score_scraped_jobs",
+                ScoreJobsState(
+                    jobs_batch=jobs[i : i + self.batch_size],
+                    score_ids=[str(index) for index in range(i, min(i + self.batch_size, len(jobs)))],
+                ),
+            )
+            for i in range(0, len(jobs), self.batch_size)
         ]
 
+    async def score_jobs_batch(self, jobs, score_ids, bypass_cache=False):
+        """
+        Score a list of jobs in one LLM request.
+
+        @param jobs: The jobs to score.
+        @param score_ids: The id each job is scored under.
+        @param bypass_cache: Ask the LLM again instead of reusing a cached response.
+        @return: The list of JobScore dictionaries returned by the LLM.
+        """
+        jobs_list = format_scraped_job_for_scoring(jobs, score_ids)
+        system_prompt, user_message = assemble_prompt(
+            SCORE_JOBS_PROMPT,
+            str(jobs_list),
+            request="Evaluate these Jobs:",
+            profile=self.profile
+        )
+        results = await ainvoke_llm(
+            system_prompt=system_prompt,
+            user_message=user_message,
+            model="openai/gpt-4o-mini",
+            response_format=JobScores,
+            bypass_cache=bypass_cache,
+            priority="scoring"
+        )
+        jobs_scores = results.model_dump()
+        return jobs_scores["scores"]
+
     async def score_scraped_jobs(self, state: ScoreJobsState) -> MainGraphState:
         """
         Score a batch of jobs using an LLM.
@@ -77,18 +114,48 @@ class MainGraphNodes:
         @return: Updated state with scored jobs.
         """
         print(Fore.YELLOW + "----- Scoring a batch of jobs -----\n" + Style.RESET_ALL)
-        jobs_list = format_scraped_job_for_scoring(state["jobs_batch"])
-        score_jobs_prompt = SCORE_JOBS_PROMPT.format(profile=self.profile)
-        results = await ainvoke_llm(
-            system_prompt=score_jobs_prompt,
-            user_message=f"Evaluate these Jobs:\n\n{jobs_list}",
-            model="openai/gpt-4o-mini",
-            response_format=JobScores
-        )
-        jobs_scores = results.model_dump()
-        return {"scores": [*jobs_scores["scores"]]}
+        scores = await self.score_jobs_batch(state["jobs_batch"], state["score_ids"])
+        # Ids from outside the batch would overwrite the scores of other batches' jobs
+        score_ids = {str(score_id) for score_id in state["score_ids"]}
+        return {"scores": [score for score in scores if str(score["job_id"]).strip() in score_ids]}
 
-    def check_for_job_matches(self, state):
+    async def rescore_missing_jobs(self, all_jobs, scores_by_id):
+        """
+        Re-queue jobs that came back without a score, a few times at most.
+
+        @param all_jobs: All scraped jobs.
+        @param scores_by_id: Scores collected so far, updated in place.
+        @return: The ids of the jobs that still have no score.
+        """
+        missing_ids = [str(index) for index in range(len(all_jobs)) if str(index) not in scores_by_id]
+        for _ in range(self.score_retries):
+            if not missing_ids:
+                break
+            print(f"{len(missing_ids)} jobs came back without a score, re-scoring them")
+            batches = [
+                missing_ids[i : i + self.batch_size]
+                for i in range(0, len(missing_ids), self.batch_size)
+            ]
+            # A cached response would leave the same jobs out again
+            results = await asyncio.gather(
+                *[
+                    self.score_jobs_batch([all_jobs[int(score_id)] for score_id in batch], batch, bypass_cache=True)
+                    for batch in batches
+                ],
+                return_exceptions=True,
+            )
+            for batch, scores in zip(batches, results):
+                if isinstance(scores, Exception):
+                    print(f"Error re-scoring jobs: {scores}")
+                    continue
+                batch_scores = index_scores_by_id(scores)
+                for score_id in batch:
+                    if score_id in batch_scores:
+                        scores_by_id[score_id] = batch_scores[score_id]
+            missing_ids = [score_id for score_id in missing_ids if score_id not in scores_by_id]
+        return missing_ids
+
+    async def check_for_job_matches(self, state):
         """
         Check and process job matches based on scores.
 
@@ -102,14 +169,19 @@ class MainGraphNodes:
         )
         all_jobs = state["scraped_jobs"]
         
-        # Add scores to jobs
-        all_jobs = [job | {"score": score["score"]} for job, score in zip(all_jobs, state["scores"])]
-        print(all_jobs)
+        # Add scores to jobs by the id they were scored under
+        scores_by_id = index_scores_by_id(state["scores"])
+        missing_ids = await self.rescore_missing_jobs(all_jobs, scores_by_id)
+        if missing_ids:
+            print(f"{len(missing_ids)} jobs are saved without a score")
+        all_jobs = [job | {"score": scores_by_id.get(str(index))} for index, job in enumerate(all_jobs)]
+        print(f"Scored {len(all_jobs) - len(missing_ids)} of {len(all_jobs)} jobs")
         
-        jobs_matched = [job for job in all_jobs if job["score"] >= 7]
+        jobs_matched = [job for job in all_jobs if job["score"] is not None and job["score"] >= 7]
         
         # Save matched jobs details to DB
-        save_jobs(all_jobs)
+        inserted_count, skipped_count = bulk_save_jobs(all_jobs)
+        print(f"Saved {inserted_count} new jobs to DB, skipped {skipped_count} existing\n")
         
         # Convert jobs to list of string for easy LLM readability
         matches = convert_jobs_matched_to_string_list(jobs_matched)
@@ -138,74 +210,62 @@ class MainGraphNodes:
             )
             return "Process jobs"
 
-    def generate_jobs_applications(self, state):
+    async def generate_jobs_applications(self, state):
         """
-        Calculate the batch of jobs to process and remove them from the matches list.
+        Generate the applications of all matched jobs, keeping batch_size generations
+        in flight and saving each application as soon as it is ready.
 
-        @param state: Current application state.
-        @return: List of jobs in the current batch.
+        @param state: Current application state with matches.
+        @return: Generated applications, with no matches left to process.
         """
         print(
             Fore.YELLOW
             + "----- Generating Jobs Applications -----\n"
             + Style.RESET_ALL
         )
-        # Calculate the batch of jobs to process
-        job_matched = state["matches"]
-        batch = job_matched[:self.batch_size]
-        job_matched = job_matched[self.batch_size:]  # Remove processed jobs
-        
+        applications = await self.application_executor.run(
+            state["matches"], on_applications=self.save_applications
+        )
+        print(f"Job applications: {self.application_executor.summary()}\n")
+
         return {
-            "matches": job_matched,
-            "jobs_processing_batch": batch
+            "matches": [],
+            "applications": applications
         }
 
-    def initiate_content_generation(self, state: MainGraphState) -> List[Send]:
+    def save_applications(self, applications):
         """
-        Start generating job application content in parallel.
+        Save job applications to the applications table, one row each.
 
-        @param state: Current application state with matches.
-        @return: List of Send operations for content generation.
+        @param applications: The JobApplication objects to save.
         """
-        return [
-            Send("create_job_application_content", {"job_description": job})
-            for job in state["jobs_processing_batch"]
-        ]
+        save_applications([convert_job_application_to_dict(application) for application in applications])
 
-    def save_generated_jobs_application(self, state: MainGraphState):
-        """
-        Save the generated job applications to a file.
+class CreateJobApplicationNodes:
+    def __init__(self, profile, bypass_cache=False):
+        self.profile = profile
+        # Skip cached cover letters and interview scripts when regenerating
+        self.bypass_cache = bypass_cache
+        self.profile_facts_index = None
+        self.profile_facts_lock = None
 
-        @param state: Current application state with applications.
-        @return: Unchanged state.
+    async def get_profile_facts_index(self):
         """
-        print(
-            Fore.YELLOW + "----- Saving Generated Job Applications content -----\n" + Style.RESET_ALL
-        )
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
-        with open(COVER_LETTERS_FILE, "a") as file:
-            file.write("\n" + "=" * 80 + "\n")
-            file.write(f"DATE: {timestamp}\n")
-            file.write("=" * 80 + "\n\n")
+        Load the profile facts index once, shared by every job of the run.
 
-            for application in state["applications"]:
-                file.write("### Job Description\n")
-                file.write(application.job_description + "\n\n")
-
-                file.write("### Cover Letter\n")
-                file.write(application.cover_letter + "\n\n")
-
-                file.write("### Interview Preparation\n")
-                file.write(application.interview_preparation + "\n\n")
-
-                file.write("\n" + "/" * 100 + "\n")
-
-        return state
-
-class CreateJobApplicationNodes:
-    def __init__(self, profile):
-        self.profile = profile
+        @return: The index, or None if the profile could not be decomposed.
+        """
+        if self.profile_facts_index is None:
+            if self.profile_facts_lock is None:
+                self.profile_facts_lock = asyncio.Lock()
+            async with self.profile_facts_lock:
+                if self.profile_facts_index is None:
+                    try:
+                        self.profile_facts_index = await load_profile_facts_index(self.profile)
+                    except Exception as e:
+                        print(f"Error building profile facts index, summarizing the profile per job: {e}")
+                        self.profile_facts_index = False
+        return self.profile_facts_index or None
 
     async def gather_relevant_infos_from_profile(self, state: ApplicationState):
         """
@@ -215,10 +275,20 @@ class CreateJobApplicationNodes:
         @return: Updated state with relevant information.
         """
         print(Fore.YELLOW + "----- Gathering Relevant Information from Profile -----\n" + Style.RESET_ALL)
-        profile_analysis_prompt = PROFILE_ANALYZER_PROMPT.format(profile=self.profile)
+
+        # Pick the relevant facts locally instead of asking the LLM for every job
+        profile_facts_index = await self.get_profile_facts_index()
+        if profile_facts_index is not None:
+            return {"relevant_infos": profile_facts_index.relevant_infos(state["job_description"])}
+
+        system_prompt, user_message = assemble_prompt(
+            PROFILE_ANALYZER_PROMPT,
+            state["job_description"],
+            profile=self.profile
+        )
         information = await ainvoke_llm(
-            system_prompt=profile_analysis_prompt,
-            user_message=state["job_description"],
+            system_prompt=system_prompt,
+            user_message=user_message,
             model="openai/gpt-4o-mini"
         )
         return {"relevant_infos": information}
@@ -232,23 +302,22 @@ class CreateJobApplicationNodes:
         """
         print(Fore.YELLOW + "----- Generating Cover Letter -----\n" + Style.RESET_ALL)
         
-        # Get custom prompt from database or fallback to default
-        custom_prompt = get_prompt_by_type("cover_letter")
-        if custom_prompt:
-            cover_letter_prompt = custom_prompt['prompt_content'].format(
-                profile=state["relevant_infos"]
-            )
-        else:
-            # Fallback to default prompt from prompts.py
-            cover_letter_prompt = GENERATE_COVER_LETTER_PROMPT.format(
-                profile=state["relevant_infos"]
-            )
+        # Get custom prompt from the prompt registry or fallback to default from prompts.py
+        cover_letter_template = get_prompt_template_by_type("cover_letter", GENERATE_COVER_LETTER_PROMPT)
         
+        # The relevant information changes per job, so it goes after the shared instructions
+        system_prompt, user_message = assemble_prompt(
+            cover_letter_template,
+            state["job_description"],
+            request="Write a cover letter for the job described below:",
+            job_profile=state["relevant_infos"]
+        )
         result = await ainvoke_llm(
-            system_prompt=cover_letter_prompt,
-            user_message=f"Write a cover letter for the job described below:\n\n{state['job_description']}",
+            system_prompt=system_prompt,
+            user_message=user_message,
             model="openai/gpt-4o-mini",
-            response_format=CoverLetter
+            response_format=CoverLetter,
+            bypass_cache=self.bypass_cache
         )
         return {"cover_letter": result.letter}
 
@@ -258,23 +327,24 @@ class CreateJobApplicationNodes:
         """
         print(Fore.YELLOW + "----- Generating Interview Preparation -----\n" + Style.RESET_ALL)
         
-        # Get custom prompt from database or fallback to default
-        custom_prompt = get_prompt_by_type("interview_prep")
-        if custom_prompt:
-            interview_preparation_prompt = custom_prompt['prompt_content'].format(
-                profile=state["relevant_infos"]
-            )
-        else:
-            # Fallback to default prompt from prompts.py
-            interview_preparation_prompt = GENERATE_INTERVIEW_PREPARATION_PROMPT.format(
-                profile=state["relevant_infos"]
-            )
+        # Get custom prompt from the prompt registry or fallback to default from prompts.py
+        interview_preparation_template = get_prompt_template_by_type(
+            "interview_prep", GENERATE_INTERVIEW_PREPARATION_PROMPT
+        )
         
+        # The relevant information changes per job, so it goes after the shared instructions
+        system_prompt, user_message = assemble_prompt(
+            interview_preparation_template,
+            state["job_description"],
+            request="Create preparation for the job described below:",
+            job_profile=state["relevant_infos"]
+        )
         result = await ainvoke_llm(
-            system_prompt=interview_preparation_prompt,
-            user_message=f"Create preparation for the job described below:\n\n{state['job_description']}",
+            system_prompt=system_prompt,
+            user_message=user_message,
             model="openai/gpt-4o-mini",
-            response_format=CallScript
+            response_format=CallScript,
+            bypass_cache=self.bypass_cache
         )
         return {"interview_prep": result.script}
     
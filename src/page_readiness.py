@@ -0,0 +1,110 @@
+import asyncio
+import time
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+
+class PageReadiness:
+    """
+    Decides when a loaded page is ready to be read, instead of sleeping a fixed time.
+
+    Waits for the content selector and for network idle at the same time, within
+    one timeout budget, and gives up after it so the caller can still read
+    whatever has rendered.
+    Records how long each page took and which signal it ended on.
+    """
+
+    def __init__(self, selector="main#main", timeout=10000, wait_for_network_idle=True):
+        """
+        Args:
+            selector (str): CSS selector that marks the content as present. Defaults to "main#main".
+            timeout (int): Overall wait budget per page in milliseconds. Defaults to 10000.
+            wait_for_network_idle (bool): Also count the page as ready once the network is idle,
+                for pages where the selector never shows up.
+        """
+        self.selector = selector
+        self.timeout = timeout
+        self.wait_for_network_idle = wait_for_network_idle
+        self.timings = []
+
+    async def goto(self, page, url, navigation_timeout=60000):
+        """
+        Navigate to url, stopping at DOMContentLoaded, then wait for readiness.
+
+        Returns:
+            dict: The timing record for the page.
+        """
+        start = time.perf_counter()
+        await page.goto(url, timeout=navigation_timeout, wait_until="domcontentloaded")
+        navigation_seconds = time.perf_counter() - start
+        return await self.wait(page, url, navigation_seconds)
+
+    async def wait(self, page, url, navigation_seconds=0.0):
+        """
+        Wait until the page is ready or the timeout budget is spent.
+
+        Returns:
+            dict: The timing record for the page.
+        """
+        start = time.perf_counter()
+        waits = {
+            asyncio.ensure_future(page.wait_for_selector(self.selector, state="attached", timeout=self.timeout)): "selector"
+        }
+        if self.wait_for_network_idle:
+            waits[asyncio.ensure_future(page.wait_for_load_state("networkidle", timeout=self.timeout))] = "networkidle"
+
+        # The first wait to succeed decides the signal, a timed out one leaves the others running
+        signal = "timeout"
+        pending = set(waits)
+        try:
+            while pending and signal == "timeout":
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in sorted(done, key=lambda task: waits[task] != "selector"):
+                    error = task.exception()
+                    if error is None:
+                        signal = waits[task]
+                        break
+                    if not isinstance(error, PlaywrightTimeoutError):
+                        raise error
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        timing = {
+            "url": url,
+            "signal": signal,
+            "navigation_seconds": navigation_seconds,
+            "ready_seconds": time.perf_counter() - start,
+        }
+        self.timings.append(timing)
+        return timing
+
+    def summary(self):
+        """
+        Aggregate the recorded timings.
+
+        Returns:
+            dict: Page count, mean/max wait times and how many pages ended on each signal.
+        """
+        if not self.timings:
+            return {"pages": 0}
+
+        ready = [t["ready_seconds"] for t in self.timings]
+        navigation = [t["navigation_seconds"] for t in self.timings]
+        signals = {}
+        for timing in self.timings:
+            signals[timing["signal"]] = signals.get(timing["signal"], 0) + 1
+
+        return {
+            "pages": len(self.timings),
+            "mean_navigation_seconds": round(sum(navigation) / len(navigation), 3),
+            "mean_ready_seconds": round(sum(ready) / len(ready), 3),
+            "max_ready_seconds": round(max(ready), 3),
+            "signals": signals,
+        }
+
+    def reset(self):
+        """
+        Forget the recorded timings.
+        """
+        self.timings = []
@@ -0,0 +1,151 @@
+import hashlib
+import json
+import math
+import os
+import re
+import unicodedata
+from collections import Counter
+from src.prompts import PROFILE_DECOMPOSITION_PROMPT
+from src.structured_outputs import ProfileFacts
+from src.utils import ainvoke_llm
+
+PROFILE_FACTS_DIR = "./data/profile_facts"
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "has", "have", "i", "in", "is",
+    "it", "my", "of", "on", "or", "our", "that", "the", "this", "to", "we", "will", "with", "you", "your",
+}
+
+
+def tokenize(text):
+    """
+    Split text into lowercase terms for retrieval.
+
+    NFKC folds the styled unicode letters often used in profiles (e.g. bold
+    math letters) back to plain ASCII, and terms like "c++" or "node.js" are kept whole.
+    """
+    text = unicodedata.normalize("NFKC", text).lower()
+    terms = (term.strip(".-") for term in re.findall(r"[a-z0-9][a-z0-9+#.\-]*", text))
+    return [term for term in terms if term and term not in STOPWORDS]
+
+
+class BM25Index:
+    """
+    Okapi BM25 ranking over a small, fixed set of documents.
+    """
+
+    def __init__(self, documents, k1=1.5, b=0.75):
+        """
+        Args:
+            documents (list): The texts to rank.
+            k1 (float): Term frequency saturation. Defaults to 1.5.
+            b (float): Document length normalization. Defaults to 0.75.
+        """
+        self.k1 = k1
+        self.b = b
+        self.term_counts = [Counter(tokenize(document)) for document in documents]
+        self.lengths = [sum(counts.values()) for counts in self.term_counts]
+        self.average_length = sum(self.lengths) / len(self.lengths) if self.lengths else 0
+
+        document_frequency = Counter()
+        for counts in self.term_counts:
+            document_frequency.update(counts.keys())
+        total = len(documents)
+        self.idf = {
+            term: math.log(1 + (total - frequency + 0.5) / (frequency + 0.5))
+            for term, frequency in document_frequency.items()
+        }
+
+    def scores(self, query):
+        """
+        Score every document against the query.
+        """
+        query_terms = set(tokenize(query))
+        scores = []
+        for counts, length in zip(self.term_counts, self.lengths):
+            score = 0.0
+            for term in query_terms:
+                frequency = counts.get(term)
+                if not frequency:
+                    continue
+                normalization = self.k1 * (1 - self.b + self.b * length / (self.average_length or 1))
+                score += self.idf[term] * frequency * (self.k1 + 1) / (frequency + normalization)
+            scores.append(score)
+        return scores
+
+    def search(self, query, top_k):
+        """
+        Return the indexes of the top_k matching documents, best first.
+        """
+        scores = self.scores(query)
+        ranked = sorted(range(len(scores)), key=lambda index: scores[index], reverse=True)
+        return [index for index in ranked[:top_k] if scores[index] > 0]
+
+
+class ProfileFactsIndex:
+    """
+    A freelancer profile broken down into facts, with local retrieval of the
+    facts relevant to a job.
+    """
+
+    def __init__(self, profile_facts, top_k=8):
+        """
+        Args:
+            profile_facts (ProfileFacts): The decomposed profile.
+            top_k (int): Facts included in the relevant information of a job. Defaults to 8.
+        """
+        self.profile_facts = profile_facts
+        self.top_k = top_k
+        self.bm25 = BM25Index([f"{fact.category} {fact.text}" for fact in profile_facts.facts])
+
+    def relevant_infos(self, job_description):
+        """
+        Build the relevant information about the freelancer for a job, without an LLM call.
+        """
+        facts = self.profile_facts.facts
+        selected = self.bm25.search(job_description, self.top_k)
+        if not selected:
+            # Nothing in common with the job, fall back to the first facts of the profile
+            selected = list(range(min(self.top_k, len(facts))))
+
+        # Keep the profile's own order so related facts stay together
+        lines = [f"- {facts[index].text}" for index in sorted(selected)]
+        return self.profile_facts.summary + "\n\n" + "\n".join(lines)
+
+
+def get_profile_facts_path(profile):
+    """
+    Path of the saved decomposition of a profile, keyed by a hash of its text.
+    """
+    profile_hash = hashlib.sha256(profile.encode("utf-8")).hexdigest()
+    return os.path.join(PROFILE_FACTS_DIR, f"{profile_hash}.json")
+
+
+async def load_profile_facts_index(profile, top_k=8):
+    """
+    Load the facts index of a profile, decomposing it with the LLM the first time it is seen.
+
+    Args:
+        profile (str): The freelancer profile text.
+        top_k (int): Facts included in the relevant information of a job.
+
+    Returns:
+        ProfileFactsIndex: The index, built from the saved decomposition when there is one.
+    """
+    path = get_profile_facts_path(profile)
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            profile_facts = ProfileFacts.model_validate(json.load(f))
+    else:
+        profile_facts = await ainvoke_llm(
+            system_prompt=PROFILE_DECOMPOSITION_PROMPT,
+            user_message=f"Break down this freelancer profile:\n\n{profile}",
+            model="openai/gpt-4o-mini",
+            response_format=ProfileFacts,
+        )
+        os.makedirs(PROFILE_FACTS_DIR, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(profile_facts.model_dump(), f, indent=2, ensure_ascii=False)
+        print(f"Saved {len(profile_facts.facts)} profile facts to {path}")
+
+    return ProfileFactsIndex(profile_facts, top_k)
@@ -0,0 +1,156 @@
+import string
+import threading
+from functools import lru_cache
+
+# Stands in for per-job profile text in the prefix, the text itself goes in the message
+PROFILE_IN_MESSAGE = "(given in the <profile> section of the message)"
+
+
+class PromptTemplate:
+    """
+    A prompt whose {profile} placeholders are found once, so formatting it is a
+    join. Templates with other fields keep str.format, and its errors.
+    """
+
+    def __init__(self, content):
+        """
+        Args:
+            content (str): The prompt, with {profile} placeholders and {{ }} escaped braces.
+        """
+        self.content = content
+        self.parts = self.parse(content)
+
+    @staticmethod
+    def parse(content):
+        """
+        Split a template into the literal text around its {profile} placeholders,
+        or return None if it has any other field.
+        """
+        parts = []
+        literal = []
+        try:
+            for text, field, format_spec, conversion in string.Formatter().parse(content):
+                literal.append(text)
+                if field is None:
+                    continue
+                if field != "profile" or format_spec or conversion:
+                    return None
+                parts.append("".join(literal))
+                literal = []
+        except ValueError:
+            return None
+        parts.append("".join(literal))
+        return parts
+
+    def format(self, profile=""):
+        """
+        Fill in the profile, like str.format(profile=profile).
+        """
+        if self.parts is None:
+            return self.content.format(profile=profile)
+        return profile.join(self.parts)
+
+
+@lru_cache(maxsize=64)
+def get_prompt_template(content):
+    """
+    Return the parsed template of a prompt, parsing each distinct prompt once.
+    """
+    return PromptTemplate(content)
+
+
+def assemble_prompt(template, job_details, request=None, profile=None, job_profile=None):
+    """
+    Split a prompt into a stable prefix and a variable suffix, so providers can
+    reuse their cache of the prefix across jobs.
+
+    The prefix (system prompt) holds the role, the instructions and anything
+    that is the same for every job. The suffix (user message) holds the job and
+    anything that changes with it.
+
+    Args:
+        template (str or PromptTemplate): Role and instructions, with a {profile} placeholder.
+        job_details (str): The job content, always part of the suffix.
+        request (str): Optional instruction put right before the job details.
+        profile (str): Profile text that is the same for every job, kept in the prefix.
+        job_profile (str): Profile text picked for this job, moved to the suffix.
+
+    Returns:
+        tuple: (system_prompt, user_message)
+    """
+    if job_profile is not None:
+        system_prompt = template.format(profile=PROFILE_IN_MESSAGE)
+    else:
+        system_prompt = template.format(profile=profile or "")
+
+    suffix = []
+    if job_profile is not None:
+        suffix.append(f"<profile>\n{job_profile}\n</profile>")
+    if request:
+        suffix.append(f"{request}\n\n{job_details}")
+    else:
+        suffix.append(job_details)
+    return system_prompt, "\n\n".join(suffix)
+
+
+class PromptCacheStats:
+    """
+    Counts the prompt tokens providers report as served from their prompt cache.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """
+        Start a new stats window.
+        """
+        self.by_model = {}
+
+    def record(self, model, input_tokens, cached_tokens):
+        """
+        Add one request's prompt token counts.
+        """
+        with self.lock:
+            stats = self.by_model.setdefault(model, {"requests": 0, "input_tokens": 0, "cached_tokens": 0})
+            stats["requests"] += 1
+            stats["input_tokens"] += input_tokens or 0
+            stats["cached_tokens"] += cached_tokens or 0
+
+    def record_usage_metadata(self, model, usage_metadata):
+        """
+        Record the usage_metadata of a LangChain AI message.
+        """
+        if not usage_metadata:
+            return
+        input_token_details = usage_metadata.get("input_token_details") or {}
+        self.record(model, usage_metadata.get("input_tokens"), input_token_details.get("cache_read"))
+
+    def record_openai_usage(self, model, usage):
+        """
+        Record the usage of an OpenAI chat completion.
+        """
+        if usage is None:
+            return
+        details = getattr(usage, "prompt_tokens_details", None)
+        self.record(model, usage.prompt_tokens, getattr(details, "cached_tokens", 0))
+
+    def summary(self):
+        """
+        Describe the share of prompt tokens served from cache, per model.
+        """
+        with self.lock:
+            if not self.by_model:
+                return "no requests"
+            parts = []
+            for model, stats in self.by_model.items():
+                share = stats["cached_tokens"] / stats["input_tokens"] * 100 if stats["input_tokens"] else 0
+                parts.append(
+                    f"{model}: {stats['cached_tokens']}/{stats['input_tokens']} prompt tokens cached "
+                    f"({share:.0f}%) over {stats['requests']} requests"
+                )
+            return ", ".join(parts)
+
+
+prompt_cache_stats = PromptCacheStats()
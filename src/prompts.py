@@ -51,6 +51,18 @@ Return your findings as a brief summary, without any additional explanation or p
 """
 
 
+PROFILE_DECOMPOSITION_PROMPT = """
+You are a **freelance profile analyzer**. Your task is to break a freelancer's profile down into short, self-contained facts, so the facts relevant to any job can be picked out later.
+
+# Instructions:
+1. Write a two sentence summary introducing the freelancer.
+2. List every skill, tool, past project, work experience, language and other qualification as a separate fact.
+3. Each fact must make sense on its own: name the technologies, domains and results it involves.
+4. Keep the details of the profile, don't merge unrelated items and don't invent anything.
+5. **Use a Simple and Friendly Tone**: Write the summary and facts in the first person, using "I" to represent the freelancer (e.g., "I have," "I did").
+"""
+
+
 GENERATE_COVER_LETTER_PROMPT = """
 # ROLE
 
@@ -115,3 +127,36 @@ You are a **freelance interview preparation coach**. Your task is to create a ta
 # Output:
 Return your final output in markdown format.
 """
+
+
+SCORE_SINGLE_JOB_PROMPT = """
+Rate job opportunities from 1-10 based on how well they match the freelancer profile.
+
+Provide only a numeric score from 1-10. Consider:
+- Skill match
+- Payment rate
+- Experience level requirements
+- Project complexity
+- Long-term potential
+
+Freelancer Profile:
+{profile}
+"""
+
+SIMPLE_COVER_LETTER_PROMPT = """
+Write personalized cover letters for the freelancer's job applications.
+
+Freelancer Profile:
+{profile}
+
+Write a professional, engaging cover letter that highlights relevant experience and addresses the job requirements. Keep it concise (2-3 paragraphs).
+"""
+
+SIMPLE_INTERVIEW_PREPARATION_PROMPT = """
+Prepare potential interview questions and answers for the freelancer's job applications.
+
+Freelancer Profile:
+{profile}
+
+Provide 3-5 likely interview questions with suggested answers based on the freelancer profile.
+"""
@@ -0,0 +1,125 @@
+import os
+from urllib.parse import urlparse
+
+# Resource types the scraper never needs to read main#main
+DEFAULT_BLOCKED_RESOURCE_TYPES = ["image", "media", "font", "stylesheet"]
+
+# Hosts (and their subdomains) whose requests are always let through
+DEFAULT_ALLOWED_DOMAINS = ["upwork.com", "upwork.net", "127.0.0.1", "localhost"]
+
+# Analytics and ad hosts that are always blocked
+DEFAULT_BLOCKED_DOMAINS = [
+    "google-analytics.com",
+    "googletagmanager.com",
+    "doubleclick.net",
+    "facebook.net",
+    "hotjar.com",
+    "segment.io",
+    "optimizely.com",
+    "bing.com",
+]
+
+
+def _list_from_env(name, default):
+    """
+    Read a comma separated list from the environment, falling back to default.
+    """
+    value = os.getenv(name)
+    if value is None:
+        return list(default)
+    return [item.strip().lower() for item in value.split(",") if item.strip()]
+
+
+def _host_matches(host, domains):
+    """
+    Check whether host is one of domains or a subdomain of one.
+    """
+    return any(host == domain or host.endswith("." + domain) for domain in domains)
+
+
+class ResourceBlocker:
+    """
+    Request router for "lean fetch" mode: aborts resource types and third-party
+    hosts the scraper doesn't need, and counts what it let through or blocked.
+    """
+
+    def __init__(self, blocked_resource_types=None, allowed_domains=None, blocked_domains=None):
+        """
+        Args:
+            blocked_resource_types (list): Playwright resource types to abort.
+            allowed_domains (list): Hosts to load, any other host is treated as third-party and blocked.
+            blocked_domains (list): Hosts to always block, even if they match allowed_domains.
+        """
+        self.blocked_resource_types = set(
+            blocked_resource_types
+            if blocked_resource_types is not None
+            else _list_from_env("SCRAPER_BLOCKED_RESOURCE_TYPES", DEFAULT_BLOCKED_RESOURCE_TYPES)
+        )
+        self.allowed_domains = (
+            allowed_domains
+            if allowed_domains is not None
+            else _list_from_env("SCRAPER_ALLOWED_DOMAINS", DEFAULT_ALLOWED_DOMAINS)
+        )
+        self.blocked_domains = (
+            blocked_domains
+            if blocked_domains is not None
+            else _list_from_env("SCRAPER_BLOCKED_DOMAINS", DEFAULT_BLOCKED_DOMAINS)
+        )
+        self.reset_stats()
+
+    def reset_stats(self):
+        """
+        Start a new stats window, usually one per scrape run.
+        """
+        self.stats = {
+            "requests_allowed": 0,
+            "requests_blocked": 0,
+            "blocked_by_type": {},
+            "bytes_loaded": 0,
+        }
+
+    def should_block(self, url, resource_type):
+        """
+        Decide whether a request should be aborted.
+        """
+        if resource_type in self.blocked_resource_types:
+            return True
+
+        host = (urlparse(url).hostname or "").lower()
+        if not host:
+            # data: and blob: urls never leave the browser
+            return False
+        if _host_matches(host, self.blocked_domains):
+            return True
+        if self.allowed_domains and not _host_matches(host, self.allowed_domains):
+            return True
+        return False
+
+    async def handle_route(self, route):
+        """
+        Playwright route handler that aborts or continues each request.
+        """
+        request = route.request
+        if self.should_block(request.url, request.resource_type):
+            self.stats["requests_blocked"] += 1
+            blocked_by_type = self.stats["blocked_by_type"]
+            blocked_by_type[request.resource_type] = blocked_by_type.get(request.resource_type, 0) + 1
+            await route.abort()
+        else:
+            self.stats["requests_allowed"] += 1
+            await route.continue_()
+
+    def record_response(self, response):
+        """
+        Add a loaded response's size to the stats, based on its Content-Length.
+        """
+        content_length = response.headers.get("content-length")
+        if content_length and content_length.isdigit():
+            self.stats["bytes_loaded"] += int(content_length)
+
+    async def install(self, context):
+        """
+        Attach the router and response tracking to a browser context.
+        """
+        await context.route("**/*", self.handle_route)
+        context.on("response", self.record_response)
@@ -1,79 +1,152 @@
+import os
 import re
 import asyncio
 import hashlib
+from urllib.parse import urlparse
 from bs4 import BeautifulSoup
 from tqdm.asyncio import tqdm_asyncio
-from playwright.async_api import async_playwright
-from src.utils import ainvoke_llm, get_playwright_browser_context, convert_html_to_markdown
-from src.database import job_exists
+from src.utils import ainvoke_llm, convert_html_to_markdown
+from src.browser_pool import BrowserPool
+from src.page_readiness import PageReadiness
+from src.resource_blocking import ResourceBlocker
+from src.database import filter_new_job_ids
 from src.structured_outputs import JobInformation
+from src.job_page_parser import parse_job_page
 from src.prompts import SCRAPER_PROMPT
 
+UPWORK_BASE_URL = "https://www.upwork.com"
+
 
 class UpworkJobScraper:
     """
     Scrapes Upwork job data based on a search query.
     """
 
-    def __init__(self, batch_size=5):
+    def __init__(self, batch_size=5, base_url=UPWORK_BASE_URL, browser_pool=None, readiness=None, lean_fetch=None):
         """
         Initializes the UpworkJobScraper with a specified batch size for parallel scraping.
 
         Args:
             batch_size (int): The number of jobs to scrape in parallel. Defaults to 5.
+            base_url (str): Site to scrape, can point to a local fixture server for offline runs.
+            browser_pool (BrowserPool): Shared browser pool, one sized to batch_size is created if omitted.
+            readiness (PageReadiness): Strategy deciding when a job page can be read.
+            lean_fetch (bool): Block images, fonts, CSS, media and third-party hosts in the default pool.
+                Defaults to the SCRAPER_LEAN_FETCH environment variable, disabled unless set to "true"
+                as the live site also loads scripts and bot checks from hosts outside upwork.com.
         """
         self.batch_size = batch_size
+        self.base_url = base_url.rstrip("/")
+        if lean_fetch is None:
+            lean_fetch = os.getenv("SCRAPER_LEAN_FETCH", "false").lower() == "true"
+        if browser_pool is None:
+            resource_blocker = None
+            if lean_fetch:
+                resource_blocker = ResourceBlocker()
+                # Never treat the site being scraped as third-party
+                base_host = urlparse(self.base_url).hostname
+                if resource_blocker.allowed_domains and base_host and base_host not in resource_blocker.allowed_domains:
+                    resource_blocker.allowed_domains.append(base_host)
+            browser_pool = BrowserPool(size=batch_size, resource_blocker=resource_blocker)
+        self.browser_pool = browser_pool
+        self.readiness = readiness or PageReadiness()
+        self.extraction_stats = {"parsed": 0, "llm_fallback": 0}
 
-    async def scrape_upwork_data(self, search_query="AI agent Developer", num_jobs=10):
+    async def close(self):
         """
-        Scrapes Upwork job data based on the search query in batches of 5 jobs at a time.
+        Shut down the browser pool used by the scraper.
+        """
+        await self.browser_pool.close()
+
+    async def fetch_job_links(self, search_query, num_jobs):
+        """
+        Loads the search results page and returns the links of jobs not collected yet.
+        Also starts a new stats window for the run.
         """
-        url = f"https://www.upwork.com/nx/search/jobs?q={search_query}&sort=recency&page=1&per_page={num_jobs}"
+        url = f"{self.base_url}/nx/search/jobs?q={search_query}&sort=recency&page=1&per_page={num_jobs}"
         print(f"DEBUG: Accessing URL: {url}")
 
-        async with async_playwright() as playwright:
-            browser = await playwright.firefox.launch(headless=True)
-            browser_context = await get_playwright_browser_context(browser)
-            page = await browser_context.new_page()
+        resource_blocker = self.browser_pool.resource_blocker
+        if resource_blocker is not None:
+            resource_blocker.reset_stats()
+        self.readiness.reset()
+        self.extraction_stats = {"parsed": 0, "llm_fallback": 0}
 
-            # Scrape the main search page
+        # Scrape the main search page
+        async with self.browser_pool.lease() as page:
             await page.goto(url)
             html_content = await page.content()
+        
+        # Save HTML content for debugging
+        with open("debug_upwork_page.html", "w", encoding="utf-8") as f:
+            f.write(html_content)
+        print("DEBUG: HTML content saved to debug_upwork_page.html")
+        
+        jobs_links_list = self.extract_jobs_urls(html_content)
+        print(f"DEBUG: Found {len(jobs_links_list)} job links")
+        return jobs_links_list
+
+    def print_run_stats(self):
+        """
+        Prints page load, lean fetch and extraction stats of the current run.
+        """
+        print(f"DEBUG: Job page load timings: {self.readiness.summary()}")
+        resource_blocker = self.browser_pool.resource_blocker
+        if resource_blocker is not None:
+            print(f"DEBUG: Lean fetch requests: {resource_blocker.stats}")
+        print(f"DEBUG: Job details extraction: {self.extraction_stats}")
+
+    async def scrape_upwork_data(self, search_query="AI agent Developer", num_jobs=10):
+        """
+        Scrapes Upwork job data based on the search query in batches of 5 jobs at a time.
+        """
+        jobs_links_list = await self.fetch_job_links(search_query, num_jobs)
+
+        jobs_data = []
+
+        # Scrape job pages in batches, the pool bounds how many pages are open at once
+        for i in tqdm_asyncio(range(0, len(jobs_links_list), self.batch_size), desc="Scraping job pages in batches"):
+            batch_links = jobs_links_list[i:i + self.batch_size]
+            batch_results = await asyncio.gather(
+                *[self.scrape_job_details(link) for link in batch_links]
+            )
+            jobs_data.extend(batch_results)
+
+        self.print_run_stats()
+
+        # Filter out None results
+        jobs_data = [job for job in jobs_data if job]
+
+        # Process and return the job info data
+        jobs_data = self.process_job_info_data(jobs_data)
             
-            # Save HTML content for debugging
-            with open("debug_upwork_page.html", "w", encoding="utf-8") as f:
-                f.write(html_content)
-            print("DEBUG: HTML content saved to debug_upwork_page.html")
-            
-            jobs_links_list = self.extract_jobs_urls(html_content)
-            print(f"DEBUG: Found {len(jobs_links_list)} job links")
-            await page.close()  # Ensure the page is closed
-
-            semaphore = asyncio.Semaphore(self.batch_size)  # Limit concurrency to batch size tasks
-            jobs_data = []
-
-            async def scrape_job_with_semaphore(link):
-                """Wrapper to scrape a job with a semaphore."""
-                async with semaphore:
-                    return await self.scrape_job_details(browser, link)
-
-            # Scrape job pages in batches
-            for i in tqdm_asyncio(range(0, len(jobs_links_list), self.batch_size), desc="Scraping job pages in batches"):
-                batch_links = jobs_links_list[i:i+5]
-                batch_results = await asyncio.gather(
-                    *[scrape_job_with_semaphore(link) for link in batch_links]
-                )
-                jobs_data.extend(batch_results)
+        return jobs_data
 
-            await browser.close()
+    async def stream_upwork_data(self, search_query="AI agent Developer", num_jobs=10):
+        """
+        Scrapes Upwork job data like scrape_upwork_data, but yields each job as soon as
+        its page is scraped, keeping batch_size pages loading at a time.
+        """
+        jobs_links_list = await self.fetch_job_links(search_query, num_jobs)
+        semaphore = asyncio.Semaphore(self.batch_size)
 
-            # Filter out None results
-            jobs_data = [job for job in jobs_data if job]
+        async def scrape_with_limit(link):
+            async with semaphore:
+                return await self.scrape_job_details(link)
 
-            # Process and return the job info data
-            jobs_data = self.process_job_info_data(jobs_data)
-                
-            return jobs_data
+        tasks = [asyncio.create_task(scrape_with_limit(link)) for link in jobs_links_list]
+        try:
+            for next_job in asyncio.as_completed(tasks):
+                job = await next_job
+                if job:
+                    yield self.process_job_info_data([job])[0]
+        finally:
+            # The consumer may stop early, don't leave pages loading
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        self.print_run_stats()
     
     def extract_job_id_from_url(self, url):
         """
@@ -85,13 +158,18 @@ class UpworkJobScraper:
             return match.group(1)
         return None
 
+    def hash_job_id(self, job_id):
+        """
+        Hash a raw Upwork job ID into the form stored in the database.
+        """
+        return hashlib.sha256(job_id.encode()).hexdigest()
+
     def extract_jobs_urls(self, html):
         """
         Extracts job URLs from the HTML content and filters out already collected jobs.
         """
         soup = BeautifulSoup(html, 'html.parser')
         job_links = []
-        skipped_count = 0
         
         # Debug: Check if we can find any h2 tags with job-tile-title class
         h2_tags = soup.find_all('h2', class_='job-tile-title')
@@ -100,48 +178,67 @@ class UpworkJobScraper:
         for h2 in h2_tags:
             a_tag = h2.find('a')
             if a_tag:
-                job_link = a_tag['href'].replace('/jobs', 'https://www.upwork.com/freelance-jobs/apply', 1)
-                job_id = self.extract_job_id_from_url(job_link)
-                
-                # Skip if job already exists in database
-                if job_id and job_exists(job_id):
-                    skipped_count += 1
-                    continue
+                job_link = a_tag['href'].replace('/jobs', f'{self.base_url}/freelance-jobs/apply', 1)
                 
                 # clean the job url
                 job_link = job_link.split('?')[0] if '?' in job_link else job_link 
                 job_links.append(job_link)
         
-        print(f"DEBUG: Total job links found: {len(job_links)}, Skipped (already in DB): {skipped_count}")
+        # Skip jobs already in the database, checking all tiles in one query
+        hashed_ids = {}
+        for job_link in job_links:
+            job_id = self.extract_job_id_from_url(job_link)
+            if job_id:
+                hashed_ids[job_link] = self.hash_job_id(job_id)
+        new_ids = filter_new_job_ids(hashed_ids.values())
+        
+        new_job_links = [
+            job_link for job_link in job_links
+            if job_link not in hashed_ids or hashed_ids[job_link] in new_ids
+        ]
+        skipped_count = len(job_links) - len(new_job_links)
+        
+        print(f"DEBUG: Total job links found: {len(new_job_links)}, Skipped (already in DB): {skipped_count}")
         
         if skipped_count > 0:
             print(f"Skipped {skipped_count} already collected jobs")
             
-        return job_links
+        return new_job_links
+
+    async def fetch_job_page(self, url):
+        """
+        Loads a job page with a leased browser page and returns its HTML.
+        """
+        async with self.browser_pool.lease() as page:
+            # Proceed as soon as the job content is rendered
+            await self.readiness.goto(page, url, navigation_timeout=60000)
+            return await page.content()
 
-    async def scrape_job_details(self, browser, url):
+    async def scrape_job_details(self, url):
         """
         Scrapes and processes a single job page.
         """
         try:
-            browser_context = await get_playwright_browser_context(browser)
-            page = await browser_context.new_page()
-            # Set a custom timeout for navigation
-            await page.goto(url, timeout=60000)  # Set timeout to 60 seconds
-            await asyncio.sleep(1)  # Allow the page to fully load
-            html_content = await page.content()
+            html_content = await self.fetch_job_page(url)
 
             # Parse the HTML to extract the <main> content of the page
             soup = BeautifulSoup(html_content, "html.parser")
             main_content = soup.find("main", id="main")
-            job_page_content_markdown = convert_html_to_markdown(main_content)
 
-            information = await ainvoke_llm(
-                system_prompt=SCRAPER_PROMPT,
-                user_message=f"Scrape all the relevant job details from the content of this page:\n\n{job_page_content_markdown}",
-                model="openai/gpt-4o-mini",
-                response_format=JobInformation,
-            )
+            # Read the fields straight from the DOM, only ask the LLM if that fails
+            information = parse_job_page(main_content) if main_content else None
+            if information is not None:
+                self.extraction_stats["parsed"] += 1
+            else:
+                self.extraction_stats["llm_fallback"] += 1
+                job_page_content_markdown = convert_html_to_markdown(main_content)
+                information = await ainvoke_llm(
+                    system_prompt=SCRAPER_PROMPT,
+                    user_message=f"Scrape all the relevant job details from the content of this page:\n\n{job_page_content_markdown}",
+                    model="openai/gpt-4o-mini",
+                    response_format=JobInformation,
+                    priority="extraction",
+                )
             job_info_dict = information.model_dump()
 
             # Process the job type from enum
@@ -154,7 +251,7 @@ class UpworkJobScraper:
             job_id = self.extract_job_id_from_url(url)
             
             # hash the job_id
-            job_info_dict["job_id"] = hashlib.sha256(job_id.encode()).hexdigest()
+            job_info_dict["job_id"] = self.hash_job_id(job_id)
 
             # Ensure field names match the database schema
             # Map client_information fields to the correct database field names
@@ -169,8 +266,6 @@ class UpworkJobScraper:
         except Exception as e:
             print(f"Error processing link {url}: {e}")
             return None
-        finally:
-            await page.close()  # Ensure the page is closed
 
     def process_job_info_data(self, jobs_data):
         for job in jobs_data:
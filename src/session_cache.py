@@ -0,0 +1,125 @@
+import copy
+import os
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_TTL_SECONDS = 30
+DEFAULT_MAX_ENTRIES = 1000
+
+
+def get_session_cache_ttl():
+    """
+    Seconds a cached session or user stays valid, from SESSION_CACHE_TTL_SECONDS.
+    """
+    return float(os.getenv("SESSION_CACHE_TTL_SECONDS", DEFAULT_TTL_SECONDS))
+
+
+class TTLCache:
+    """
+    In-process cache whose entries expire ttl_seconds after they are stored,
+    dropping the oldest entries once it holds more than max_entries.
+    Values are copied in and out, so callers can't change a cached entry.
+    """
+
+    def __init__(self, ttl_seconds=None, max_entries=DEFAULT_MAX_ENTRIES):
+        """
+        Args:
+            ttl_seconds (float): Seconds an entry stays valid, 0 disables the cache.
+                Defaults to SESSION_CACHE_TTL_SECONDS or 30.
+            max_entries (int): Entries kept before the oldest are dropped. Defaults to 1000.
+        """
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else get_session_cache_ttl()
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.reset_stats()
+
+    def reset_stats(self):
+        """
+        Start a new stats window.
+        """
+        self.stats = {"hits": 0, "misses": 0, "expired": 0, "invalidated": 0}
+
+    def get(self, key):
+        """
+        Return a copy of the cached value for key, or None on a miss or an expired entry.
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+
+            value, expires_at = entry
+            if time.monotonic() >= expires_at:
+                del self.entries[key]
+                self.stats["expired"] += 1
+                self.stats["misses"] += 1
+                return None
+
+            self.stats["hits"] += 1
+        return copy.deepcopy(value)
+
+    def set(self, key, value, ttl_seconds=None):
+        """
+        Store a copy of value, dropping the oldest entries over the size limit.
+
+        Args:
+            ttl_seconds (float): Keep this entry for less than the cache's ttl, e.g.
+                until the value itself expires. Nothing is stored when it is 0 or less.
+        """
+        if ttl_seconds is not None:
+            ttl_seconds = min(ttl_seconds, self.ttl_seconds)
+        else:
+            ttl_seconds = self.ttl_seconds
+        if ttl_seconds <= 0:
+            return
+        value = copy.deepcopy(value)
+        with self.lock:
+            self.entries.pop(key, None)
+            self.entries[key] = (value, time.monotonic() + ttl_seconds)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def invalidate(self, key):
+        """
+        Drop the entry for key, if any.
+        """
+        with self.lock:
+            if self.entries.pop(key, None) is not None:
+                self.stats["invalidated"] += 1
+
+    def invalidate_where(self, predicate):
+        """
+        Drop every entry whose key and value match predicate(key, value).
+        """
+        with self.lock:
+            keys = [key for key, (value, _) in self.entries.items() if predicate(key, value)]
+            for key in keys:
+                del self.entries[key]
+            self.stats["invalidated"] += len(keys)
+
+    def clear(self):
+        """
+        Drop every entry.
+        """
+        with self.lock:
+            self.entries.clear()
+
+    def hit_rate(self):
+        """
+        Fraction of the lookups in the current stats window answered from the cache.
+        """
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return self.stats["hits"] / lookups if lookups else 0.0
+
+    def summary(self):
+        """
+        Describe the hit rate of the current stats window.
+        """
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return (
+            f"{self.stats['hits']}/{lookups} hits ({self.hit_rate() * 100:.0f}%), "
+            f"{self.stats['expired']} expired, {self.stats['invalidated']} invalidated"
+        )
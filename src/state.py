@@ -9,12 +9,12 @@ class MainGraphState(TypedDict):
     job_title: str
     scraped_jobs: list[dict]
     scores: Annotated[list, operator.add]
-    jobs_processing_batch: list
     matches: list
     applications: Annotated[list, operator.add]
     
 class ScoreJobsState(TypedDict):
     jobs_batch: str
+    score_ids: list[str]
     
 class ApplicationStateInput(TypedDict):
     job_description: str
@@ -0,0 +1,187 @@
+import asyncio
+import time
+from colorama import Fore, Style
+from .database import bulk_save_jobs
+from .utils import convert_jobs_matched_to_string_list, index_scores_by_id
+
+
+class StreamingPipeline:
+    """
+    Runs scraping, scoring and application generation as concurrent stages
+    connected by queues, so each job moves on as soon as it is ready instead of
+    waiting for the whole run to finish the previous stage.
+    """
+
+    def __init__(self, main_nodes, batch_size=5, min_score=7, generation_workers=None):
+        """
+        Args:
+            main_nodes (MainGraphNodes): Nodes providing the scraper, scoring, application executor and file output.
+            batch_size (int): Most jobs scored in one request. Defaults to 5.
+            min_score (int): Score a job needs to get an application. Defaults to 7.
+            generation_workers (int): Applications generated at the same time, defaults to batch_size.
+        """
+        self.main_nodes = main_nodes
+        self.batch_size = batch_size
+        self.min_score = min_score
+        self.generation_workers = generation_workers or batch_size
+        self.reset_stats()
+
+    def reset_stats(self):
+        """
+        Start a new stats window.
+        """
+        self.started_at = None
+        self.stats = {
+            "scraped": 0,
+            "scored": 0,
+            "unscored": 0,
+            "matched": 0,
+            "applications": 0,
+            "failed_applications": 0,
+            "timed_out_applications": 0,
+            "first_score_seconds": None,
+            "first_application_seconds": None,
+        }
+
+    def elapsed(self):
+        """
+        Seconds since the run started.
+        """
+        return time.perf_counter() - self.started_at
+
+    async def scrape(self, job_title, scoring_queue):
+        """
+        Stage 1: put every job on the scoring queue as soon as its page is scraped.
+        """
+        async for job in self.main_nodes.upwork_scraper.stream_upwork_data(job_title, self.main_nodes.number_of_jobs):
+            self.stats["scraped"] += 1
+            await scoring_queue.put(job)
+
+    async def score(self, scoring_queue, generation_queue):
+        """
+        Stage 2: score jobs, batching whatever is already waiting, and pass matches on.
+        """
+        while True:
+            job = await scoring_queue.get()
+            if job is None:
+                return
+
+            # Don't wait for a full batch, only take the jobs that are already queued
+            batch = [job]
+            finished = False
+            while len(batch) < self.batch_size and not scoring_queue.empty():
+                next_job = scoring_queue.get_nowait()
+                if next_job is None:
+                    finished = True
+                    break
+                batch.append(next_job)
+
+            await self.score_batch(batch, generation_queue)
+            if finished:
+                return
+
+    async def score_batch(self, batch, generation_queue):
+        """
+        Score one batch, save it and queue the jobs that clear the threshold.
+        """
+        scores_by_id = {}
+        try:
+            score_ids = [str(index) for index in range(len(batch))]
+            scores_by_id = index_scores_by_id(await self.main_nodes.score_jobs_batch(batch, score_ids))
+            missing_ids = await self.main_nodes.rescore_missing_jobs(batch, scores_by_id)
+            self.stats["unscored"] += len(missing_ids)
+        except Exception as e:
+            print(f"Error scoring a batch of {len(batch)} jobs: {e}")
+            self.stats["unscored"] += len(batch)
+
+        scored_jobs = [job | {"score": scores_by_id.get(str(index))} for index, job in enumerate(batch)]
+        self.stats["scored"] += sum(1 for job in scored_jobs if job["score"] is not None)
+        if self.stats["first_score_seconds"] is None and scores_by_id:
+            self.stats["first_score_seconds"] = self.elapsed()
+
+        inserted_count, skipped_count = bulk_save_jobs(scored_jobs)
+        print(f"Saved {inserted_count} new jobs to DB, skipped {skipped_count} existing")
+
+        for job in scored_jobs:
+            if job["score"] is not None and job["score"] >= self.min_score:
+                self.stats["matched"] += 1
+                await generation_queue.put(job)
+
+    async def generate(self, generation_queue):
+        """
+        Stage 3: generate and save the application of each matched job.
+        """
+        while True:
+            job = await generation_queue.get()
+            if job is None:
+                return
+
+            job_description = convert_jobs_matched_to_string_list([job])[0]
+            try:
+                applications = await self.main_nodes.application_executor.generate(job_description)
+                self.main_nodes.save_applications(applications)
+            except asyncio.TimeoutError:
+                print(f"Application timed out for '{job.get('title')}'")
+                self.stats["timed_out_applications"] += 1
+                continue
+            except Exception as e:
+                print(f"Error generating or saving the application for '{job.get('title')}': {e}")
+                self.stats["failed_applications"] += 1
+                continue
+
+            self.stats["applications"] += 1
+            if self.stats["first_application_seconds"] is None:
+                self.stats["first_application_seconds"] = self.elapsed()
+            print(Fore.GREEN + f"Saved application for '{job.get('title')}' ({self.elapsed():.1f}s)" + Style.RESET_ALL)
+
+    async def run(self, job_title, scoring_workers=2):
+        """
+        Run the three stages until every scraped job has been scored and every match has an application.
+
+        Args:
+            job_title (str): Title of the job to search for.
+            scoring_workers (int): Scoring requests in flight at the same time. Defaults to 2.
+
+        Returns:
+            dict: The run stats.
+        """
+        print(Fore.BLUE + "----- Running Upwork Jobs Automation (streaming) -----\n" + Style.RESET_ALL)
+        self.reset_stats()
+        self.started_at = time.perf_counter()
+        scoring_queue = asyncio.Queue()
+        generation_queue = asyncio.Queue()
+
+        scorers = [asyncio.create_task(self.score(scoring_queue, generation_queue)) for _ in range(scoring_workers)]
+        generators = [asyncio.create_task(self.generate(generation_queue)) for _ in range(self.generation_workers)]
+        try:
+            try:
+                await self.scrape(job_title, scoring_queue)
+            finally:
+                # Let the stages drain what was scraped, then stop them
+                for _ in scorers:
+                    await scoring_queue.put(None)
+                await asyncio.gather(*scorers)
+                for _ in generators:
+                    await generation_queue.put(None)
+                await asyncio.gather(*generators)
+        except BaseException:
+            for task in scorers + generators:
+                task.cancel()
+            raise
+
+        self.stats["total_seconds"] = self.elapsed()
+        print(Fore.GREEN + f"----- Streaming run finished: {self.summary()} -----\n" + Style.RESET_ALL)
+        return self.stats
+
+    def summary(self):
+        """
+        Describe the current stats window.
+        """
+        def seconds(value):
+            return f"{value:.1f}s" if value is not None else "n/a"
+
+        return (
+            f"{self.stats['scraped']} scraped, {self.stats['scored']} scored, {self.stats['matched']} matched, "
+            f"{self.stats['applications']} applications, first score after {seconds(self.stats['first_score_seconds'])}, "
+            f"first application after {seconds(self.stats['first_application_seconds'])}"
+        )
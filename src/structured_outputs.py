@@ -53,4 +53,12 @@ class CallScript(BaseModel):
 class JobApplication(BaseModel):
     job_description: str = Field(description="The full description of the job")
     cover_letter: str = Field(description="The generated cover letter")
-    interview_preparation: str = Field(description="The generated interview preparation")
\ No newline at end of file
+    interview_preparation: str = Field(description="The generated interview preparation")
+
+class ProfileFact(BaseModel):
+    category: str = Field(description="The kind of fact: skill, project, experience, language or other")
+    text: str = Field(description="One self-contained fact, written in the first person")
+
+class ProfileFacts(BaseModel):
+    summary: str = Field(description="A two sentence first person introduction of the freelancer")
+    facts: List[ProfileFact] = Field(description="Every skill, project, experience and qualification in the profile")
@@ -10,6 +10,7 @@ import asyncio
 import json
 import os
 import sys
+import time
 from datetime import datetime
 from typing import List, Dict, Any, Optional
 
@@ -22,8 +23,15 @@ from src.database import (
     update_job,
     get_jobs_by_criteria,
     cleanup_expired_sessions,
-    get_prompt_by_type
+    get_prompt_template_by_type,
+    get_user_by_id,
+    save_applications
 )
+from src.llm_scheduler import get_llm_scheduler, estimate_tokens
+from src.structured_outputs import JobScores
+from src.prompts import SCORE_JOBS_PROMPT, SCORE_SINGLE_JOB_PROMPT, SIMPLE_COVER_LETTER_PROMPT, SIMPLE_INTERVIEW_PREPARATION_PROMPT
+from src.prompt_assembly import assemble_prompt, prompt_cache_stats
+from src.utils import ainvoke_llm, format_scraped_job_for_scoring, index_scores_by_id
 from process_manual_jobs import ManualJobProcessor
 import openai
 
@@ -31,7 +39,9 @@ import openai
 class UserJobProcessor(ManualJobProcessor):
     """User-aware job processor that extends ManualJobProcessor."""
     
-    def __init__(self, user_id: str, profile: str, batch_size: int = 3, min_score: int = 7):
+    def __init__(self, user_id: str, profile: str, batch_size: int = 3, min_score: int = 7, bypass_cache: bool = False,
+                 scoring_concurrency: int = 10, batched_scoring: bool = True, scoring_batch_tokens: int = 6000,
+                 max_jobs_per_scoring_request: int = 20, scoring_retries: int = 2):
         """
         Initialize the UserJobProcessor.
         
@@ -40,10 +50,23 @@ class UserJobProcessor(ManualJobProcessor):
             profile: The freelancer profile text
             batch_size: Number of jobs to process in each batch
             min_score: Minimum score threshold for generating applications
+            bypass_cache: Generate fresh applications instead of reusing cached LLM responses
+            scoring_concurrency: Maximum number of scoring requests in flight at the same time
+            batched_scoring: Score several jobs per request with the JobScores schema instead of one request per job
+            scoring_batch_tokens: Approximate job tokens packed into one batched scoring request
+            max_jobs_per_scoring_request: Upper bound on jobs packed into one batched scoring request
+            scoring_retries: Times jobs without a valid score are re-sent before scoring them one by one
         """
-        super().__init__(profile, batch_size, min_score)
+        super().__init__(profile, batch_size, min_score, bypass_cache)
         self.user_id = user_id
-        self.client = openai.OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+        self.scoring_concurrency = scoring_concurrency
+        self.batched_scoring = batched_scoring
+        self.scoring_batch_tokens = scoring_batch_tokens
+        self.max_jobs_per_scoring_request = max_jobs_per_scoring_request
+        self.scoring_retries = scoring_retries
+        self.scoring_stats = {}
+        # Retries are left to the LLM scheduler
+        self.async_client = openai.AsyncOpenAI(api_key=os.getenv('OPENAI_API_KEY'), max_retries=0)
         self.high_score_notifications = []  # Store notifications for high scores
     
     def load_unprocessed_jobs(self) -> List[Dict[str, Any]]:
@@ -62,73 +85,192 @@ class UserJobProcessor(ManualJobProcessor):
             print(f"Error loading unprocessed jobs: {e}")
             return []
     
-    async def score_jobs(self, jobs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Score jobs using AI."""
-        scored_jobs = []
+    async def complete(self, system_prompt: str, user_message: str, max_tokens: int, priority: str = "generation") -> str:
+        """Run a chat completion with the instructions first and the job last, so the prefix can be cached."""
+        response = await get_llm_scheduler().run(
+            lambda: self.async_client.chat.completions.create(
+                model="gpt-3.5-turbo",
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_message}
+                ],
+                max_tokens=max_tokens
+            ),
+            "openai",
+            priority=priority,
+            estimated_tokens=estimate_tokens(system_prompt, user_message)
+        )
+        prompt_cache_stats.record_openai_usage("openai/gpt-3.5-turbo", response.usage)
+        return response.choices[0].message.content.strip()
+    
+    async def score_job(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        """Score a single job using AI."""
+        try:
+            system_prompt, user_message = assemble_prompt(
+                SCORE_SINGLE_JOB_PROMPT,
+                f"Title: {job.get('title', 'N/A')}\n"
+                f"Type: {job.get('job_type', 'N/A')}\n"
+                f"Experience Level: {job.get('experience_level', 'N/A')}\n"
+                f"Payment: {job.get('payment_rate', 'N/A')}\n"
+                f"Description: {(job.get('description') or 'N/A')[:500]}...",
+                request="Job Details:",
+                profile=self.profile
+            )
+            score_text = await self.complete(system_prompt, user_message, max_tokens=10, priority="scoring")
+            try:
+                score = float(score_text)
+                score = max(1, min(10, score))  # Clamp between 1-10
+            except ValueError:
+                score = 5.0  # Default score if parsing fails
+            
+            print(f"Scored job '{job.get('title', 'Unknown')}': {score}/10")
+            
+        except Exception as e:
+            print(f"Error scoring job {job.get('title', 'Unknown')}: {e}")
+            score = 5.0
+        
+        job_with_score = dict(job)
+        job_with_score['score'] = score
+        return job_with_score
+    
+    def format_job_for_scoring(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the compact job entry sent in a batched scoring request, without its id."""
+        return {
+            'title': job.get('title', 'N/A'),
+            'type': job.get('job_type', 'N/A'),
+            'experience_level': job.get('experience_level', 'N/A'),
+            'payment': job.get('payment_rate', 'N/A'),
+            'client_total_spent': job.get('client_total_spent', 'N/A'),
+            'client_total_hires': job.get('client_total_hires', 'N/A'),
+            'description': (job.get('description') or 'N/A')[:1500]
+        }
+    
+    def pack_scoring_batches(self, jobs: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        """Split jobs into requests that stay within the scoring token budget."""
+        batches = []
+        batch = []
+        batch_tokens = 0
         
         for job in jobs:
-            try:
-                # Create prompt for scoring
-                prompt = f"""
-                Rate this job opportunity from 1-10 based on how well it matches the freelancer profile.
-                
-                Freelancer Profile:
-                {self.profile}
-                
-                Job Details:
-                Title: {job.get('title', 'N/A')}
-                Type: {job.get('job_type', 'N/A')}
-                Experience Level: {job.get('experience_level', 'N/A')}
-                Payment: {job.get('payment_rate', 'N/A')}
-                Description: {job.get('description', 'N/A')[:500]}...
-                
-                Provide only a numeric score from 1-10. Consider:
-                - Skill match
-                - Payment rate
-                - Experience level requirements
-                - Project complexity
-                - Long-term potential
-                """
-                
-                response = await asyncio.to_thread(
-                    self.client.chat.completions.create,
-                    model="gpt-3.5-turbo",
-                    messages=[{"role": "user", "content": prompt}],
-                    max_tokens=10
-                )
-                
-                score_text = response.choices[0].message.content.strip()
-                try:
-                    score = float(score_text)
-                    score = max(1, min(10, score))  # Clamp between 1-10
-                except ValueError:
-                    score = 5.0  # Default score if parsing fails
-                
-                job_with_score = dict(job)
-                job_with_score['score'] = score
-                scored_jobs.append(job_with_score)
-                
-                # Check for high score notification
-                if score >= 7.0:
-                    user_info = get_user_by_id(self.user_id)
-                    username = user_info.get('username', 'Unknown') if user_info else 'Unknown'
-                    self.high_score_notifications.append({
-                        'user_id': self.user_id,
-                        'username': username,
-                        'job_title': job.get('title', 'Unknown'),
-                        'score': score,
-                        'timestamp': datetime.now().isoformat()
-                    })
-                
-                print(f"Scored job '{job.get('title', 'Unknown')}': {score}/10")
-                
-            except Exception as e:
-                print(f"Error scoring job {job.get('title', 'Unknown')}: {e}")
-                job_with_score = dict(job)
-                job_with_score['score'] = 5.0
-                scored_jobs.append(job_with_score)
+            job_tokens = len(str(self.format_job_for_scoring(job))) // 4
+            if batch and (
+                batch_tokens + job_tokens > self.scoring_batch_tokens
+                or len(batch) >= self.max_jobs_per_scoring_request
+            ):
+                batches.append(batch)
+                batch = []
+                batch_tokens = 0
+            batch.append(job)
+            batch_tokens += job_tokens
+        
+        if batch:
+            batches.append(batch)
+        return batches
+    
+    async def score_batch(self, jobs: List[Dict[str, Any]], bypass_cache: bool = False) -> Dict[str, int]:
+        """Score several jobs in one request, returning the valid scores by job_id."""
+        # Short positional ids like the main graph, the LLM echoes them more reliably than hashes
+        jobs_list = format_scraped_job_for_scoring([self.format_job_for_scoring(job) for job in jobs])
+        system_prompt, user_message = assemble_prompt(
+            SCORE_JOBS_PROMPT,
+            str(jobs_list),
+            request="Evaluate these Jobs:",
+            profile=self.profile
+        )
+        try:
+            results = await ainvoke_llm(
+                system_prompt=system_prompt,
+                user_message=user_message,
+                model="openai/gpt-4o-mini",
+                response_format=JobScores,
+                bypass_cache=bypass_cache,
+                priority="scoring"
+            )
+        except Exception as e:
+            print(f"Error scoring a batch of {len(jobs)} jobs: {e}")
+            return {}
         
-        return scored_jobs
+        scores_by_id = index_scores_by_id(
+            [job_score for job_score in results.model_dump()["scores"] if 1 <= job_score["score"] <= 10]
+        )
+        return {
+            str(job['job_id']): scores_by_id[str(index)]
+            for index, job in enumerate(jobs)
+            if str(index) in scores_by_id
+        }
+    
+    async def score_jobs_in_batches(self, jobs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Score jobs with packed JobScores requests, re-sending only jobs left without a valid score."""
+        semaphore = asyncio.Semaphore(self.scoring_concurrency)
+        scores = {}
+        pending = jobs
+        
+        async def score_with_limit(batch, bypass_cache):
+            async with semaphore:
+                return await self.score_batch(batch, bypass_cache)
+        
+        for attempt in range(self.scoring_retries + 1):
+            batches = self.pack_scoring_batches(pending)
+            # A retry must not be answered with the cached response that was invalid
+            results = await asyncio.gather(*[
+                score_with_limit(batch, self.bypass_cache or attempt > 0) for batch in batches
+            ])
+            for batch_scores in results:
+                scores.update(batch_scores)
+            
+            pending = [job for job in pending if str(job['job_id']) not in scores]
+            print(f"Scored {len(scores)}/{len(jobs)} jobs in {len(batches)} batched requests")
+            if not pending:
+                break
+        
+        if pending:
+            # Still missing after the retries, score them one by one
+            print(f"No valid batched score for {len(pending)} jobs, scoring them individually")
+            for scored_job in await asyncio.gather(*[self.score_job(job) for job in pending]):
+                scores[str(scored_job['job_id'])] = scored_job['score']
+        
+        return [{**job, 'score': scores[str(job['job_id'])]} for job in jobs]
+    
+    async def score_jobs(self, jobs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Score jobs concurrently, returning them in input order."""
+        if not jobs:
+            return []
+        
+        start = time.perf_counter()
+        if self.batched_scoring:
+            scored_jobs = await self.score_jobs_in_batches(jobs)
+        else:
+            semaphore = asyncio.Semaphore(self.scoring_concurrency)
+            
+            async def score_with_limit(job):
+                async with semaphore:
+                    return await self.score_job(job)
+            
+            scored_jobs = await asyncio.gather(*[score_with_limit(job) for job in jobs])
+        elapsed = time.perf_counter() - start
+        
+        self.scoring_stats = {
+            'jobs': len(scored_jobs),
+            'seconds': elapsed,
+            'jobs_per_second': len(scored_jobs) / elapsed if elapsed else 0
+        }
+        print(f"Scored {len(scored_jobs)} jobs in {elapsed:.1f}s ({self.scoring_stats['jobs_per_second']:.1f} jobs/sec)")
+        
+        # Queue notifications for high scores, looking the user up once
+        high_scores = [job for job in scored_jobs if job['score'] >= 7.0]
+        if high_scores:
+            user_info = get_user_by_id(self.user_id)
+            username = user_info.get('username', 'Unknown') if user_info else 'Unknown'
+            for job in high_scores:
+                self.high_score_notifications.append({
+                    'user_id': self.user_id,
+                    'username': username,
+                    'job_title': job.get('title', 'Unknown'),
+                    'score': job['score'],
+                    'timestamp': datetime.now().isoformat()
+                })
+        
+        return list(scored_jobs)
     
     def save_job_score(self, job: Dict[str, Any]) -> bool:
         """Save job score to database."""
@@ -140,64 +282,27 @@ class UserJobProcessor(ManualJobProcessor):
         
         for job in jobs:
             try:
-                # Get custom cover letter prompt from database or use fallback
-                custom_cover_prompt = get_prompt_by_type("cover_letter")
-                if custom_cover_prompt:
-                    # Use the stored prompt template with job-specific formatting
-                    cover_letter_prompt = custom_cover_prompt['prompt_content'].format(
-                        profile=self.profile
-                    ) + f"\n\nJob Details:\nTitle: {job.get('title', 'N/A')}\nDescription: {job.get('description', 'N/A')}\nRequirements: {job.get('proposal_requirements', 'N/A')}"
-                else:
-                    # Fallback to simple prompt
-                    cover_letter_prompt = f"""
-                    Write a personalized cover letter for this job application.
-                    
-                    Freelancer Profile:
-                    {self.profile}
-                    
-                    Job Details:
-                    Title: {job.get('title', 'N/A')}
-                    Description: {job.get('description', 'N/A')}
-                    Requirements: {job.get('proposal_requirements', 'N/A')}
-                    
-                    Write a professional, engaging cover letter that highlights relevant experience and addresses the job requirements. Keep it concise (2-3 paragraphs).
-                    """
+                # Get custom cover letter prompt from the prompt registry or use fallback
+                cover_letter_template = get_prompt_template_by_type("cover_letter", SIMPLE_COVER_LETTER_PROMPT)
                 
-                cover_response = await asyncio.to_thread(
-                    self.client.chat.completions.create,
-                    model="gpt-3.5-turbo",
-                    messages=[{"role": "user", "content": cover_letter_prompt}],
-                    max_tokens=500
+                system_prompt, user_message = assemble_prompt(
+                    cover_letter_template,
+                    f"Title: {job.get('title', 'N/A')}\nDescription: {job.get('description', 'N/A')}\nRequirements: {job.get('proposal_requirements', 'N/A')}",
+                    request="Job Details:",
+                    profile=self.profile
                 )
+                cover_letter = await self.complete(system_prompt, user_message, max_tokens=500)
                 
-                cover_letter = cover_response.choices[0].message.content.strip()
+                # Get custom interview prep prompt from the prompt registry or use fallback
+                interview_template = get_prompt_template_by_type("interview_prep", SIMPLE_INTERVIEW_PREPARATION_PROMPT)
                 
-                # Get custom interview prep prompt from database or use fallback
-                custom_interview_prompt = get_prompt_by_type("interview_prep")
-                if custom_interview_prompt:
-                    # Use the stored prompt template with job-specific formatting
-                    interview_prompt = custom_interview_prompt['prompt_content'].format(
-                        profile=self.profile
-                    ) + f"\n\nJob Details:\nTitle: {job.get('title', 'N/A')}\nDescription: {job.get('description', 'N/A')[:300]}..."
-                else:
-                    # Fallback to simple prompt
-                    interview_prompt = f"""
-                    Prepare potential interview questions and answers for this job.
-                    
-                    Job Title: {job.get('title', 'N/A')}
-                    Job Description: {job.get('description', 'N/A')[:300]}...
-                    
-                    Provide 3-5 likely interview questions with suggested answers based on the freelancer profile.
-                    """
-                
-                interview_response = await asyncio.to_thread(
-                    self.client.chat.completions.create,
-                    model="gpt-3.5-turbo", 
-                    messages=[{"role": "user", "content": interview_prompt}],
-                    max_tokens=600
+                system_prompt, user_message = assemble_prompt(
+                    interview_template,
+                    f"Title: {job.get('title', 'N/A')}\nDescription: {(job.get('description') or 'N/A')[:300]}...",
+                    request="Job Details:",
+                    profile=self.profile
                 )
-                
-                interview_prep = interview_response.choices[0].message.content.strip()
+                interview_prep = await self.complete(system_prompt, user_message, max_tokens=600)
                 
                 applications.append({
                     'user_id': self.user_id,
@@ -207,7 +312,7 @@ class UserJobProcessor(ManualJobProcessor):
                     'cover_letter': cover_letter,
                     'interview_prep': interview_prep,
                     'job_description': job.get('description', ''),
-                    'created_at': datetime.now().isoformat()
+                    'created_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
                 })
                 
                 print(f"Generated application for '{job.get('title', 'Unknown')}'")
@@ -217,70 +322,13 @@ class UserJobProcessor(ManualJobProcessor):
         
         return applications
     
-    def save_applications_to_file(self, applications: List[Dict[str, Any]]):
-        """Save applications to user-specific file."""
+    def save_applications(self, applications: List[Dict[str, Any]]):
+        """Save applications to the applications table, one row each."""
         if not applications:
             return
         
-        # Create user-specific data directory
-        user_data_dir = f"./data/users/{self.user_id}"
-        os.makedirs(user_data_dir, exist_ok=True)
-        
-        # Save to user-specific file
-        user_file = f"{user_data_dir}/cover_letters.md"
-        
-        with open(user_file, 'a', encoding='utf-8') as f:
-            f.write(f"\n\n{'='*100}\n")
-            f.write(f"DATE: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write(f"USER: {self.user_id}\n")
-            f.write(f"BATCH: {len(applications)} applications\n")
-            f.write(f"{'='*100}\n\n")
-            
-            for app in applications:
-                f.write(f"# Title: {app['title']}\n")
-                f.write(f"Score: {app['score']}/10\n")
-                f.write(f"Job ID: {app['job_id']}\n\n")
-                
-                f.write(f"### Job Description\n")
-                f.write(f"{app['job_description']}\n\n")
-                
-                f.write(f"### Cover Letter\n")
-                f.write(f"{app['cover_letter']}\n\n")
-                
-                f.write(f"### Interview Preparation\n")
-                f.write(f"{app['interview_prep']}\n\n")
-                
-                f.write(f"{'/'*100}\n\n")
-        
-        # Also save to global file for admin access
-        global_file = "./data/cover_letter.md"
-        os.makedirs("./data", exist_ok=True)
-        
-        with open(global_file, 'a', encoding='utf-8') as f:
-            f.write(f"\n\n{'='*100}\n")
-            f.write(f"DATE: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write(f"USER: {self.user_id}\n")
-            f.write(f"BATCH: {len(applications)} applications\n")
-            f.write(f"{'='*100}\n\n")
-            
-            for app in applications:
-                f.write(f"# Title: {app['title']}\n")
-                f.write(f"Score: {app['score']}/10\n")
-                f.write(f"Job ID: {app['job_id']}\n")
-                f.write(f"User ID: {app['user_id']}\n\n")
-                
-                f.write(f"### Job Description\n")
-                f.write(f"{app['job_description']}\n\n")
-                
-                f.write(f"### Cover Letter\n")
-                f.write(f"{app['cover_letter']}\n\n")
-                
-                f.write(f"### Interview Preparation\n")
-                f.write(f"{app['interview_prep']}\n\n")
-                
-                f.write(f"{'/'*100}\n\n")
-        
-        print(f"Applications saved to both user file ({user_file}) and global file ({global_file})")
+        saved_count = save_applications(applications, self.user_id)
+        print(f"Saved {saved_count} applications for user {self.user_id}")
     
     def save_high_score_notifications(self):
         """Save high score notifications to file."""
@@ -328,12 +376,12 @@ class UserJobProcessor(ManualJobProcessor):
             high_scoring_jobs = 0
             applications_generated = 0
             
+            # Score every job up front, concurrently
+            all_scored_jobs = await self.score_jobs(unprocessed_jobs)
+            
             # Process jobs in batches
-            for i in range(0, len(unprocessed_jobs), self.batch_size):
-                batch = unprocessed_jobs[i:i + self.batch_size]
-                
-                # Score jobs
-                scored_batch = await self.score_jobs(batch)
+            for i in range(0, len(all_scored_jobs), self.batch_size):
+                scored_batch = all_scored_jobs[i:i + self.batch_size]
                 
                 # Save scores to database
                 for job in scored_batch:
@@ -348,11 +396,12 @@ class UserJobProcessor(ManualJobProcessor):
                 if high_scoring_batch:
                     applications = await self.process_jobs_batch(high_scoring_batch)
                     if applications:
-                        self.save_applications_to_file(applications)
+                        self.save_applications(applications)
                         applications_generated += len(applications)
             
             # Save high score notifications
             self.save_high_score_notifications()
+            print(f"Provider prompt cache: {prompt_cache_stats.summary()}")
             
             return {
                 'success': True,
@@ -361,7 +410,8 @@ class UserJobProcessor(ManualJobProcessor):
                     'total_jobs': total_jobs,
                     'scored_jobs': scored_jobs,
                     'high_scoring_jobs': high_scoring_jobs,
-                    'applications_generated': applications_generated
+                    'applications_generated': applications_generated,
+                    'scoring_jobs_per_second': self.scoring_stats.get('jobs_per_second', 0)
                 }
             }
             
@@ -1,10 +1,19 @@
 import re
 import random
+import threading
 import html2text
 from langchain_core.messages import SystemMessage, HumanMessage
 from langchain_core.output_parsers import StrOutputParser
+from src.llm_cache import get_llm_response_cache, make_cache_key
+from src.llm_scheduler import get_llm_scheduler, estimate_tokens
+from src.prompt_assembly import prompt_cache_stats
 
-COVER_LETTERS_FILE = "./data/cover_letter.md"
+# LLM clients and runnables are built once per configuration and shared, so
+# every call reuses the same HTTP connection pool
+_llm_cache = {}
+_runnable_cache = {}
+_llm_cache_lock = threading.Lock()
+_str_output_parser = StrOutputParser()
 
 def extract_provider_and_model(model_string: str):
     """
@@ -18,9 +27,9 @@ def extract_provider_and_model(model_string: str):
     """
     return model_string.split("/", 1)
 
-def get_llm_by_provider(model_string, temperature=0.1):
+def _create_llm(model_string, temperature):
     """
-    Retrieve the appropriate LLM instance based on the provider and model name.
+    Create a new LLM instance based on the provider and model name.
 
     Args:
         model_string (str): The model string in the format "provider/model".
@@ -34,59 +43,149 @@ def get_llm_by_provider(model_string, temperature=0.1):
     """
     llm_provider, model = extract_provider_and_model(model_string)
     
+    # Retries are left to the LLM scheduler, which backs off across all calls
     # Match the provider and initialize the corresponding LLM
     if llm_provider == "openai":
         from langchain_openai import ChatOpenAI
-        llm = ChatOpenAI(model=model, temperature=temperature)
+        llm = ChatOpenAI(model=model, temperature=temperature, max_retries=0)
     elif llm_provider == "anthropic":
         from langchain_anthropic import ChatAnthropic
-        llm = ChatAnthropic(model=model, temperature=temperature)
+        llm = ChatAnthropic(model=model, temperature=temperature, max_retries=0)
     elif llm_provider == "google":
         from langchain_google_genai import ChatGoogleGenerativeAI
-        llm = ChatGoogleGenerativeAI(model=model, temperature=temperature)
+        llm = ChatGoogleGenerativeAI(model=model, temperature=temperature, max_retries=0)
     elif llm_provider == "groq":
         from langchain_groq import ChatGroq
-        llm = ChatGroq(model=model, temperature=temperature)
+        llm = ChatGroq(model=model, temperature=temperature, max_retries=0)
     else:
         raise ValueError(f"Unsupported LLM provider: {llm_provider}")
     
     return llm
 
+def get_llm_by_provider(model_string, temperature=0.1):
+    """
+    Retrieve the shared LLM instance for a provider, model name and temperature.
+    The instance is created on first use and reused afterwards.
+
+    Args:
+        model_string (str): The model string in the format "provider/model".
+        temperature (float): The temperature for controlling output randomness.
+
+    Returns:
+        llm: An instance of the specified language model.
+
+    Raises:
+        ValueError: If the LLM provider is not supported.
+    """
+    key = (model_string, temperature)
+    llm = _llm_cache.get(key)
+    if llm is None:
+        with _llm_cache_lock:
+            llm = _llm_cache.get(key)
+            if llm is None:
+                llm = _create_llm(model_string, temperature)
+                _llm_cache[key] = llm
+    return llm
+
+def get_llm_runnable(model_string, temperature=0.1, response_format=None):
+    """
+    Retrieve the shared runnable that invokes a model and parses its output.
+
+    Args:
+        model_string (str): The model string in the format "provider/model".
+        temperature (float): The temperature for controlling output randomness.
+        response_format: An optional format for structuring the output.
+
+    Returns:
+        Runnable: The model with structured output, returning the raw message along with
+        the parsed output so its token usage can be read, or the model itself.
+    """
+    key = (model_string, temperature, response_format)
+    runnable = _runnable_cache.get(key)
+    if runnable is None:
+        llm = get_llm_by_provider(model_string, temperature)
+        with _llm_cache_lock:
+            runnable = _runnable_cache.get(key)
+            if runnable is None:
+                # Apply output parsing based on the response format
+                if response_format:
+                    runnable = llm.with_structured_output(response_format, include_raw=True)
+                else:
+                    runnable = llm
+                _runnable_cache[key] = runnable
+    return runnable
+
+def clear_llm_cache():
+    """
+    Drop every shared LLM client, e.g. after an API key has changed.
+    """
+    with _llm_cache_lock:
+        _llm_cache.clear()
+        _runnable_cache.clear()
+
 async def ainvoke_llm(
     system_prompt,
     user_message,
     model="openai/gpt-4o-mini",  # Default to GPT-4o-mini
-    response_format=None
+    response_format=None,
+    bypass_cache=False,
+    priority="generation"
 ):
     """
     Invoke a language model asynchronously with the given prompts.
 
+    Identical requests are answered from the LLM response cache.
+
     Args:
         system_prompt (str): The system-level instruction for the LLM.
         user_message (str): The user's message or query.
         model (str): The model string specifying the provider and model name.
         response_format: An optional format for structuring the output.
+        bypass_cache (bool): Always call the LLM, e.g. to regenerate content.
+            The fresh response still replaces the cached one.
+        priority (str): Scheduling class, "extraction", "scoring" or "generation".
 
     Returns:
         str: The output generated by the LLM.
     """
+    cache = get_llm_response_cache()
+    cache_key = None
+    if cache is not None:
+        cache_key = make_cache_key(model, system_prompt, user_message, response_format)
+        if not bypass_cache:
+            cached = cache.get(cache_key, response_format)
+            if cached is not None:
+                return cached
+
     # Construct message inputs for the LLM
     messages = [
         SystemMessage(content=system_prompt),
         HumanMessage(content=user_message),
     ]  
     
-    # Initialize the LLM based on the model
-    llm = get_llm_by_provider(model)
+    # Reuse the shared client and output parser for this model
+    llm = get_llm_runnable(model, response_format=response_format)
     
-    # Apply output parsing based on the response format
+    # Execute the LLM invocation asynchronously, within the provider's budgets
+    provider, _ = extract_provider_and_model(model)
+    result = await get_llm_scheduler().run(
+        lambda: llm.ainvoke(messages),
+        provider,
+        priority=priority,
+        estimated_tokens=estimate_tokens(system_prompt, user_message),
+    )
     if response_format:
-        llm = llm.with_structured_output(response_format)
+        if result["parsing_error"] is not None:
+            raise result["parsing_error"]
+        message, output = result["raw"], result["parsed"]
     else:
-        llm = llm | StrOutputParser()
-    
-    # Execute the LLM invocation asynchronously
-    output = await llm.ainvoke(messages)
+        message, output = result, _str_output_parser.invoke(result)
+
+    # Track how much of the prompt the provider served from its prompt cache
+    prompt_cache_stats.record_usage_metadata(model, getattr(message, "usage_metadata", None))
+
+    if cache is not None and output is not None:
+        cache.set(cache_key, model, output)
     return output
 
 async def get_playwright_browser_context(browser):
@@ -133,17 +232,41 @@ def convert_html_to_markdown(html_content):
     markdown_content = re.sub(r"\n{3,}", "\n\n", markdown_content)
     return markdown_content.strip()
 
-def format_scraped_job_for_scoring(jobs):
+def format_scraped_job_for_scoring(jobs, score_ids=None):
     """
     Format a list of scraped jobs for scoring.
 
+    Each job is given a short id the LLM returns with its score, so scores can
+    be matched back to jobs whatever order they come back in.
+
     Args:
         jobs (list): The list of scraped job data.
+        score_ids (list): The ids to give the jobs, defaults to their positions in the list.
 
     Returns:
         list: A list of dictionaries representing jobs with their IDs.
     """
-    return [{'id': index, **job} for index, job in enumerate(jobs)]
+    if score_ids is None:
+        score_ids = range(len(jobs))
+    return [
+        {'id': str(score_id), **{key: value for key, value in job.items() if key not in ('id', 'job_id')}}
+        for score_id, job in zip(score_ids, jobs)
+    ]
+
+def index_scores_by_id(scores):
+    """
+    Map the scores returned by the LLM by the id of the job they belong to.
+
+    Args:
+        scores (list): JobScore dictionaries with a job_id and a score.
+
+    Returns:
+        dict: The score of each job id, the first one wins if an id is repeated.
+    """
+    scores_by_id = {}
+    for score in scores:
+        scores_by_id.setdefault(str(score['job_id']).strip(), score['score'])
+    return scores_by_id
 
 def convert_jobs_matched_to_string_list(jobs_matched):
     """
@@ -164,6 +287,36 @@ def convert_jobs_matched_to_string_list(jobs_matched):
         jobs.append(job_str)
     return jobs
 
+def get_title_from_job_description(job_description):
+    """
+    Read the title of a job formatted by convert_jobs_matched_to_string_list.
+
+    Args:
+        job_description (str): The formatted job.
+
+    Returns:
+        str: The job title, or "Unknown Job" when there is none.
+    """
+    title_match = re.search(r"^# Title:(.*)$", job_description or "", re.MULTILINE)
+    return title_match.group(1).strip() if title_match else "Unknown Job"
+
+def convert_job_application_to_dict(application):
+    """
+    Convert a JobApplication to a row of the applications table.
+
+    Args:
+        application (JobApplication): The generated application.
+
+    Returns:
+        dict: The application fields, with the title read from the job description.
+    """
+    return {
+        'title': get_title_from_job_description(application.job_description),
+        'job_description': application.job_description,
+        'cover_letter': application.cover_letter,
+        'interview_prep': application.interview_preparation
+    }
+
 def read_text_file(filename):
     """
     Read a text file and return its contents as a single string.
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Tests for the sliding window application executor
+"""
+
+import asyncio
+from src.application_executor import ApplicationExecutor
+
+
+class FakeApplicationGraph:
+    def __init__(self, delays):
+        self.delays = delays
+        self.in_flight = 0
+        self.most_in_flight = 0
+        self.started = []
+
+    async def ainvoke(self, state):
+        job = state["job_description"]
+        self.started.append(job)
+        self.in_flight += 1
+        self.most_in_flight = max(self.most_in_flight, self.in_flight)
+        try:
+            if self.delays[job] is None:
+                raise ValueError("bad output")
+            await asyncio.sleep(self.delays[job])
+        finally:
+            self.in_flight -= 1
+        return {"applications": [job]}
+
+
+def test_slow_job_only_holds_its_own_slot():
+    graph = FakeApplicationGraph({"slow": 0.3, "a": 0.01, "b": 0.01, "c": 0.01, "d": 0.01})
+    executor = ApplicationExecutor(graph, max_in_flight=2, timeout_seconds=5)
+    saved = []
+
+    applications = asyncio.run(executor.run(["slow", "a", "b", "c", "d"], on_applications=saved.extend))
+
+    # The fast jobs go through the second slot while the slow one is still running
+    assert applications == ["a", "b", "c", "d", "slow"]
+    assert saved == applications
+    assert graph.most_in_flight == 2
+    assert executor.stats == {"completed": 5, "failed": 0, "timed_out": 0, "cancelled": 0}
+
+
+def test_timeouts_and_failures_free_their_slot():
+    graph = FakeApplicationGraph({"stuck": 10, "broken": None, "a": 0.01})
+    executor = ApplicationExecutor(graph, max_in_flight=1, timeout_seconds=0.05)
+
+    applications = asyncio.run(executor.run(["stuck", "broken", "a"]))
+
+    assert applications == ["a"]
+    assert graph.in_flight == 0
+    assert executor.stats == {"completed": 1, "failed": 1, "timed_out": 1, "cancelled": 0}
+
+
+def test_cancelling_the_run_cancels_generations_in_flight():
+    graph = FakeApplicationGraph({"a": 10, "b": 10, "c": 10})
+    executor = ApplicationExecutor(graph, max_in_flight=2, timeout_seconds=60)
+
+    async def run_and_cancel():
+        task = asyncio.create_task(executor.run(["a", "b", "c"]))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    asyncio.run(run_and_cancel())
+
+    assert graph.started == ["a", "b"]
+    assert graph.in_flight == 0
+    assert executor.stats["cancelled"] == 2
+
+
+def test_each_run_reports_its_own_stats_and_runs_cant_overlap():
+    graph = FakeApplicationGraph({"a": 0.05, "b": 0.01, "broken": None})
+    executor = ApplicationExecutor(graph, max_in_flight=2, timeout_seconds=5)
+
+    asyncio.run(executor.run(["a", "broken"]))
+    assert executor.stats == {"completed": 1, "failed": 1, "timed_out": 0, "cancelled": 0}
+
+    async def overlapping_runs():
+        first = asyncio.create_task(executor.run(["a"]))
+        await asyncio.sleep(0.01)
+        try:
+            await executor.run(["b"])
+        except RuntimeError:
+            return await first
+        raise AssertionError("the second run should not start")
+
+    assert asyncio.run(overlapping_runs()) == ["a"]
+    assert executor.stats == {"completed": 1, "failed": 0, "timed_out": 0, "cancelled": 0}
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Tests for the applications table and the import of the legacy markdown files
+"""
+
+import os
+import src.applications_migration as applications_migration
+import src.database as database
+from src.applications_migration import migrate_applications_file, migrate_legacy_applications, parse_applications_markdown
+
+GRAPH_FILE = """
+================================================================================
+DATE: 2025-05-01 17:54:27
+================================================================================
+
+### Job Description
+# Title: Voice Agent Developer
+# Experience Level: Expert
+# Description:
+Build a voice agent.
+
+### Cover Letter
+Hi there, voice agents are my thing.
+
+### Interview Preparation
+## Questions
+
+////////////////////////////////////////////////////////////////////////////////////////////////////
+"""
+
+USER_FILE = """
+
+====================================================================================================
+DATE: 2025-06-04 22:47:40
+USER: user-a
+BATCH: 2 applications
+====================================================================================================
+
+# Title: Custom LLM Development
+Score: 8/10
+Job ID: job-1
+
+### Job Description
+Fine-tune a model.
+
+### Cover Letter
+Hello, I fine-tune models.
+
+### Interview Preparation
+Q1
+
+////////////////////////////////////////////////////////////////////////////////////////////////////
+
+# Title: RAG Chatbot
+Score: 7/10
+Job ID: job-2
+
+### Job Description
+Build a chatbot.
+
+### Cover Letter
+Hello, I build chatbots.
+
+### Interview Preparation
+Q2
+
+////////////////////////////////////////////////////////////////////////////////////////////////////
+
+"""
+
+
+def use_temp_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "DB_PATH", os.path.join(tmp_path, "jobs.db"))
+    database.ensure_db_exists()
+
+
+def test_parse_both_markdown_layouts():
+    graph_apps = parse_applications_markdown(GRAPH_FILE)
+    user_apps = parse_applications_markdown(USER_FILE)
+
+    assert [app["title"] for app in graph_apps] == ["Voice Agent Developer"]
+    assert graph_apps[0]["user_id"] is None
+    assert graph_apps[0]["created_at"] == "2025-05-01 17:54:27"
+    assert graph_apps[0]["cover_letter"] == "Hi there, voice agents are my thing."
+    assert [(app["title"], app["job_id"], app["score"], app["user_id"]) for app in user_apps] == [
+        ("Custom LLM Development", "job-1", 8.0, "user-a"),
+        ("RAG Chatbot", "job-2", 7.0, "user-a"),
+    ]
+    assert user_apps[1]["interview_prep"] == "Q2"
+
+
+def test_legacy_files_are_imported_once(tmp_path, monkeypatch):
+    use_temp_db(tmp_path, monkeypatch)
+    data_dir = os.path.join(tmp_path, "data")
+    os.makedirs(os.path.join(data_dir, "users", "user-a"))
+    with open(os.path.join(data_dir, "users", "user-a", "cover_letters.md"), "w") as f:
+        f.write(USER_FILE)
+    # The global file repeated every user's applications
+    with open(os.path.join(data_dir, "cover_letter.md"), "w") as f:
+        f.write(GRAPH_FILE + USER_FILE)
+
+    assert migrate_legacy_applications(data_dir) == 3
+    assert migrate_legacy_applications(data_dir) == 0
+    assert database.count_applications() == 3
+    assert database.count_applications(user_id="user-a") == 2
+    assert database.get_application_user_ids() == ["default_user", "user-a"]
+    database.close_connection()
+
+
+def test_applications_are_paged_and_filtered_in_the_database(tmp_path, monkeypatch):
+    use_temp_db(tmp_path, monkeypatch)
+    database.save_applications(
+        [
+            {"title": f"Job {i}", "job_id": f"job-{i}", "cover_letter": "x" * 10, "created_at": f"2025-06-0{1 + i % 2} 10:00:0{i}"}
+            for i in range(6)
+        ],
+        user_id="user-a",
+    )
+    database.save_applications([{"title": "Other user job", "cover_letter": "y"}], user_id="user-b")
+
+    page = database.get_applications(user_id="user-a", limit=2, offset=2)
+    assert [app["title"] for app in page] == ["Job 1", "Job 4"]
+    assert database.count_applications(user_id="user-a", date="2025-06-01") == 3
+    assert database.count_applications(search="other") == 1
+    assert database.get_application_dates("user-a") == ["2025-06-02", "2025-06-01"]
+    assert database.get_applications_stats("user-a") == {
+        "total_applications": 6,
+        "active_days": 2,
+        "avg_cover_length": 10,
+        "with_interview_prep": 0,
+    }
+    assert [app["title"] for app in database.get_applications_by_job("job-3")] == ["Job 3"]
+    database.close_connection()
+
+
+def test_deleting_a_user_deletes_their_applications(tmp_path, monkeypatch):
+    use_temp_db(tmp_path, monkeypatch)
+    _, admin_id = database.create_admin_user("admin", "admin@example.com", "password")
+    _, user_id = database.create_user("someone", "someone@example.com", "password")
+    database.save_applications([{"title": "Job", "cover_letter": "x"}], user_id=user_id)
+    database.save_applications([{"title": "Other job", "cover_letter": "y"}], user_id=admin_id)
+
+    assert database.delete_user_admin(user_id, admin_id)
+
+    assert database.count_applications(user_id=user_id) == 0
+    assert database.get_application_user_ids() == [admin_id]
+    database.close_connection()
+
+
+def test_appended_applications_are_imported_from_the_last_offset(tmp_path, monkeypatch):
+    use_temp_db(tmp_path, monkeypatch)
+    file_path = os.path.join(tmp_path, "cover_letters.md")
+    first, second = USER_FILE.split("# Title: RAG Chatbot")
+    with open(file_path, "w") as f:
+        # The second application is still being written
+        f.write(first + "# Title: RAG Chatbot\nScore: 7/10\n")
+
+    assert migrate_applications_file(file_path) == 1
+    parsed_bytes = database.get_applications_file_import(file_path)["parsed_bytes"]
+
+    with open(file_path, "a") as f:
+        f.write(second.split("\n", 2)[2] + GRAPH_FILE)
+    tails_read = []
+    read_file_tail = applications_migration.read_file_tail
+    monkeypatch.setattr(
+        applications_migration, "read_file_tail",
+        lambda path, offset: tails_read.append(offset) or read_file_tail(path, offset)
+    )
+
+    assert migrate_applications_file(file_path) == 2
+    assert migrate_applications_file(file_path) == 0
+    # Only the new part was read, and the unchanged file was not read again
+    assert tails_read == [parsed_bytes]
+    applications = database.get_applications(user_id="user-a")
+    assert sorted(app["title"] for app in applications) == ["Custom LLM Development", "RAG Chatbot"]
+    assert [app["title"] for app in database.get_applications(user_id="default_user")] == ["Voice Agent Developer"]
+    database.close_connection()
+
+
+def test_a_partly_written_multibyte_character_is_left_for_the_next_import(tmp_path, monkeypatch):
+    use_temp_db(tmp_path, monkeypatch)
+    file_path = os.path.join(tmp_path, "cover_letters.md")
+    first, second = USER_FILE.split("# Title: RAG Chatbot")
+    partial = "# Title: RAG Chatbot – café\n".encode("utf-8")
+    with open(file_path, "wb") as f:
+        # The write stopped in the middle of the en dash
+        f.write(first.encode("utf-8") + partial[:len("# Title: RAG Chatbot ") + 1])
+
+    assert migrate_applications_file(file_path) == 1
+    assert database.get_applications_file_import(file_path)["parsed_bytes"] == len(first.rstrip("\n").encode("utf-8"))
+
+    with open(file_path, "ab") as f:
+        f.write(partial[len("# Title: RAG Chatbot ") + 1:] + second.split("\n", 1)[1].encode("utf-8"))
+
+    assert migrate_applications_file(file_path) == 1
+    titles = sorted(app["title"] for app in database.get_applications(user_id="user-a"))
+    assert titles == ["Custom LLM Development", "RAG Chatbot – café"]
+    database.close_connection()
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared browser pool
+"""
+
+import asyncio
+import os
+import time
+from playwright.async_api import async_playwright
+from src.browser_pool import BrowserPool
+
+
+def driver_exited(pid):
+    try:
+        return os.waitpid(pid, os.WNOHANG)[0] == pid
+    except ChildProcessError:
+        return True
+
+
+def test_closing_from_another_event_loop_stops_the_driver():
+    pool = BrowserPool()
+
+    async def launch():
+        # A Streamlit rerun launched the pool on a loop that has finished since
+        pool.playwright = await async_playwright().start()
+        pool.loop = asyncio.get_running_loop()
+        return pool.playwright._impl_obj._connection._transport._proc.pid
+
+    driver_pid = asyncio.run(launch())
+    assert not driver_exited(driver_pid)
+
+    asyncio.run(pool.close())
+
+    assert pool.playwright is None and pool.browser is None
+    deadline = time.monotonic() + 10
+    while not driver_exited(driver_pid):
+        assert time.monotonic() < deadline, "the Playwright driver is still running"
+        time.sleep(0.05)
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Tests for the deterministic job page parser, using the HTML fixtures in ./fixtures/upwork
+"""
+
+import os
+from src.job_page_parser import parse_job_page
+from src.structured_outputs import JobType
+
+JOB_PAGES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "upwork", "freelance-jobs", "apply")
+
+
+def read_job_page(slug):
+    """Load a job page fixture by its URL slug."""
+    with open(os.path.join(JOB_PAGES_DIR, slug, "index.html"), encoding="utf-8") as f:
+        return f.read()
+
+
+def test_parses_hourly_job_with_client_information():
+    job = parse_job_page(read_job_page("AI-Agent-Developer-for-Customer-Support-Automation_~01a1b2c3d4e5f60001"))
+
+    assert job is not None
+    assert job.title == "AI Agent Developer for Customer Support Automation"
+    assert job.description.startswith("We are looking for an experienced AI developer")
+    assert "\n\nTech stack: Python, LangChain or LangGraph, OpenAI API." in job.description
+    assert job.job_type == JobType.HOURLY
+    assert job.experience_level == "Expert"
+    assert job.duration == "1 to 3 months"
+    assert job.payment_rate == "$35.00-$60.00"
+    assert job.proposal_requirements == 'Start your proposal with "Support Bot" so we know you read the post.'
+
+    client = job.client_information
+    assert client.location == "United States"
+    assert client.total_spent == "$48K"
+    assert client.total_hires == 27
+    assert client.joined_date == "Mar 9, 2021"
+    assert client.company_profile == "Tech & IT Mid-sized company (10-99 people)"
+
+
+def test_parses_fixed_price_job_without_optional_fields():
+    job = parse_job_page(read_job_page("Build-LangGraph-Multi-Agent-Research-Assistant_~01a1b2c3d4e5f60002"))
+
+    assert job is not None
+    assert job.job_type == JobType.FIXED
+    assert job.payment_rate == "$1,500.00"
+    assert job.duration == "Less than 1 month"
+    assert job.experience_level == "Intermediate"
+    assert job.proposal_requirements is None
+    assert job.client_information.total_hires == 4
+    assert job.client_information.company_profile is None
+
+
+def test_missing_required_field_falls_back():
+    # This page has no duration, so the scraper must use the LLM instead
+    assert parse_job_page(read_job_page("Python-Web-Scraper-for-Real-Estate-Listings_~01a1b2c3d4e5f60003")) is None
+
+
+def test_page_without_main_content_falls_back():
+    assert parse_job_page("<html><body><p>Just a moment...</p></body></html>") is None
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Tests for the paged jobs queries used by the Streamlit pages
+"""
+
+import os
+import pytest
+import sqlite3
+import src.database as database
+
+
+def seed_jobs(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "DB_PATH", os.path.join(tmp_path, "jobs.db"))
+    database.ensure_db_exists()
+    scores = [9, 3, None, 7, 5, None]
+    database.bulk_save_jobs(
+        [
+            {
+                "job_id": f"job-{i}",
+                "title": f"Python job {i}" if i % 2 else f"Design job {i}",
+                "job_type": "Hourly" if i < 4 else "Fixed",
+                "description": "x" * 500,
+                "score": score,
+            }
+            for i, score in enumerate(scores)
+        ],
+        user_id="user-a",
+    )
+    database.bulk_save_jobs([{"job_id": "other", "title": "Python job", "score": 8}], user_id="user-b")
+    with database.db_cursor() as cursor:
+        cursor.execute("UPDATE jobs SET created_at = datetime('now', '-40 days') WHERE job_id = 'job-0'")
+        cursor.execute("UPDATE jobs SET created_at = datetime('now', '-' || substr(job_id, 5) || ' minutes') WHERE job_id != 'job-0'")
+
+
+def test_jobs_are_paged_projected_and_filtered_in_the_database(tmp_path, monkeypatch):
+    seed_jobs(tmp_path, monkeypatch)
+
+    page = database.query_jobs(
+        columns=["title", "description"], limit=2, offset=1, description_chars=10, user_id="user-a"
+    )
+    assert page == [
+        {"job_id": "job-2", "title": "Design job 2", "description": "x" * 10},
+        {"job_id": "job-3", "title": "Python job 3", "description": "x" * 10},
+    ]
+    by_score = database.query_jobs(columns=["score"], order_by="score", user_id="user-a", scored=True)
+    assert [job["score"] for job in by_score] == [9, 7, 5, 3]
+    assert database.count_jobs(user_id="user-a", score_min=4, score_below=7) == 1
+    assert database.count_jobs(user_id="user-a", search="python", job_type="Hourly") == 2
+    assert sorted(database.get_job_ids(user_id="user-a", scored=False)) == ["job-2", "job-5"]
+    assert database.get_job_ids(user_id="user-a", older_than_days=30) == ["job-0"]
+    with pytest.raises(ValueError):
+        database.query_jobs(order_by="description; DROP TABLE jobs")
+    database.close_connection()
+
+
+def test_jobs_overview_counts_in_one_query(tmp_path, monkeypatch):
+    seed_jobs(tmp_path, monkeypatch)
+
+    assert database.get_jobs_overview("user-a") == {
+        "total_jobs": 6,
+        "processed_jobs": 4,
+        "unprocessed_jobs": 2,
+        "high_scoring_jobs": 2,
+        "low_scoring_jobs": 1,
+        "old_jobs": 1,
+        "average_score": 6.0,
+    }
+    assert sorted(database.get_job_scores("user-a")) == [3, 5, 7, 9]
+    assert database.get_job_value_counts("job_type", "user-a") == {"Hourly": 4, "Fixed": 2}
+    database.close_connection()
+
+
+def test_materialized_job_stats_match_the_jobs_table(tmp_path, monkeypatch):
+    seed_jobs(tmp_path, monkeypatch)
+    live_stats = database.get_database_stats("user-a")
+    assert live_stats == {
+        "total_jobs": 6,
+        "processed_jobs": 4,
+        "high_scoring_jobs": 2,
+        "average_score": 6.0,
+        "jobs_by_type": {"Hourly": 4, "Fixed": 2},
+        "recent_jobs": 5,
+    }
+
+    monkeypatch.setenv("MATERIALIZED_JOB_STATS", "true")
+    database.sync_job_stats()
+    assert database.get_database_stats("user-a") == live_stats
+
+    # The triggers follow inserts, rescoring, moves between users and deletes
+    database.bulk_save_jobs([{"job_id": "new", "title": "New job", "job_type": "Fixed", "score": 8}], user_id="user-a")
+    database.update_job("job-2", {"score": 10}, "user-a")
+    database.reset_job_score("job-0", "user-a")
+    database.delete_job("job-1", "user-a")
+    with database.db_cursor() as cursor:
+        cursor.execute("UPDATE jobs SET user_id = 'user-a', job_type = NULL WHERE job_id = 'other'")
+    materialized = [database.get_database_stats(user_id) for user_id in ("user-a", "user-b", None)]
+    materialized_system = database.get_system_stats()
+
+    monkeypatch.setenv("MATERIALIZED_JOB_STATS", "false")
+    database.sync_job_stats()
+    assert materialized == [database.get_database_stats(user_id) for user_id in ("user-a", "user-b", None)]
+    assert materialized_system == database.get_system_stats()
+    assert materialized_system["total_jobs"] == 7
+    assert materialized_system["high_scoring_jobs"] == 4
+    database.close_connection()
+
+
+def test_job_stats_dropped_by_another_process_fall_back_to_jobs(tmp_path, monkeypatch):
+    seed_jobs(tmp_path, monkeypatch)
+    monkeypatch.setenv("MATERIALIZED_JOB_STATS", "true")
+    database.sync_job_stats()
+    live_stats = database.get_database_stats("user-a")
+
+    # Another process runs with MATERIALIZED_JOB_STATS off and adds a job without the triggers
+    other = sqlite3.connect(database.DB_PATH)
+    for name in database.JOB_STATS_TRIGGERS:
+        other.execute(f"DROP TRIGGER {name}")
+    other.execute("DROP TABLE job_stats")
+    other.execute("INSERT INTO jobs (job_id, user_id, title, job_type, score) VALUES ('late', 'user-a', 'Late', 'Fixed', 9)")
+    other.commit()
+    other.close()
+
+    stats = database.get_database_stats("user-a")
+    assert stats["total_jobs"] == live_stats["total_jobs"] + 1
+    assert database.get_system_stats()["total_jobs"] == 8
+
+    # Turning the table back on rebuilds it from jobs rather than reusing old counts
+    database.sync_job_stats()
+    assert database.get_database_stats("user-a") == stats
+    database.close_connection()
+
+
+def test_bulk_save_counts_duplicates_and_existing_jobs_as_skipped(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "DB_PATH", os.path.join(tmp_path, "jobs.db"))
+    database.ensure_db_exists()
+    assert database.bulk_save_jobs([{"job_id": "a", "title": "A"}], user_id="user-a") == (1, 0)
+
+    batch = [
+        {"job_id": "a", "title": "A again"},
+        {"job_id": "b", "title": "B"},
+        {"job_id": "b", "title": "B again", "score": 5},
+        {"job_id": "c", "title": "C"},
+    ]
+    assert database.bulk_save_jobs(batch, user_id="user-a") == (2, 2)
+    assert database.count_jobs(user_id="user-a") == 3
+
+    # Scores of saved jobs are written with update_job_scores, not skipped
+    assert database.update_job_scores([{"job_id": "a", "score": 8}, {"job_id": "b", "score": 3}], "user-a") == 2
+    assert sorted(database.get_job_scores("user-a")) == [3, 8]
+    database.close_connection()
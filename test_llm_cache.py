@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Tests for the on-disk LLM response cache
+"""
+
+import os
+import time
+from src.llm_cache import LLMResponseCache, make_cache_key
+from src.structured_outputs import CoverLetter
+
+
+def test_caches_text_and_structured_responses(tmp_path):
+    cache = LLMResponseCache(path=os.path.join(tmp_path, "cache.db"))
+    text_key = make_cache_key("openai/gpt-4o-mini", "system", "message")
+    letter_key = make_cache_key("openai/gpt-4o-mini", "system", "message", CoverLetter)
+
+    assert text_key != letter_key
+    assert cache.get(text_key) is None
+
+    cache.set(text_key, "openai/gpt-4o-mini", "plain answer")
+    cache.set(letter_key, "openai/gpt-4o-mini", CoverLetter(letter="Dear client"))
+
+    assert cache.get(text_key) == "plain answer"
+    assert cache.get(letter_key, CoverLetter) == CoverLetter(letter="Dear client")
+    assert cache.stats["hits"] == 2
+    assert cache.stats["misses"] == 1
+    cache.close()
+
+
+def test_expired_responses_are_misses(tmp_path):
+    cache = LLMResponseCache(path=os.path.join(tmp_path, "cache.db"), ttl_seconds=0)
+    key = make_cache_key("openai/gpt-4o-mini", "system", "message")
+
+    cache.set(key, "openai/gpt-4o-mini", "stale answer")
+    time.sleep(0.01)
+
+    assert cache.get(key) is None
+    assert cache.stats["expired"] == 1
+    cache.close()
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = LLMResponseCache(path=os.path.join(tmp_path, "cache.db"), max_entries=2)
+    keys = [make_cache_key("openai/gpt-4o-mini", "system", f"message {i}") for i in range(3)]
+
+    cache.set(keys[0], "openai/gpt-4o-mini", "first")
+    time.sleep(0.01)
+    cache.set(keys[1], "openai/gpt-4o-mini", "second")
+    time.sleep(0.01)
+    # Reading the first entry makes the second the least recently used
+    assert cache.get(keys[0]) == "first"
+    time.sleep(0.01)
+    cache.set(keys[2], "openai/gpt-4o-mini", "third")
+
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) == "first"
+    assert cache.get(keys[2]) == "third"
+    assert cache.stats["evicted"] == 1
+    cache.close()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Tests for the LLM scheduler's priority ordering, rate budgets and retries
+"""
+
+import asyncio
+from src.llm_scheduler import LLMScheduler, PrioritySlots, RateBudget
+
+
+class FakeRateLimitError(Exception):
+    status_code = 429
+
+
+def test_free_slots_go_to_the_highest_priority():
+    async def run():
+        slots = PrioritySlots(max_concurrency=1)
+        order = []
+
+        async def worker(name, priority):
+            await slots.acquire(priority)
+            order.append(name)
+            await asyncio.sleep(0)
+            slots.release()
+
+        await slots.acquire(0)
+        tasks = [
+            asyncio.create_task(worker("generation", 2)),
+            asyncio.create_task(worker("scoring", 1)),
+        ]
+        await asyncio.sleep(0)
+        slots.release()
+        await asyncio.gather(*tasks)
+        return order
+
+    assert asyncio.run(run()) == ["scoring", "generation"]
+
+
+def test_rate_budget_limits_requests_and_tokens():
+    budget = RateBudget(rpm=2, tpm=1000)
+
+    assert budget.reserve(400) == 0
+    assert budget.reserve(700) > 0  # over the token budget
+    assert budget.reserve(100) == 0
+    assert budget.reserve(1) > 0  # over the request budget
+
+
+def test_retries_rate_limits_with_backoff():
+    scheduler = LLMScheduler(max_retries=3, base_backoff=0.01, max_backoff=0.01)
+    attempts = []
+
+    async def call():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise FakeRateLimitError()
+        return "ok"
+
+    result = asyncio.run(scheduler.run(call, "test-provider", priority="scoring"))
+
+    assert result == "ok"
+    assert len(attempts) == 3
+    assert scheduler.stats["retries"] == 2
+    assert scheduler.stats["rate_limited"] == 2
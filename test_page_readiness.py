@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Tests for the page readiness signals
+"""
+
+import asyncio
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+from src.page_readiness import PageReadiness
+
+
+class FakePage:
+    def __init__(self, selector_seconds=None, network_idle_seconds=None):
+        self.selector_seconds = selector_seconds
+        self.network_idle_seconds = network_idle_seconds
+
+    async def wait_until(self, seconds, timeout):
+        if seconds is None or seconds * 1000 > timeout:
+            await asyncio.sleep(timeout / 1000)
+            raise PlaywrightTimeoutError(f"Timeout {timeout}ms exceeded.")
+        await asyncio.sleep(seconds)
+
+    async def wait_for_selector(self, selector, state=None, timeout=None):
+        await self.wait_until(self.selector_seconds, timeout)
+
+    async def wait_for_load_state(self, state, timeout=None):
+        await self.wait_until(self.network_idle_seconds, timeout)
+
+
+def test_pages_without_the_selector_are_ready_on_network_idle():
+    readiness = PageReadiness(timeout=500)
+
+    timing = asyncio.run(readiness.wait(FakePage(network_idle_seconds=0.05), "https://example.com/job"))
+
+    assert timing["signal"] == "networkidle"
+    assert timing["ready_seconds"] < 0.4
+
+
+def test_the_selector_wins_and_the_budget_is_shared():
+    readiness = PageReadiness(timeout=200)
+
+    async def wait_for_pages():
+        return [
+            await readiness.wait(FakePage(selector_seconds=0.01, network_idle_seconds=0.01), "a"),
+            await readiness.wait(FakePage(), "b"),
+            await readiness.wait(FakePage(), "c"),
+        ]
+
+    timings = asyncio.run(wait_for_pages())
+
+    assert [timing["signal"] for timing in timings] == ["selector", "timeout", "timeout"]
+    # Both waits run in the same budget instead of one after the other
+    assert timings[1]["ready_seconds"] < 0.35
+    assert readiness.summary()["signals"] == {"selector": 1, "timeout": 2}
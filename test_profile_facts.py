@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Tests for the profile facts index that replaces per-job profile summaries
+"""
+
+import asyncio
+import json
+import src.profile_facts as profile_facts
+from src.profile_facts import ProfileFactsIndex, load_profile_facts_index, tokenize
+from src.structured_outputs import ProfileFact, ProfileFacts
+
+FACTS = ProfileFacts(
+    summary="I am an AI engineer.",
+    facts=[
+        ProfileFact(category="skill", text="I build chatbots with LangChain and LangGraph."),
+        ProfileFact(category="skill", text="I train computer vision models with PyTorch."),
+        ProfileFact(category="project", text="I built a React dashboard for sales analytics."),
+        ProfileFact(category="language", text="I speak English and French."),
+    ],
+)
+
+
+def test_tokenize_folds_styled_letters():
+    assert tokenize("𝗡𝗮𝘁𝘂𝗿𝗮𝗹 Language, C++ and Node.js.") == ["natural", "language", "c++", "node.js"]
+
+
+def test_relevant_infos_picks_matching_facts():
+    index = ProfileFactsIndex(FACTS, top_k=2)
+
+    relevant_infos = index.relevant_infos("We need a LangGraph agent developer for a support chatbot.")
+
+    assert relevant_infos.startswith("I am an AI engineer.\n\n")
+    assert "- I build chatbots with LangChain and LangGraph." in relevant_infos
+    assert "React" not in relevant_infos
+
+
+def test_saved_decomposition_is_reused(tmp_path, monkeypatch):
+    monkeypatch.setattr(profile_facts, "PROFILE_FACTS_DIR", str(tmp_path))
+    calls = []
+
+    async def fake_ainvoke_llm(**kwargs):
+        calls.append(kwargs)
+        return FACTS
+
+    monkeypatch.setattr(profile_facts, "ainvoke_llm", fake_ainvoke_llm)
+
+    first = asyncio.run(load_profile_facts_index("my profile"))
+    second = asyncio.run(load_profile_facts_index("my profile"))
+
+    assert len(calls) == 1
+    assert second.profile_facts == first.profile_facts
+    with open(profile_facts.get_profile_facts_path("my profile"), encoding="utf-8") as f:
+        assert json.load(f)["summary"] == "I am an AI engineer."
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Tests for splitting prompts into a cacheable prefix and a per-job suffix, and for the prompt registry
+"""
+
+import os
+import pytest
+import sqlite3
+import src.database as database
+from src import prompts
+from src.prompt_assembly import PromptCacheStats, PromptTemplate, assemble_prompt
+from src.prompts import GENERATE_COVER_LETTER_PROMPT, SCORE_JOBS_PROMPT
+
+
+def test_shared_profile_stays_in_the_prefix():
+    system_prompt, user_message = assemble_prompt(
+        SCORE_JOBS_PROMPT, "[{'id': '0'}]", request="Evaluate these Jobs:", profile="I build AI agents."
+    )
+
+    assert "I build AI agents." in system_prompt
+    assert user_message == "Evaluate these Jobs:\n\n[{'id': '0'}]"
+
+
+def test_per_job_profile_moves_to_the_suffix():
+    prompts = [
+        assemble_prompt(
+            GENERATE_COVER_LETTER_PROMPT, f"Job {i}", request="Write a cover letter:", job_profile=f"Relevant info {i}"
+        )
+        for i in range(2)
+    ]
+
+    # Every job shares the same system prompt, only the message changes
+    assert prompts[0][0] == prompts[1][0]
+    assert "Relevant info" not in prompts[0][0]
+    assert prompts[1][1] == "<profile>\nRelevant info 1\n</profile>\n\nWrite a cover letter:\n\nJob 1"
+
+
+def test_records_cached_prompt_tokens():
+    stats = PromptCacheStats()
+    stats.record_usage_metadata(
+        "openai/gpt-4o-mini", {"input_tokens": 2000, "input_token_details": {"cache_read": 1536}}
+    )
+    stats.record_usage_metadata("openai/gpt-4o-mini", {"input_tokens": 2000})
+
+    assert stats.by_model["openai/gpt-4o-mini"] == {"requests": 2, "input_tokens": 4000, "cached_tokens": 1536}
+
+
+def test_parsed_templates_format_like_str_format():
+    templates = [value for name, value in vars(prompts).items() if name.endswith("_PROMPT") and isinstance(value, str)]
+    templates += ["{profile} and {profile}", "{{profile}} is escaped", "no placeholder", "{other}"]
+
+    for template in templates:
+        parsed = PromptTemplate(template)
+        try:
+            expected = template.format(profile="My profile")
+        except KeyError:
+            with pytest.raises(KeyError):
+                parsed.format(profile="My profile")
+            continue
+        assert parsed.format(profile="My profile") == expected
+        assert assemble_prompt(parsed, "Job", profile="P") == assemble_prompt(template, "Job", profile="P")
+
+
+def test_prompt_registry_reloads_after_a_prompt_changes(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "DB_PATH", os.path.join(tmp_path, "prompts.db"))
+    database.ensure_db_exists()
+    _, admin_id = database.create_admin_user("admin", "admin@example.com", "password")
+
+    assert database.get_prompt_template_by_type("cover_letter", "Default {profile}").format(profile="P") == "Default P"
+    version = database.get_prompt_version()
+    database.create_or_update_prompt("cover_letter", "Cover letter", "Custom {profile}", admin_id)
+    assert database.get_prompt_version() > version
+
+    statements = []
+    database.get_connection().set_trace_callback(statements.append)
+    for _ in range(3):
+        template = database.get_prompt_template_by_type("cover_letter", "Default {profile}")
+        assert database.get_prompt_by_type("cover_letter")["prompt_content"] == "Custom {profile}"
+    database.get_connection().set_trace_callback(None)
+    assert template.format(profile="P") == "Custom P"
+    # Every lookup reads the version row, the active prompts are loaded in one query once
+    assert sum("FROM prompts" in statement for statement in statements) == 1
+    assert sum("FROM prompt_version" in statement for statement in statements) == 6
+
+    # A prompt edited by another process is picked up through the version row
+    other = sqlite3.connect(database.DB_PATH)
+    other.execute("UPDATE prompts SET prompt_content = 'Edited {profile}' WHERE prompt_type = 'cover_letter'")
+    other.execute("UPDATE prompt_version SET version = version + 1 WHERE id = 1")
+    other.commit()
+    other.close()
+    assert database.get_prompt_template_by_type("cover_letter", "Default {profile}").format(profile="P") == "Edited P"
+
+    database.delete_prompt("cover_letter", admin_id)
+    assert database.get_prompt_by_type("cover_letter") is None
+    assert database.get_prompt_template_by_type("cover_letter", "Default {profile}").format(profile="P") == "Default P"
+    database.close_connection()
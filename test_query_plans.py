@@ -0,0 +1,13 @@
+#!/usr/bin/env python3
+"""
+Tests for the query plan audit of the database functions
+"""
+
+from audit_query_plans import audit_query_plans
+
+
+def test_database_queries_only_scan_where_expected():
+    findings = audit_query_plans()
+
+    assert [finding for finding in findings if not finding["expected"]] == []
+
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Tests for the versioned schema migrations
+"""
+
+import os
+import sqlite3
+import src.database as database
+
+
+def test_database_from_before_user_accounts_is_migrated_once(tmp_path, monkeypatch):
+    db_path = os.path.join(tmp_path, "legacy.db")
+    monkeypatch.setattr(database, "DB_PATH", db_path)
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE jobs (job_id TEXT PRIMARY KEY, title TEXT, score REAL, created_at TIMESTAMP)")
+    conn.execute("INSERT INTO jobs (job_id, title) VALUES ('job-1', 'Old job')")
+    conn.commit()
+    conn.close()
+
+    database.ensure_db_exists()
+
+    with database.db_cursor() as cursor:
+        assert database.get_schema_version(cursor) == database.SCHEMA_MIGRATIONS[-1][0]
+        cursor.execute(
+            "EXPLAIN QUERY PLAN SELECT * FROM jobs WHERE user_id = ? AND score IS NULL ORDER BY created_at DESC",
+            ("default_user",)
+        )
+        assert any("idx_jobs_user_unscored" in row[3] for row in cursor.fetchall())
+    assert database.get_all_jobs("default_user")[0]["title"] == "Old job"
+
+    # Later calls in the process don't touch the database
+    statements = []
+    database.get_connection().set_trace_callback(statements.append)
+    database.ensure_db_exists()
+    database.get_connection().set_trace_callback(None)
+    assert statements == []
+    database.close_connection()
+
+
+def test_only_pending_migrations_are_applied(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "DB_PATH", os.path.join(tmp_path, "jobs.db"))
+    database.ensure_db_exists()
+    applied = []
+    monkeypatch.setattr(database, "SCHEMA_MIGRATIONS", database.SCHEMA_MIGRATIONS + [
+        (99, "test migration", lambda cursor: applied.append(cursor.execute("CREATE TABLE extra (id INTEGER)")))
+    ])
+
+    assert database.migrate_database() == 1
+    assert database.migrate_database() == 0
+
+    assert len(applied) == 1
+    with database.db_cursor() as cursor:
+        assert database.get_schema_version(cursor) == 99
+    database.close_connection()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Tests for merging job scores by id after parallel scoring batches
+"""
+
+import ast
+import asyncio
+import os
+import src.database as database
+import src.nodes as nodes
+import src.user_job_processor as user_job_processor
+from src.structured_outputs import JobScore, JobScores
+from src.utils import format_scraped_job_for_scoring, index_scores_by_id
+
+
+def make_jobs(count):
+    return [
+        {
+            "job_id": f"hash-{i}",
+            "user_id": "user",
+            "title": f"Job {i}",
+            "experience_level": "Expert",
+            "description": "...",
+            "proposal_requirements": None,
+        }
+        for i in range(count)
+    ]
+
+
+def test_scoring_ids_replace_database_ids():
+    jobs_list = format_scraped_job_for_scoring([{"id": 42, "job_id": "hash", "title": "Job"}], ["7"])
+
+    assert jobs_list == [{"id": "7", "title": "Job"}]
+    assert index_scores_by_id([{"job_id": "7", "score": 8}, {"job_id": "7", "score": 2}]) == {"7": 8}
+
+
+def test_scores_merge_by_id_and_missing_jobs_are_requeued(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "DB_PATH", os.path.join(tmp_path, "jobs.db"))
+    requests = []
+
+    async def fake_ainvoke_llm(system_prompt, user_message, **kwargs):
+        jobs_list = ast.literal_eval(user_message.split("\n\n", 1)[1])
+        requests.append([job["id"] for job in jobs_list])
+        return JobScores(scores=[JobScore(job_id=job["id"], score=int(job["id"]) + 3) for job in jobs_list])
+
+    monkeypatch.setattr(nodes, "ainvoke_llm", fake_ainvoke_llm)
+    graph_nodes = nodes.MainGraphNodes("profile", batch_size=2)
+    jobs = make_jobs(5)
+
+    # Batches finished out of order and the LLM left job 3 out
+    scores = [
+        {"job_id": "4", "score": 7},
+        {"job_id": "2", "score": 5},
+        {"job_id": "0", "score": 3},
+        {"job_id": "1", "score": 4},
+    ]
+    result = asyncio.run(graph_nodes.check_for_job_matches({"scraped_jobs": jobs, "scores": scores}))
+    database.close_connection()
+
+    assert requests == [["3"]]
+    assert [job["score"] for job in result["scraped_jobs"]] == [3, 4, 5, 6, 7]
+    assert [job["job_id"] for job in result["scraped_jobs"]] == [job["job_id"] for job in jobs]
+    assert len(result["matches"]) == 1
+
+
+def test_scores_for_another_batchs_ids_are_dropped(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "DB_PATH", os.path.join(tmp_path, "jobs.db"))
+
+    async def fake_ainvoke_llm(system_prompt, user_message, **kwargs):
+        # The LLM scores its own job 2 and hallucinates job 0, which belongs to the other batch
+        return JobScores(scores=[JobScore(job_id="0", score=1), JobScore(job_id="2", score=9)])
+
+    monkeypatch.setattr(nodes, "ainvoke_llm", fake_ainvoke_llm)
+    graph_nodes = nodes.MainGraphNodes("profile", batch_size=2)
+    jobs = make_jobs(3)
+
+    result = asyncio.run(graph_nodes.score_scraped_jobs({"jobs_batch": jobs[2:], "score_ids": ["2"]}))
+    assert result == {"scores": [{"job_id": "2", "score": 9}]}
+
+    # The first batch's score for job 0 arrives after the second batch's and still wins
+    scores = result["scores"] + [{"job_id": "0", "score": 8}, {"job_id": "1", "score": 4}]
+    merged = asyncio.run(graph_nodes.check_for_job_matches({"scraped_jobs": jobs, "scores": scores}))
+    database.close_connection()
+
+    assert [job["score"] for job in merged["scraped_jobs"]] == [8, 4, 9]
+
+
+def test_user_processor_batches_match_scores_by_position(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    requests = []
+
+    async def fake_ainvoke_llm(system_prompt, user_message, **kwargs):
+        jobs_list = ast.literal_eval(user_message.split("\n\n", 1)[1])
+        requests.append([job["id"] for job in jobs_list])
+        # Ids echoed with whitespace and in another order, plus one out of range
+        return JobScores(scores=[JobScore(job_id=" 1 ", score=8), JobScore(job_id="0", score=3), JobScore(job_id="2", score=11)])
+
+    monkeypatch.setattr(user_job_processor, "ainvoke_llm", fake_ainvoke_llm)
+    processor = user_job_processor.UserJobProcessor(user_id="user", profile="profile")
+    jobs = make_jobs(2)
+
+    scores = asyncio.run(processor.score_batch(jobs))
+
+    assert requests == [["0", "1"]]
+    assert scores == {"hash-0": 3, "hash-1": 8}
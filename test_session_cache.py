@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Tests for the session and user caches of the authentication functions
+"""
+
+import os
+import src.database as database
+from src.session_cache import TTLCache
+
+
+def trace_statements():
+    statements = []
+    database.get_connection().set_trace_callback(statements.append)
+    return statements
+
+
+def test_sessions_are_cached_until_they_change(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "DB_PATH", os.path.join(tmp_path, "auth.db"))
+    monkeypatch.setattr(database, "_session_cache", TTLCache(ttl_seconds=60))
+    monkeypatch.setattr(database, "_user_cache", TTLCache(ttl_seconds=60))
+    database.ensure_db_exists()
+    _, admin_id = database.create_admin_user("admin", "admin@example.com", "password")
+    _, user_id = database.create_user("someone", "someone@example.com", "password")
+    session_id = database.create_session(user_id)
+
+    assert database.validate_session(session_id)[1]["username"] == "someone"
+    statements = trace_statements()
+    valid, user = database.validate_session(session_id)
+    user["username"] = "changed by the caller"
+    assert database.validate_session(session_id)[1]["username"] == "someone"
+    assert database.is_admin_user(admin_id) and database.is_admin_user(admin_id)
+    assert valid and len(statements) == 1  # only the first is_admin_user lookup
+
+    # Changing the user drops their cached sessions
+    assert database.promote_user_to_admin(user_id)
+    assert database.validate_session(session_id)[1]["is_admin"] == 1
+    assert database.toggle_user_status(user_id, admin_id)
+    assert database.get_user_by_id(user_id)["is_active"] == 0
+    assert database.invalidate_session(session_id)
+    assert database.validate_session(session_id) == (False, None)
+
+    stats = database.get_auth_cache_stats()
+    assert 0 < stats["session_hit_rate"] < 1 and 0 < stats["user_hit_rate"] < 1
+    database.get_connection().set_trace_callback(None)
+    database.close_connection()
+
+
+def test_entries_expire_after_the_ttl(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("src.session_cache.time.monotonic", lambda: now[0])
+    cache = TTLCache(ttl_seconds=30, max_entries=2)
+
+    cache.set("a", {"id": 1})
+    cache.set("b", {"id": 2})
+    cache.set("c", {"id": 3})
+    assert cache.get("a") is None  # dropped as the oldest entry
+    now[0] += 29
+    assert cache.get("b") == {"id": 2}
+    now[0] += 1
+    assert cache.get("b") is None
+    assert cache.stats == {"hits": 1, "misses": 2, "expired": 1, "invalidated": 0}
+
+
+def test_sessions_are_not_cached_past_their_expiry(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "DB_PATH", os.path.join(tmp_path, "auth.db"))
+    monkeypatch.setattr(database, "_session_cache", TTLCache(ttl_seconds=3600))
+    database.ensure_db_exists()
+    _, user_id = database.create_user("someone", "someone@example.com", "password")
+    session_id = database.create_session(user_id, duration_hours=1 / 60)
+    now = [100.0]
+    monkeypatch.setattr("src.session_cache.time.monotonic", lambda: now[0])
+
+    valid, session = database.validate_session(session_id)
+    assert valid and "seconds_left" not in session
+    now[0] += 55
+    assert database._session_cache.get((database.DB_PATH, session_id)) is not None
+    # The session expires after a minute, long before the cache's hour
+    now[0] += 10
+    assert database._session_cache.get((database.DB_PATH, session_id)) is None
+    database.close_connection()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Tests for the streaming pipeline mode
+"""
+
+import asyncio
+import src.streaming_pipeline as streaming_pipeline
+from src.application_executor import ApplicationExecutor
+from src.streaming_pipeline import StreamingPipeline
+
+
+class FakeScraper:
+    def __init__(self, jobs):
+        self.jobs = jobs
+
+    async def stream_upwork_data(self, search_query, num_jobs):
+        for job in self.jobs:
+            await asyncio.sleep(0.01)
+            yield job
+
+
+class FakeApplicationGraph:
+    async def ainvoke(self, state):
+        return {"applications": [state["job_description"]]}
+
+
+class FakeNodes:
+    def __init__(self, jobs):
+        self.upwork_scraper = FakeScraper(jobs)
+        self.number_of_jobs = len(jobs)
+        self.application_executor = ApplicationExecutor(FakeApplicationGraph(), timeout_seconds=5)
+        self.written = []
+
+    async def score_jobs_batch(self, jobs, score_ids, bypass_cache=False):
+        return [{"job_id": score_id, "score": int(job["title"].split()[-1])} for score_id, job in zip(score_ids, jobs)]
+
+    async def rescore_missing_jobs(self, all_jobs, scores_by_id):
+        return []
+
+    def save_applications(self, applications):
+        self.written.extend(applications)
+
+
+def test_matches_get_applications_while_scraping(monkeypatch):
+    monkeypatch.setattr(streaming_pipeline, "bulk_save_jobs", lambda jobs: (len(jobs), 0))
+    jobs = [
+        {
+            "job_id": f"hash-{score}",
+            "title": f"Job {score}",
+            "experience_level": "Expert",
+            "description": "...",
+            "proposal_requirements": None,
+        }
+        for score in [9, 3, 8, 5]
+    ]
+    main_nodes = FakeNodes(jobs)
+
+    pipeline = StreamingPipeline(main_nodes, batch_size=2)
+    stats = asyncio.run(pipeline.run("AI agent"))
+
+    assert stats["scraped"] == 4
+    assert stats["scored"] == 4
+    assert stats["matched"] == 2
+    assert stats["applications"] == 2
+    assert sorted("Job 9" in text for text in main_nodes.written) == [False, True]
+    assert stats["first_application_seconds"] < stats["total_seconds"]
+
+
+def test_a_failed_save_is_counted_and_the_next_match_still_saved(monkeypatch):
+    monkeypatch.setattr(streaming_pipeline, "bulk_save_jobs", lambda jobs: (len(jobs), 0))
+    jobs = [
+        {
+            "job_id": f"hash-{score}",
+            "title": f"Job {score}",
+            "experience_level": "Expert",
+            "description": "...",
+            "proposal_requirements": None,
+        }
+        for score in [9, 8]
+    ]
+    main_nodes = FakeNodes(jobs)
+    save_applications = main_nodes.save_applications
+    failures = [OSError("disk full")]
+
+    def save_once_failing(applications):
+        if failures:
+            raise failures.pop()
+        save_applications(applications)
+
+    main_nodes.save_applications = save_once_failing
+
+    # A single generation worker, which has to survive the failed save
+    stats = asyncio.run(StreamingPipeline(main_nodes, batch_size=2, generation_workers=1).run("AI agent"))
+
+    assert stats["matched"] == 2
+    assert stats["failed_applications"] == 1
+    assert stats["applications"] == 1
+    assert len(main_nodes.written) == 1